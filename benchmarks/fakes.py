@@ -0,0 +1,136 @@
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from src import agent_processor, dag_executor, workflow_loader
+from src.agent_processor import AGENT_MESSAGES_QUERY, NEXT_AGENT_QUERY
+from src.workflow_loader import GRAPH_VERSION_QUERY, WORKFLOW_GRAPH_QUERY, WORKFLOW_PATH_QUERY
+
+def latency_sampler(spec: str):
+    """Turn a latency spec into a function returning seconds.
+
+    Specs: "none", "fixed:MS", "uniform:LOW_MS:HIGH_MS" or
+    "lognormal:MEDIAN_MS:SIGMA" (a long-tailed, API-like distribution).
+    """
+    kind, *args = (spec or "none").split(":")
+    values = [float(arg) for arg in args]
+    if kind == "none":
+        return lambda: 0.0
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda: random.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        median, sigma = values
+        return lambda: random.lognormvariate(0, sigma) * median / 1000
+    raise ValueError(f"❌ Unsupported latency spec: {spec}")
+
+def _sleep(seconds: float) -> None:
+    if seconds > 0:
+        time.sleep(seconds)
+
+class FakeGraphClient:
+    """In-memory agent graph answering the executor's Cypher queries by identity."""
+
+    def __init__(self, latency: str = "none") -> None:
+        self.agents = {}
+        self.edges = {}
+        self.latency = latency_sampler(latency)
+        self.queries = 0
+        self._lock = threading.Lock()
+
+    def add_agent(self, node_id: str, system_message: str = "System", user_message: str = "Continue") -> str:
+        self.agents[node_id] = {"system_message": system_message, "user_message": user_message}
+        self.edges.setdefault(node_id, [])
+        return node_id
+
+    def add_edge(self, from_id: str, to_id: str) -> None:
+        self.edges[from_id].append(to_id)
+
+    def add_chain(self, prefix: str, length: int) -> str:
+        """Add a linear NEXT_AGENT chain and return its first node id."""
+        node_ids = [self.add_agent(f"{prefix}-{index}") for index in range(length)]
+        for from_id, to_id in zip(node_ids, node_ids[1:]):
+            self.add_edge(from_id, to_id)
+        return node_ids[0]
+
+    def add_fan_out(self, prefix: str, width: int) -> str:
+        """Add a source -> width branches -> sink diamond and return the source id."""
+        source = self.add_agent(f"{prefix}-source")
+        sink = self.add_agent(f"{prefix}-sink")
+        for index in range(width):
+            branch = self.add_agent(f"{prefix}-branch-{index}")
+            self.add_edge(source, branch)
+            self.add_edge(branch, sink)
+        return source
+
+    @contextmanager
+    def session(self):
+        """No-op stand-in for GraphClient.session."""
+        yield self
+
+    def _record(self, node_id: str) -> dict:
+        return {"node_id": node_id, **self.agents[node_id]}
+
+    def _reachable(self, node_id: str) -> list[str]:
+        seen, stack, order = set(), [node_id], []
+        while stack:
+            current = stack.pop()
+            if current in seen or current not in self.agents:
+                continue
+            seen.add(current)
+            order.append(current)
+            stack.extend(reversed(self.edges[current]))
+        return order
+
+    def execute_query(self, query: str, parameters: dict = None, name: str = None) -> list[dict]:
+        with self._lock:
+            self.queries += 1
+        _sleep(self.latency())
+        node_id = (parameters or {}).get("node_id")
+        if query == AGENT_MESSAGES_QUERY:
+            return [dict(self.agents[node_id])] if node_id in self.agents else []
+        if query == NEXT_AGENT_QUERY:
+            return [{"next_agent_id": next_id, **self.agents[next_id]} for next_id in self.edges.get(node_id, ())]
+        if query in (WORKFLOW_PATH_QUERY, WORKFLOW_GRAPH_QUERY):
+            return [{**self._record(reachable_id), "next_agent_ids": list(self.edges[reachable_id])}
+                    for reachable_id in self._reachable(node_id)]
+        if query == GRAPH_VERSION_QUERY:
+            return [{"version": 0}]
+        raise ValueError(f"❌ FakeGraphClient cannot answer query: {query}")
+
+    read = write = execute_query
+
+class FakeLLMClient:
+    """LLM stand-in with a configurable latency distribution and a fixed-size response."""
+
+    def __init__(self, latency: str = "none", response_chars: int = 200) -> None:
+        self.latency = latency_sampler(latency)
+        self.body = json.dumps({"response": "x" * response_chars})
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def call_llm(self, system_message: str, user_message: str, use_cache: bool = True) -> dict:
+        with self._lock:
+            self.calls += 1
+        _sleep(self.latency())
+        return {"statusCode": 200, "body": self.body}
+
+@contextmanager
+def fake_backends(graph: FakeGraphClient, llm: FakeLLMClient):
+    """Point the executors at the fake graph and LLM for the duration of the block."""
+    targets = [
+        (agent_processor, "graph_client", graph),
+        (workflow_loader, "graph_client", graph),
+        (agent_processor, "llm_client", llm),
+        (dag_executor, "llm_client", llm),
+    ]
+    originals = [(module, name, getattr(module, name)) for module, name, _ in targets]
+    for module, name, fake in targets:
+        setattr(module, name, fake)
+    try:
+        yield graph, llm
+    finally:
+        for module, name, original in originals:
+            setattr(module, name, original)
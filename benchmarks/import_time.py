@@ -0,0 +1,58 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Cold-import budget for the executor entry points, in seconds
+IMPORT_TIME_BUDGET_S = 1.5
+
+# Settings stripped so the import cannot lean on a configured environment
+_CONFIG_VARS = ("GRAPH_DB_TYPE", "NEO4J_URI", "NEO4J_USER", "NEO4J_PASSWORD", "LLM_PROVIDER")
+
+_PROBE = """
+import time
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+"""
+
+def measure_import_time(module: str = "src.agent_processor", runs: int = 3) -> dict:
+    """Median cold-import time of module, each run in a fresh interpreter with no config.
+
+    The probe runs in an empty working directory, so it also reports
+    whether importing created any files (such as the logs/ directory).
+    """
+    env = {key: value for key, value in os.environ.items() if key not in _CONFIG_VARS}
+    env["PYTHONPATH"] = PROJECT_ROOT
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    samples = []
+    created = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as cwd:
+            completed = subprocess.run([sys.executable, "-c", _PROBE.format(module=module)],
+                                       cwd=cwd, env=env, capture_output=True, text=True)
+            if completed.returncode != 0:
+                raise RuntimeError(f"❌ Importing {module} failed: {completed.stderr.strip()}")
+            samples.append(float(completed.stdout.strip().splitlines()[-1]))
+            created = sorted(os.listdir(cwd))
+    return {"module": module, "seconds": statistics.median(samples), "runs": runs, "created_files": created}
+
+def main(argv: list[str] = None) -> int:
+    """Command-line entry point: python -m benchmarks.import_time [--budget SECONDS]"""
+    parser = argparse.ArgumentParser(description="Check that cold imports stay under a time budget.")
+    parser.add_argument("--module", default="src.agent_processor")
+    parser.add_argument("--budget", type=float, default=IMPORT_TIME_BUDGET_S)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    result = measure_import_time(args.module, args.runs)
+    within = result["seconds"] <= args.budget
+    print(f"{'✅' if within else '❌'} import {result['module']}: {result['seconds'] * 1000:.0f} ms (budget {args.budget * 1000:.0f} ms)")
+    return 0 if within else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from helper.logger import logger  # Import centralized logger
+from src.agent_processor import process_agent, process_workflow
+from src.dag_executor import process_dag
+from src.workflow_cache import workflow_cache
+from benchmarks.fakes import FakeGraphClient, FakeLLMClient, fake_backends
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def _timed(fn, *args, **kwargs) -> float:
+    """Run fn once and return its wall time in seconds."""
+    started = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - started
+
+def _engines(length: int) -> dict:
+    """The sequential executors, keyed by report name."""
+    return {
+        "process_agent": lambda node_id: process_agent(node_id, max_hops=length),
+        "process_agent_overlap": lambda node_id: process_agent(node_id, overlap=True, max_hops=length),
+        "process_workflow": process_workflow,
+        "process_dag": process_dag,
+    }
+
+def bench_per_hop_overhead(length: int, repeats: int) -> dict:
+    """Engine cost per hop with zero-latency backends (microseconds, median of repeats)."""
+    graph, llm = FakeGraphClient(), FakeLLMClient()
+    start = graph.add_chain("overhead", length)
+    results = {}
+    with fake_backends(graph, llm):
+        for name, engine in _engines(length).items():
+            workflow_cache.invalidate()
+            engine(start)  # Warm-up; also primes the compiled-plan cache
+            samples = [_timed(engine, start) for _ in range(repeats)]
+            results[name] = {"us_per_hop": statistics.median(samples) / length * 1e6}
+    return {"chain_length": length, "repeats": repeats, "engines": results}
+
+def bench_throughput(concurrency_levels: list[int], runs: int, length: int, llm_latency: str, graph_latency: str) -> dict:
+    """Completed runs per second and run latency at several levels of concurrency."""
+    graph, llm = FakeGraphClient(graph_latency), FakeLLMClient(llm_latency)
+    start = graph.add_chain("throughput", length)
+    results = {}
+    with fake_backends(graph, llm):
+        workflow_cache.invalidate()
+        for concurrency in concurrency_levels:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                started = time.perf_counter()
+                latencies = list(executor.map(lambda _: _timed(process_workflow, start), range(runs)))
+                elapsed = time.perf_counter() - started
+            results[str(concurrency)] = {
+                "runs_per_sec": runs / elapsed,
+                "p50_ms": _percentile(latencies, 0.50) * 1000,
+                "p95_ms": _percentile(latencies, 0.95) * 1000,
+            }
+    return {"runs": runs, "chain_length": length, "llm_latency": llm_latency,
+            "graph_latency": graph_latency, "concurrency": results}
+
+def bench_chain_scaling(lengths: list[int], repeats: int) -> dict:
+    """Per-hop overhead as the chain grows; flat numbers mean no per-run O(n^2) work."""
+    results = {}
+    for length in lengths:
+        graph, llm = FakeGraphClient(), FakeLLMClient()
+        start = graph.add_chain(f"chain{length}", length)
+        with fake_backends(graph, llm):
+            workflow_cache.invalidate()
+            results[str(length)] = {
+                name: statistics.median(_timed(engine, start) for _ in range(repeats)) / length * 1e6
+                for name, engine in _engines(length).items()
+            }
+    return {"repeats": repeats, "us_per_hop": results}
+
+def bench_fan_out(widths: list[int], llm_latency_ms: float) -> dict:
+    """DAG wall time against the ideal critical path (source, one branch, sink)."""
+    results = {}
+    critical_path_ms = 3 * llm_latency_ms
+    for width in widths:
+        graph, llm = FakeGraphClient(), FakeLLMClient(f"fixed:{llm_latency_ms}")
+        start = graph.add_fan_out(f"fan{width}", width)
+        with fake_backends(graph, llm):
+            wall_ms = _timed(process_dag, start, max_workers=width) * 1000
+        results[str(width)] = {"wall_ms": wall_ms, "efficiency": critical_path_ms / wall_ms}
+    return {"llm_latency_ms": llm_latency_ms, "critical_path_ms": critical_path_ms, "width": results}
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+def run_benchmarks(quick: bool = False, llm_latency: str = "lognormal:20:0.5", graph_latency: str = "fixed:1") -> dict:
+    """Run every benchmark and return the report."""
+    repeats = 3 if quick else 10
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "quick": quick,
+        "per_hop_overhead": bench_per_hop_overhead(20 if quick else 100, repeats),
+        "throughput": bench_throughput([1, 4] if quick else [1, 8, 32], 8 if quick else 64, 3 if quick else 5,
+                                       llm_latency, graph_latency),
+        "chain_scaling": bench_chain_scaling([1, 10, 50] if quick else [1, 10, 100, 500], repeats),
+        "fan_out": bench_fan_out([1, 4] if quick else [1, 2, 4, 8, 16], 5 if quick else 20),
+    }
+
+def _flatten(report: dict, prefix: str = "") -> dict:
+    """Map dotted paths to the numeric leaves of a report."""
+    flat = {}
+    for key, value in report.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+def compare_reports(baseline: dict, current: dict) -> dict:
+    """Ratio current/baseline for every metric present in both reports."""
+    before, after = _flatten(baseline), _flatten(current)
+    return {path: after[path] / before[path] for path in sorted(before.keys() & after.keys()) if before[path]}
+
+def main(argv: list[str] = None) -> dict:
+    """Command-line entry point: python -m benchmarks.run --output bench.json"""
+    parser = argparse.ArgumentParser(description="Benchmark GenFlow engine overhead against fake backends.")
+    parser.add_argument("--output", default="bench_report.json", help="JSON report to write")
+    parser.add_argument("--compare", help="Earlier JSON report to print current/baseline ratios against")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes for a fast smoke run")
+    parser.add_argument("--llm-latency", default="lognormal:20:0.5", help="Fake LLM latency spec")
+    parser.add_argument("--graph-latency", default="fixed:1", help="Fake graph latency spec for the throughput run")
+    args = parser.parse_args(argv)
+
+    level = logger.level
+    logger.setLevel(logging.WARNING)  # Per-hop info logs would dominate the measurement
+    try:
+        report = run_benchmarks(args.quick, args.llm_latency, args.graph_latency)
+    finally:
+        logger.setLevel(level)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"✅ Benchmark report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            for path, ratio in compare_reports(json.load(f), report).items():
+                print(f"{path}: {ratio:.2f}x")
+    return report
+
+if __name__ == "__main__":
+    main()
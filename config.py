@@ -5,13 +5,70 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Graph Database Configuration
-GRAPH_DB_TYPE = os.getenv("GRAPH_DB_TYPE")
-NEO4J_URI = os.getenv("NEO4J_URI")
+GRAPH_DB_TYPE = os.getenv("GRAPH_DB_TYPE")  # neo4j, memory (in-process, for local runs and CI) or sqlite (embedded file)
+NEO4J_URI = os.getenv("NEO4J_URI")  # Use neo4j:// (not bolt://) so reads are routed across cluster members
 NEO4J_USER = os.getenv("NEO4J_USER")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
+NEO4J_MAX_CONNECTION_POOL_SIZE = int(os.getenv("NEO4J_MAX_CONNECTION_POOL_SIZE", "100"))  # Max connections per host
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "60"))  # Seconds to wait for a free connection
+NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))  # Seconds before a pooled connection is retired
+NEO4J_CONNECTION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_TIMEOUT", "30"))  # Seconds to establish a new connection
+NEO4J_KEEP_ALIVE = os.getenv("NEO4J_KEEP_ALIVE", "true").lower() == "true"  # TCP keep-alive on pooled connections
+GRAPH_STREAM_FETCH_SIZE = int(os.getenv("GRAPH_STREAM_FETCH_SIZE", "1000"))  # Records pulled per round trip by stream_query
+GRAPH_MEMORY_WORKFLOWS = os.getenv("GRAPH_MEMORY_WORKFLOWS")  # Comma-separated workflow files loaded when GRAPH_DB_TYPE=memory
+GRAPH_SQLITE_PATH = os.getenv("GRAPH_SQLITE_PATH", "graph.sqlite3")  # SQLite file used when GRAPH_DB_TYPE=sqlite
 
 # LLM Configuration
 LLM_PROVIDER = os.getenv("LLM_PROVIDER")  # deepseek, openai, anthropic
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
 CLAUDE_API_KEY = os.getenv("CLAUDE_API_KEY")
+
+# Workflow Execution Configuration
+DAG_MAX_WORKERS = int(os.getenv("DAG_MAX_WORKERS", "4"))  # Max agents running concurrently in a DAG
+ASYNC_MAX_CONCURRENT_RUNS = int(os.getenv("ASYNC_MAX_CONCURRENT_RUNS", "200"))  # Workflow runs in flight per event loop
+AGENT_PREFETCH_ENABLED = os.getenv("AGENT_PREFETCH_ENABLED", "false").lower() == "true"  # Overlap next-agent lookup with the LLM call
+AGENT_PREFETCH_WORKERS = int(os.getenv("AGENT_PREFETCH_WORKERS", "8"))  # Background lookup threads
+WORKFLOW_MAX_HOPS = int(os.getenv("WORKFLOW_MAX_HOPS", "0"))  # Optional safety cap on agents run per workflow (0 = unlimited); unbounded cycles are rejected anyway
+AGENT_BATCH_ENABLED = os.getenv("AGENT_BATCH_ENABLED", "false").lower() == "true"  # Coalesce concurrent agent lookups into UNWIND queries
+AGENT_BATCH_WINDOW_MS = float(os.getenv("AGENT_BATCH_WINDOW_MS", "2"))  # How long a lookup waits for others to join its batch
+AGENT_BATCH_MAX_SIZE = int(os.getenv("AGENT_BATCH_MAX_SIZE", "256"))  # Ids per batched query; a full batch is sent immediately
+
+# Batch Runner Configuration
+BATCH_FETCH_WORKERS = int(os.getenv("BATCH_FETCH_WORKERS", "4"))  # Concurrent graph-fetch workers
+BATCH_LLM_WORKERS = int(os.getenv("BATCH_LLM_WORKERS", "16"))  # Concurrent workflow/LLM workers
+BATCH_QUEUE_SIZE = int(os.getenv("BATCH_QUEUE_SIZE", "64"))  # Max records buffered between stages
+
+# Workflow Cache Configuration
+WORKFLOW_CACHE_MAX_ENTRIES = int(os.getenv("WORKFLOW_CACHE_MAX_ENTRIES", "1024"))  # LRU capacity
+WORKFLOW_CACHE_TTL = float(os.getenv("WORKFLOW_CACHE_TTL", "300"))  # Seconds before a plan is reloaded
+WORKFLOW_VERSION_CHECK_INTERVAL = float(os.getenv("WORKFLOW_VERSION_CHECK_INTERVAL", "1.0"))  # Seconds between version checks
+
+# Workflow Import/Export Configuration
+WORKFLOW_IMPORT_BATCH_SIZE = int(os.getenv("WORKFLOW_IMPORT_BATCH_SIZE", "1000"))  # Rows per UNWIND write transaction
+WORKFLOW_RESET_BATCH_SIZE = int(os.getenv("WORKFLOW_RESET_BATCH_SIZE", "10000"))  # Nodes deleted per transaction by reset_namespace
+
+# Checkpoint Configuration
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "checkpoints.sqlite3")  # SQLite file for per-hop checkpoints
+
+# LLM Response Cache Configuration
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"  # Serve repeated requests from cache
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))  # Seconds a cached response stays valid
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))  # In-process LRU capacity
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")  # On-disk tier; empty disables it
+LLM_CACHE_DISK_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", "100000"))  # On-disk tier capacity
+
+# Context Budget Configuration
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "0"))  # Default max tokens of prev_response per agent (0 = unlimited)
+CONTEXT_TRIM_POLICY = os.getenv("CONTEXT_TRIM_POLICY", "middle_out")  # head, tail or middle_out
+
+# Summarization Configuration
+SUMMARIZE_THRESHOLD_CHARS = int(os.getenv("SUMMARIZE_THRESHOLD_CHARS", "0"))  # Summarize outputs longer than this before the next hop (0 = off)
+SUMMARY_MAX_CHARS = int(os.getenv("SUMMARY_MAX_CHARS", "2000"))  # Target summary length
+SUMMARIZER = os.getenv("SUMMARIZER", "extractive")  # extractive (local) or llm
+SUMMARIZER_MODEL = os.getenv("SUMMARIZER_MODEL")  # Cheaper model for the llm summarizer; defaults to the provider's model
+
+# Tracing Configuration
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")  # none, jsonl or otlp
+TRACE_PATH = os.getenv("TRACE_PATH", "traces.jsonl")  # Local file for jsonl spans or OTLP/JSON batches
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT")  # OTLP/HTTP collector URL, e.g. http://localhost:4318/v1/traces
@@ -1,21 +1,40 @@
 import logging
 import os
 
-# Ensure logs directory exists
+# Log directory and file; nothing is created until the first record is written
 LOG_DIR = "logs"
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
-
-# Define log file
 LOG_FILE = os.path.join(LOG_DIR, "app.log")
 
+class LazyFileHandler(logging.FileHandler):
+    """FileHandler that creates the log directory and file on the first record.
+
+    Importing the logger touches no files, and on a read-only filesystem
+    the file handler quietly stands down while console logging continues.
+    """
+
+    def __init__(self, filename: str) -> None:
+        super().__init__(filename, delay=True)
+        self.unavailable = False
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.unavailable:
+            return
+        if self.stream is None:
+            try:
+                os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+                self.stream = self._open()
+            except OSError:
+                self.unavailable = True
+                return
+        super().emit(record)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,  # Change to DEBUG for detailed logs
     format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
     handlers=[
-        logging.FileHandler(LOG_FILE),  # Save logs to file
-        logging.StreamHandler()         # Print logs to console
+        LazyFileHandler(LOG_FILE),  # Save logs to file
+        logging.StreamHandler()     # Print logs to console
     ]
 )
 
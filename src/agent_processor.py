@@ -1,6 +1,11 @@
+import contextvars
 import json
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
 from helper.logger import logger  # Import centralized logger
 
 # Ensure the project root is added to sys.path
@@ -8,57 +13,442 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(PROJECT_ROOT)
 
 # Import graph and LLM clients using absolute paths
+from config import AGENT_BATCH_ENABLED, AGENT_PREFETCH_ENABLED, AGENT_PREFETCH_WORKERS, WORKFLOW_MAX_HOPS
 from src.graph_client import graph_client
-from src.llm_client import llm_client
+from src.batch_loader import BatchLoader
+from src.checkpoint_store import checkpoint_store
+from src.context_budget import fit_context
+from src.llm_client import llm_client, parse_llm_response
+from src.summarizer import summarize_for_next_hop
+from src.tracing import tracer
+from src.workflow_cache import workflow_cache
+from src.workflow_loader import LoopSpec, WorkflowGraph, WorkflowPlan, choose_next_agent, load_workflow_graph
+
+AGENT_MESSAGES_QUERY = """
+MATCH (a:Agent) 
+WHERE elementId(a) = $node_id
+RETURN a.system_message AS system_message, a.user_message AS user_message, a.cache_llm AS cache_llm,
+       a.context_budget AS context_budget, a.context_policy AS context_policy
+"""
+
+# max_iterations/until are set on bounded loop edges (see LoopSpec)
+NEXT_AGENT_QUERY = """
+MATCH (a:Agent)-[r:NEXT_AGENT]->(next:Agent)
+WHERE elementId(a) = $node_id
+RETURN elementId(next) AS next_agent_id, next.system_message AS system_message, next.user_message AS user_message,
+       next.cache_llm AS cache_llm, next.context_budget AS context_budget, next.context_policy AS context_policy,
+       r.max_iterations AS max_iterations, r.until AS until
+"""
+
+# Batched forms of the two lookups above: one round trip for many node ids
+AGENTS_BATCH_QUERY = """
+UNWIND $ids AS node_id
+MATCH (a:Agent)
+WHERE elementId(a) = node_id
+RETURN node_id, a.system_message AS system_message, a.user_message AS user_message, a.cache_llm AS cache_llm,
+       a.context_budget AS context_budget, a.context_policy AS context_policy
+"""
+
+NEXT_AGENTS_BATCH_QUERY = """
+UNWIND $ids AS node_id
+MATCH (a:Agent)-[r:NEXT_AGENT]->(next:Agent)
+WHERE elementId(a) = node_id
+RETURN node_id, elementId(next) AS next_agent_id, next.system_message AS system_message, next.user_message AS user_message,
+       next.cache_llm AS cache_llm, next.context_budget AS context_budget, next.context_policy AS context_policy,
+       r.max_iterations AS max_iterations, r.until AS until
+"""
+
+# Background threads for next-agent lookups in overlap mode
+_prefetch_executor = ThreadPoolExecutor(max_workers=AGENT_PREFETCH_WORKERS, thread_name_prefix="agent-prefetch")
+
+@dataclass
+class RunState:
+    """Explicit state carried between hops of a workflow run.
+
+    Only the data the next hop needs is kept: the node to run next, the
+    previous agent's response, a hop counter, the loop edge counts and the
+    agents run since the last loop edge (to spot unbounded cycles).
+    """
+    node_id: Optional[str]
+    prev_response: str = ""
+    hops: int = 0
+    iterations: dict = field(default_factory=dict)  # (from_id, to_id) -> times a loop edge was taken
+    forward_path: set = field(default_factory=set)
+
+    def __post_init__(self) -> None:
+        self.forward_path.add(self.node_id)
+
+    def consume_response(self) -> str:
+        """Hand the previous response to the current hop and drop our reference."""
+        response, self.prev_response = self.prev_response, ""
+        return response
+
+    def advance(self, next_node_id: Optional[str], response: str) -> None:
+        """Record a finished hop and move on to next_node_id (None ends the run)."""
+        self.node_id = next_node_id
+        self.prev_response = response
+        self.hops += 1
+
+    def closes_cycle(self, next_record: Optional[dict]) -> bool:
+        """Whether following next_record repeats an agent without crossing a loop edge.
+
+        Forward edges are chosen deterministically, so such a repeat would
+        go round the cycle forever. Taking a bounded loop edge starts a new
+        forward path.
+        """
+        if next_record is None:
+            return False
+        next_id = next_record.get("next_agent_id")
+        if next_record.get("max_iterations") is not None:
+            self.forward_path = {next_id}
+            return False
+        if next_id in self.forward_path:
+            return True
+        self.forward_path.add(next_id)
+        return False
+
+def get_agents(node_ids: list[str]) -> dict:
+    """Fetch the messages of many agents with one query: {node_id: [record]}."""
+    return graph_client.execute_batch(AGENTS_BATCH_QUERY, node_ids, name="agents_batch")
+
+def get_next_agents(node_ids: list[str]) -> dict:
+    """Find the next agent of many agents with one query: {node_id: [record, ...]}."""
+    return graph_client.execute_batch(NEXT_AGENTS_BATCH_QUERY, node_ids, name="next_agents_batch")
+
+# Coalesce lookups from concurrent runs when AGENT_BATCH_ENABLED
+_agent_loader = BatchLoader(get_agents, default_factory=list)
+_next_agent_loader = BatchLoader(get_next_agents, default_factory=list)
 
 def get_agent_messages(node_id: str) -> list[dict]:
     """Fetch agent's messages from the graph database."""
-    query = """
-    MATCH (a:Agent) 
-    WHERE elementId(a) = $node_id
-    RETURN a.system_message AS system_message, a.user_message AS user_message
-    """
-    return graph_client.execute_query(query, {"node_id": node_id})
+    if AGENT_BATCH_ENABLED:
+        return _agent_loader.load(node_id)
+    return graph_client.read(AGENT_MESSAGES_QUERY, {"node_id": node_id}, name="agent_messages")
 
 def get_next_agent(node_id: str) -> list[dict]:
     """Find the next agent in sequence."""
-    query = """
-    MATCH (a:Agent)-[:NEXT_AGENT]->(next:Agent)
-    WHERE elementId(a) = $node_id
-    RETURN elementId(next) AS next_agent_id, next.system_message AS system_message, next.user_message AS user_message
+    if AGENT_BATCH_ENABLED:
+        return _next_agent_loader.load(node_id)
+    return graph_client.read(NEXT_AGENT_QUERY, {"node_id": node_id}, name="next_agent")
+
+def next_agent_record(node_id: str, next_agent_data: list[dict], response: str, iterations: dict) -> Optional[dict]:
+    """Pick the NEXT_AGENT record to follow after node_id, or None at the end of the workflow.
+
+    Bounded loop edges (max_iterations/until on the edge) are followed like
+    WorkflowGraph.next_agent does; `iterations` carries the loop counts of
+    the run.
     """
-    return graph_client.execute_query(query, {"node_id": node_id})
+    loops = {
+        (node_id, record["next_agent_id"]): LoopSpec(int(record["max_iterations"]), record.get("until"))
+        for record in next_agent_data if record.get("max_iterations") is not None
+    }
+    next_id = choose_next_agent(node_id, [record.get("next_agent_id") for record in next_agent_data], loops, response, iterations)
+    return next((record for record in next_agent_data if record.get("next_agent_id") == next_id), None) if next_id is not None else None
+
+def run_workflow(plan: WorkflowPlan, prev_response: str = "") -> str:
+    """Execute a compiled workflow plan without any further graph calls."""
+    if not plan.agents:
+        logger.warning(f"❌ No agent found with node_id {plan.start_node_id}")
+        return prev_response
+
+    state = RunState(node_id=plan.start_node_id, prev_response=prev_response)
+    last_index = len(plan.agents) - 1
+    for index, agent in enumerate(plan):
+        context = fit_context(state.consume_response(), agent.context_budget, agent.context_policy)
+        full_message = agent.user_message + " " + context
+        del context
+        response, error = parse_llm_response(llm_client.call_llm(agent.system_message, full_message, use_cache=agent.cache_llm))
+        del full_message
+
+        if error:
+            error_msg = f"LLM API Error: {error}"
+            logger.error(f"❌ {error_msg}")
+            return f"Error processing agent: {error_msg}"
+
+        logger.info(f"✅ Agent (ID {agent.node_id}) Response: {response}")
+        # The next agent gets a summary of oversized outputs; the last output is kept raw
+        state.advance(agent.node_id, response if index == last_index else summarize_for_next_hop(response))
+
+    logger.info("✅ Reached the last agent.")
+    return state.prev_response
+
+def _hop_limit_error(node_id: str, max_hops: int) -> str:
+    """Log and return the error message for a run that exceeded max_hops."""
+    error_msg = f"Workflow exceeded {max_hops} hops at agent {node_id}"
+    logger.error(f"❌ {error_msg}")
+    return error_msg
 
-def process_agent(node_id: str, prev_response: str = "") -> str:
-    """Recursive function to process agents."""
-    
-    agent_data = get_agent_messages(node_id)
+def _cycle_error(node_id: str, next_id: str) -> str:
+    """Log and return the error message for a run that entered an unbounded NEXT_AGENT cycle."""
+    error_msg = f"Workflow contains a NEXT_AGENT cycle without max_iterations: agent {node_id} leads back to {next_id}"
+    logger.error(f"❌ {error_msg}")
+    return error_msg
 
-    if not agent_data:
-        logger.warning(f"❌ No agent found with node_id {node_id}")
+def loop_iterations(hops: list[dict]) -> dict:
+    """Rebuild the loop edge counts of a checkpointed run from its completed hops.
+
+    One batched lookup fetches the outgoing edges of every agent run, and
+    each step of the run that followed a loop edge is counted.
+    """
+    node_ids = list(dict.fromkeys(hop["node_id"] for hop in hops[:-1]))
+    next_agents = get_next_agents(node_ids) if node_ids else {}
+    iterations = {}
+    for hop, next_hop in zip(hops, hops[1:]):
+        for record in next_agents.get(hop["node_id"], ()):
+            if str(record.get("next_agent_id")) == next_hop["node_id"] and record.get("max_iterations") is not None:
+                edge = (hop["node_id"], record["next_agent_id"])
+                iterations[edge] = iterations.get(edge, 0) + 1
+    return iterations
+
+def run_workflow_graph(graph: WorkflowGraph, prev_response: str = "", max_hops: int = WORKFLOW_MAX_HOPS) -> str:
+    """Execute a compiled workflow graph one agent at a time, following bounded loops.
+
+    After each agent, WorkflowGraph.next_agent picks a loop edge while it
+    has iterations left and its `until` predicate has not matched, and the
+    forward edge otherwise. A positive max_hops caps the total number of
+    agents run.
+    """
+    if not graph.agents:
+        logger.warning(f"❌ No agent found with node_id {graph.start_node_id}")
         return prev_response
 
-    system_message = agent_data[0].get('system_message', 'No system message found')
-    user_message = agent_data[0].get('user_message', 'No user message found')
+    state = RunState(node_id=graph.start_node_id, prev_response=prev_response)
+    while state.node_id is not None:
+        if max_hops and state.hops >= max_hops:
+            return f"Error processing agent: {_hop_limit_error(state.node_id, max_hops)}"
 
-    full_message = user_message + " " + prev_response
+        agent = graph.agents[state.node_id]
+        context = fit_context(state.consume_response(), agent.context_budget, agent.context_policy)
+        full_message = agent.user_message + " " + context
+        del context
+        response, error = parse_llm_response(llm_client.call_llm(agent.system_message, full_message, use_cache=agent.cache_llm))
+        del full_message
 
-    response_dict = llm_client.call_llm(system_message, full_message)
-    
-    # Check if there's an error in the response
-    if "error" in response_dict:
-        error_msg = f"LLM API Error: {response_dict.get('error')}"
-        logger.error(f"❌ {error_msg}")
-        return f"Error processing agent: {error_msg}"
-    
-    response = response_dict.get("response", "No response found")
-    logger.info(f"✅ Agent (ID {node_id}) Response: {response}")
+        if error:
+            error_msg = f"LLM API Error: {error}"
+            logger.error(f"❌ {error_msg}")
+            return f"Error processing agent: {error_msg}"
 
-    next_agent_data = get_next_agent(node_id)
+        logger.info(f"✅ Agent (ID {agent.node_id}) Response: {response}")
+        next_node_id = graph.next_agent(agent.node_id, response, state.iterations)
+        state.advance(next_node_id, response if next_node_id is None else summarize_for_next_hop(response))
 
-    if next_agent_data:
-        next_node_id = next_agent_data[0].get('next_agent_id', None)
-        return process_agent(next_node_id, response)
-    
     logger.info("✅ Reached the last agent.")
-    return response
+    return state.prev_response
+
+def process_workflow_graph(node_id: str, prev_response: str = "", max_hops: int = WORKFLOW_MAX_HOPS) -> str:
+    """Load the workflow graph reachable from node_id, loops included, and run it sequentially."""
+    return run_workflow_graph(load_workflow_graph(node_id), prev_response, max_hops)
+
+def process_workflow(node_id: str, prev_response: str = "") -> str:
+    """Execute the agent chain from its cached compiled plan.
+
+    A cold start fetches the whole chain in one query; a warm start only
+    checks the graph version stamp.
+    """
+    return run_workflow(workflow_cache.get(node_id), prev_response)
+
+def process_agent(node_id: str, prev_response: str = "", overlap: bool = AGENT_PREFETCH_ENABLED,
+                  run_id: str = None, max_hops: int = WORKFLOW_MAX_HOPS, iterations: dict = None) -> str:
+    """Process the agent chain starting at node_id, one hop at a time.
+
+    With overlap=True the next-agent lookup (which also returns the next
+    agent's messages) runs in the background while the current agent's LLM
+    call is in flight, so graph latency stays off the critical path.
+
+    With a run_id, every completed hop is checkpointed so a failed run can
+    be continued with resume(run_id); `iterations` carries the loop edge
+    counts of the resumed run. A run stops with an error before it repeats
+    an agent without crossing a bounded loop edge, and after max_hops
+    agents when max_hops is positive.
+    """
+    state = RunState(node_id=node_id, prev_response=prev_response, iterations=iterations or {})
+    agent_data = None  # Prefetched by the previous hop in overlap mode
+
+    # One graph session serves every query of the run
+    with graph_client.session(), tracer.span("workflow.run", node_id=node_id, run_id=run_id, overlap=overlap) as run_span:
+        if run_id is not None:
+            checkpoint_store.start_run(run_id, node_id, prev_response)
+
+        while state.node_id is not None:
+            if max_hops and state.hops >= max_hops:
+                if run_id is not None:
+                    checkpoint_store.finish_run(run_id, "failed")
+                error_msg = _hop_limit_error(state.node_id, max_hops)
+                run_span.record_error(error_msg)
+                return f"Error processing agent: {error_msg}"
+
+            with tracer.span("agent.hop", node_id=state.node_id, hop=state.hops) as hop_span:
+                if agent_data is None:
+                    agent_data = get_agent_messages(state.node_id)
+
+                if not agent_data:
+                    logger.warning(f"❌ No agent found with node_id {state.node_id}")
+                    hop_span.record_error("agent not found")
+                    break
+
+                system_message = agent_data[0].get('system_message', 'No system message found')
+                user_message = agent_data[0].get('user_message', 'No user message found')
+                use_cache = agent_data[0].get('cache_llm') is not False
+
+                # Copy the context so the background query span joins this hop's trace
+                next_lookup = _prefetch_executor.submit(contextvars.copy_context().run, get_next_agent, state.node_id) if overlap else None
+
+                # The previous output is only needed inside this hop's prompt
+                context = fit_context(state.consume_response(), agent_data[0].get('context_budget'), agent_data[0].get('context_policy'))
+                full_message = user_message + " " + context
+                del context
+                llm_result = llm_client.call_llm(system_message, full_message, use_cache=use_cache)
+                del full_message
+                with tracer.span("llm.parse"):
+                    response, error = parse_llm_response(llm_result)
+                del llm_result
+
+                # Check if there's an error in the response
+                if error:
+                    if next_lookup is not None:
+                        next_lookup.cancel()
+                    if run_id is not None:
+                        checkpoint_store.finish_run(run_id, "failed")
+                    error_msg = f"LLM API Error: {error}"
+                    logger.error(f"❌ {error_msg}")
+                    hop_span.record_error(error_msg)
+                    run_span.record_error(error_msg)
+                    return f"Error processing agent: {error_msg}"
+
+                logger.info(f"✅ Agent (ID {state.node_id}) Response: {response}")
+                if run_id is not None:
+                    checkpoint_store.save_hop(run_id, state.node_id, response)
+
+                if next_lookup is not None:
+                    wait_started = time.perf_counter()
+                    next_agent_data = next_lookup.result()
+                    hop_span.set("prefetch.wait_ms", (time.perf_counter() - wait_started) * 1000)
+                else:
+                    next_agent_data = get_next_agent(state.node_id)
+                next_record = next_agent_record(state.node_id, next_agent_data, response, state.iterations)
+                next_node_id = next_record.get('next_agent_id') if next_record else None
+                if state.closes_cycle(next_record):
+                    if run_id is not None:
+                        checkpoint_store.finish_run(run_id, "failed")
+                    error_msg = _cycle_error(state.node_id, next_node_id)
+                    hop_span.record_error(error_msg)
+                    run_span.record_error(error_msg)
+                    return f"Error processing agent: {error_msg}"
+                agent_data = [next_record] if overlap and next_record else None
+                # The next agent gets a summary of oversized outputs; the last output is kept raw
+                state.advance(next_node_id, response if next_node_id is None else summarize_for_next_hop(response))
+        else:
+            logger.info("✅ Reached the last agent.")
+
+        if run_id is not None:
+            checkpoint_store.finish_run(run_id, "completed")
+        run_span.set("hops", state.hops)
+        return state.prev_response
+
+def resume(run_id: str, overlap: bool = AGENT_PREFETCH_ENABLED) -> str:
+    """Continue a checkpointed run after its last completed agent."""
+    run = checkpoint_store.get_run(run_id)
+    if run is None:
+        logger.warning(f"❌ No checkpointed run found with run_id {run_id}")
+        return ""
+
+    last_hop = checkpoint_store.last_hop(run_id)
+    if run["status"] == "completed":
+        return last_hop["response"] if last_hop else run["prev_response"]
+
+    if last_hop is None:
+        logger.info(f"✅ Restarting run {run_id} from its first agent")
+        return process_agent(run["start_node_id"], run["prev_response"], overlap, run_id)
+
+    # Bounded loops continue from the iteration they were interrupted in
+    iterations = loop_iterations(checkpoint_store.hops(run_id))
+    next_record = next_agent_record(last_hop["node_id"], get_next_agent(last_hop["node_id"]), last_hop["response"], iterations)
+    if next_record is None:
+        checkpoint_store.finish_run(run_id, "completed")
+        return last_hop["response"]
+
+    logger.info(f"✅ Resuming run {run_id} after hop {last_hop['hop']} (agent {last_hop['node_id']})")
+    # Hand over the same (summarized) context an uninterrupted run would have passed on
+    return process_agent(next_record.get('next_agent_id'), summarize_for_next_hop(last_hop["response"]), overlap, run_id,
+                         iterations=iterations)
+
+def process_agent_stream(node_id: str, prev_response: str = "", max_hops: int = WORKFLOW_MAX_HOPS):
+    """Process the agent chain like process_agent, yielding events as they happen.
+
+    Events are dicts with a "type" of:
+    - "agent_started": node_id, hop
+    - "token": node_id, delta
+    - "agent_finished": node_id, hop, response, latency_ms, usage
+    - "run_failed": node_id, error
+    - "run_finished": response, hops, latency_ms
+    """
+    run_started = time.perf_counter()
+    state = RunState(node_id=node_id, prev_response=prev_response)
+
+    while state.node_id is not None:
+        if max_hops and state.hops >= max_hops:
+            yield {"type": "run_failed", "node_id": state.node_id, "error": _hop_limit_error(state.node_id, max_hops)}
+            return
+
+        agent_data = get_agent_messages(state.node_id)
+
+        if not agent_data:
+            logger.warning(f"❌ No agent found with node_id {state.node_id}")
+            break
+
+        system_message = agent_data[0].get('system_message', 'No system message found')
+        user_message = agent_data[0].get('user_message', 'No user message found')
+
+        yield {"type": "agent_started", "node_id": state.node_id, "hop": state.hops}
+        hop_started = time.perf_counter()
+
+        context = fit_context(state.consume_response(), agent_data[0].get('context_budget'), agent_data[0].get('context_policy'))
+        full_message = user_message + " " + context
+        del context
+        chunks = []
+        usage = {}
+        error = ""
+        for chunk in llm_client.stream_llm(system_message, full_message):
+            if "error" in chunk:
+                error = chunk["error"]
+                break
+            if chunk.get("delta"):
+                chunks.append(chunk["delta"])
+                yield {"type": "token", "node_id": state.node_id, "delta": chunk["delta"]}
+            usage = chunk.get("usage", usage)
+        del full_message
+
+        if error:
+            error_msg = f"LLM API Error: {error}"
+            logger.error(f"❌ {error_msg}")
+            yield {"type": "run_failed", "node_id": state.node_id, "error": error_msg}
+            return
+
+        response = "".join(chunks)
+        del chunks
+        logger.info(f"✅ Agent (ID {state.node_id}) Response: {response}")
+        yield {
+            "type": "agent_finished",
+            "node_id": state.node_id,
+            "hop": state.hops,
+            "response": response,
+            "latency_ms": (time.perf_counter() - hop_started) * 1000,
+            "usage": usage,
+        }
+
+        next_record = next_agent_record(state.node_id, get_next_agent(state.node_id), response, state.iterations)
+        next_node_id = next_record.get('next_agent_id') if next_record else None
+        if state.closes_cycle(next_record):
+            yield {"type": "run_failed", "node_id": state.node_id, "error": _cycle_error(state.node_id, next_node_id)}
+            return
+        state.advance(next_node_id, response if next_node_id is None else summarize_for_next_hop(response))
+    else:
+        logger.info("✅ Reached the last agent.")
+
+    yield {
+        "type": "run_finished",
+        "response": state.prev_response,
+        "hops": state.hops,
+        "latency_ms": (time.perf_counter() - run_started) * 1000,
+    }
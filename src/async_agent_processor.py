@@ -0,0 +1,79 @@
+import asyncio
+from config import ASYNC_MAX_CONCURRENT_RUNS, WORKFLOW_MAX_HOPS
+from helper.logger import logger  # Import centralized logger
+from src.agent_processor import (
+    AGENT_MESSAGES_QUERY, NEXT_AGENT_QUERY, RunState, _cycle_error, _hop_limit_error, next_agent_record, parse_llm_response,
+)
+from src.async_graph_client import async_graph_client
+from src.async_llm_client import async_llm_client
+from src.context_budget import fit_context
+from src.summarizer import needs_summary, summarize_for_next_hop
+
+async def get_agent_messages(node_id: str) -> list[dict]:
+    """Fetch agent's messages from the graph database."""
+    return await async_graph_client.read(AGENT_MESSAGES_QUERY, {"node_id": node_id})
+
+async def get_next_agent(node_id: str) -> list[dict]:
+    """Find the next agent in sequence."""
+    return await async_graph_client.read(NEXT_AGENT_QUERY, {"node_id": node_id})
+
+async def process_agent(node_id: str, prev_response: str = "", max_hops: int = WORKFLOW_MAX_HOPS) -> str:
+    """Process the agent chain starting at node_id without blocking the event loop.
+
+    Bounded loop edges are followed like the sync engine. A run stops with
+    an error before it repeats an agent without crossing a loop edge, and
+    after max_hops agents when max_hops is positive.
+    """
+    state = RunState(node_id=node_id, prev_response=prev_response)
+
+    while state.node_id is not None:
+        if max_hops and state.hops >= max_hops:
+            return f"Error processing agent: {_hop_limit_error(state.node_id, max_hops)}"
+
+        agent_data = await get_agent_messages(state.node_id)
+
+        if not agent_data:
+            logger.warning(f"❌ No agent found with node_id {state.node_id}")
+            return state.prev_response
+
+        system_message = agent_data[0].get('system_message', 'No system message found')
+        user_message = agent_data[0].get('user_message', 'No user message found')
+        use_cache = agent_data[0].get('cache_llm') is not False
+
+        context = fit_context(state.consume_response(), agent_data[0].get('context_budget'), agent_data[0].get('context_policy'))
+        full_message = user_message + " " + context
+        del context
+        response, error = parse_llm_response(await async_llm_client.call_llm(system_message, full_message, use_cache=use_cache))
+        del full_message
+
+        if error:
+            error_msg = f"LLM API Error: {error}"
+            logger.error(f"❌ {error_msg}")
+            return f"Error processing agent: {error_msg}"
+
+        logger.info(f"✅ Agent (ID {state.node_id}) Response: {response}")
+
+        next_record = next_agent_record(state.node_id, await get_next_agent(state.node_id), response, state.iterations)
+        next_node_id = next_record.get('next_agent_id') if next_record else None
+        if state.closes_cycle(next_record):
+            return f"Error processing agent: {_cycle_error(state.node_id, next_node_id)}"
+        if next_node_id is not None and needs_summary(response):
+            response = await asyncio.to_thread(summarize_for_next_hop, response)
+        state.advance(next_node_id, response)
+
+    logger.info("✅ Reached the last agent.")
+    return state.prev_response
+
+async def process_agents(node_ids: list[str], concurrency: int = ASYNC_MAX_CONCURRENT_RUNS) -> list[str]:
+    """Drive many workflow runs concurrently on the current event loop.
+
+    At most `concurrency` runs are in flight at once; results are returned
+    in the same order as node_ids.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(node_id: str) -> str:
+        async with semaphore:
+            return await process_agent(node_id)
+
+    return await asyncio.gather(*(run(node_id) for node_id in node_ids))
@@ -0,0 +1,90 @@
+from neo4j import AsyncGraphDatabase
+from config import (
+    GRAPH_DB_TYPE, NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_MAX_CONNECTION_POOL_SIZE,
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT, NEO4J_MAX_CONNECTION_LIFETIME, NEO4J_CONNECTION_TIMEOUT, NEO4J_KEEP_ALIVE,
+)
+from helper.logger import logger  # Import the logger
+from src.lazy import LazySingleton, LoopLocal
+
+class AsyncGraphClient:
+    """asyncio interface for interacting with Neo4j, built on the AsyncDriver."""
+
+    def __init__(self) -> None:
+        """Validate the configured provider; drivers are created inside the event loops that use them."""
+        if (GRAPH_DB_TYPE or "").lower() == "neo4j":
+            # A driver's connections are bound to the loop that opened them, so each
+            # loop (a warm Lambda or a script calling asyncio.run again) gets its own
+            # driver, closed when the loop shuts down; the bookmark manager is shared.
+            self._drivers = LoopLocal(self._new_driver, lambda driver: driver.close())
+            self.bookmark_manager = AsyncGraphDatabase.bookmark_manager()
+        else:
+            logger.error(f"❌ Unsupported GRAPH_DB_TYPE: {GRAPH_DB_TYPE}")
+            raise ValueError(f"❌ Unsupported GRAPH_DB_TYPE: {GRAPH_DB_TYPE}")
+
+    def _new_driver(self):
+        driver = AsyncGraphDatabase.driver(
+            NEO4J_URI,
+            auth=(NEO4J_USER, NEO4J_PASSWORD),
+            max_connection_pool_size=NEO4J_MAX_CONNECTION_POOL_SIZE,
+            connection_acquisition_timeout=NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+            max_connection_lifetime=NEO4J_MAX_CONNECTION_LIFETIME,
+            connection_timeout=NEO4J_CONNECTION_TIMEOUT,
+            keep_alive=NEO4J_KEEP_ALIVE,
+        )
+        logger.info("✅ Created async Neo4j driver")
+        return driver
+
+    async def driver(self):
+        """The AsyncDriver of the running event loop."""
+        return await self._drivers.get()
+
+    async def close(self) -> None:
+        """Close the running event loop's database connection."""
+        await self._drivers.aclose()
+        logger.info("✅ Closed async Neo4j connection")
+
+    async def read(self, query: str, parameters: dict = None) -> list[dict]:
+        """Run a read query in a managed transaction, routed to a reader on a cluster and retried on transient errors."""
+        try:
+            async with (await self.driver()).session(bookmark_manager=self.bookmark_manager) as session:
+                records = await session.execute_read(_collect, query, parameters or {})
+                logger.debug("✅ Executed Query: %s", query)
+                return records
+        except Exception as e:
+            logger.error(f"❌ Query Execution Failed: {e}")
+            return []
+
+    async def write(self, query: str, parameters: dict = None) -> list[dict]:
+        """Run a write query in a managed transaction on the leader, retried on transient errors."""
+        try:
+            async with (await self.driver()).session(bookmark_manager=self.bookmark_manager) as session:
+                records = await session.execute_write(_collect, query, parameters or {})
+                logger.debug("✅ Executed Query: %s", query)
+                return records
+        except Exception as e:
+            logger.error(f"❌ Query Execution Failed: {e}")
+            return []
+
+    async def execute_query(self, query: str, parameters: dict = None) -> list[dict]:
+        """Execute a Cypher query without blocking the event loop and return the results."""
+        try:
+            async with (await self.driver()).session(bookmark_manager=self.bookmark_manager) as session:
+                result = await session.run(query, parameters or {})
+                records = [record.data() async for record in result]
+                logger.debug("✅ Executed Query: %s", query)
+                return records
+        except Exception as e:
+            logger.error(f"❌ Query Execution Failed: {e}")
+            return []
+
+async def _collect(tx, query: str, parameters: dict) -> list[dict]:
+    """Transaction function: run the query and materialize its records before the transaction ends."""
+    result = await tx.run(query, parameters)
+    return [record.data() async for record in result]
+
+# Singleton instance, created on first use
+async_graph_client = LazySingleton(AsyncGraphClient)
+
+def get_async_graph_client() -> AsyncGraphClient:
+    """Return the shared AsyncGraphClient, creating its driver on the first call."""
+    return async_graph_client.get()
@@ -0,0 +1,49 @@
+import asyncio
+import httpx
+from src.lazy import LazySingleton, LoopLocal
+from src.llm_cache import request_key
+from src.llm_client import LLMClient
+
+class AsyncLLMClient(LLMClient):
+    """Non-blocking variant of LLMClient that shares a pooled httpx.AsyncClient per event loop."""
+
+    def __init__(self, max_connections: int = 100, timeout: float = 120.0) -> None:
+        """Initialize the client; the HTTP connection pool is created on first use."""
+        super().__init__()
+        self.limits = httpx.Limits(max_connections=max_connections)
+        self.timeout = timeout
+        # An httpx pool is bound to the loop that opened it, so each loop gets its
+        # own client, closed when the loop shuts down
+        self._http = LoopLocal(lambda: httpx.AsyncClient(limits=self.limits, timeout=self.timeout), lambda http: http.aclose())
+
+    async def aclose(self) -> None:
+        """Close the running event loop's HTTP connection pool."""
+        await self._http.aclose()
+
+    async def call_llm(self, system_message: str, user_message: str, use_cache: bool = True) -> dict:
+        """Route the request to the configured LLM provider without blocking the event loop."""
+        url, payload, headers = self.build_request(system_message, user_message)
+        key = request_key(self.provider, url, payload) if self.cache is not None and use_cache else None
+        if key is not None:
+            # The cache does blocking SQLite I/O; keep it off the event loop
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached
+
+        try:
+            response = self._format_response(await (await self._http.get()).post(url, json=payload, headers=headers))
+        except Exception as e:
+            return {
+                "statusCode": 500,
+                "error": f"Network error: {str(e)}"
+            }
+        if key is not None and response.get("statusCode") == 200:
+            await asyncio.to_thread(self.cache.put, key, response)
+        return response
+
+# Singleton async LLM client, created on first use
+async_llm_client = LazySingleton(AsyncLLMClient)
+
+def get_async_llm_client() -> AsyncLLMClient:
+    """Return the shared AsyncLLMClient, creating it on the first call."""
+    return async_llm_client.get()
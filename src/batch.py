@@ -0,0 +1,167 @@
+import argparse
+import json
+import queue
+import threading
+from config import BATCH_FETCH_WORKERS, BATCH_LLM_WORKERS, BATCH_QUEUE_SIZE
+from helper.logger import logger  # Import centralized logger
+from src.agent_processor import run_workflow
+from src.workflow_cache import workflow_cache
+
+# Marks the end of a stage's input
+_DONE = object()
+
+def _read_records(input_path: str):
+    """Yield (line_number, record) for each non-empty JSONL line."""
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict) or "node_id" not in record:
+                    raise ValueError("record must be an object with a node_id")
+            except ValueError as e:
+                yield line_number, {"error": f"Invalid input record: {e}"}
+                continue
+            yield line_number, record
+
+def _result(line_number: int, record: dict, **fields) -> dict:
+    """Build an output record that echoes the identifying input fields."""
+    result = {"line": line_number}
+    for key in ("id", "node_id"):
+        if key in record:
+            result[key] = record[key]
+    result.update(fields)
+    return result
+
+def _fetch_worker(fetch_queue: queue.Queue, llm_queue: queue.Queue, write_queue: queue.Queue,
+                  failed: threading.Event) -> None:
+    """Graph-fetch stage: compile each record's workflow plan."""
+    while True:
+        item = fetch_queue.get()
+        if item is _DONE:
+            return
+        if failed.is_set():
+            continue  # The writer is gone; drain without doing work
+        line_number, record = item
+        if "error" in record and "node_id" not in record:
+            write_queue.put(_result(line_number, record, error=record["error"]))
+            continue
+        try:
+            plan = workflow_cache.get(record["node_id"])
+        except Exception as e:
+            logger.error(f"❌ Workflow fetch failed on line {line_number}: {e}")
+            write_queue.put(_result(line_number, record, error=str(e)))
+            continue
+        llm_queue.put((line_number, record, plan))
+
+def _llm_worker(llm_queue: queue.Queue, write_queue: queue.Queue, failed: threading.Event) -> None:
+    """LLM stage: execute each compiled plan."""
+    while True:
+        item = llm_queue.get()
+        if item is _DONE:
+            return
+        if failed.is_set():
+            continue  # The writer is gone; drain without spending LLM calls
+        line_number, record, plan = item
+        try:
+            response = run_workflow(plan, record.get("prev_response", ""))
+        except Exception as e:
+            logger.error(f"❌ Workflow run failed on line {line_number}: {e}")
+            write_queue.put(_result(line_number, record, error=str(e)))
+            continue
+        write_queue.put(_result(line_number, record, response=response))
+
+def _writer(write_queue: queue.Queue, output, stats: dict, failed: threading.Event, failures: list) -> None:
+    """Output stage: stream results to the open output file as soon as they finish.
+
+    If writing fails, the error is kept in failures, failed is set so the
+    other stages stop working, and the queue is still drained so no
+    producer blocks on it.
+    """
+    while True:
+        result = write_queue.get()
+        if result is _DONE:
+            return
+        if failed.is_set():
+            continue
+        try:
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+        except Exception as e:
+            logger.error(f"❌ Writing batch results failed: {e}")
+            failures.append(e)
+            failed.set()
+            continue
+        stats["written"] += 1
+        if "error" in result:
+            stats["errors"] += 1
+
+def _start(count: int, target, *args) -> list[threading.Thread]:
+    """Start `count` daemon worker threads for a stage."""
+    threads = [threading.Thread(target=target, args=args, daemon=True) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+def _drain(threads: list[threading.Thread], stage_queue: queue.Queue) -> None:
+    """Signal every worker of a stage to stop and wait for them."""
+    for _ in threads:
+        stage_queue.put(_DONE)
+    for thread in threads:
+        thread.join()
+
+def run_batch(input_path: str, output_path: str,
+              fetch_workers: int = BATCH_FETCH_WORKERS,
+              llm_workers: int = BATCH_LLM_WORKERS,
+              queue_size: int = BATCH_QUEUE_SIZE) -> dict:
+    """Run every workflow request in a JSONL file through a pipelined batch.
+
+    Input records are streamed through graph-fetch, LLM and output-write
+    stages connected by bounded queues, so memory use is bounded by the
+    queue sizes rather than the input length. Results are written as JSONL
+    in completion order, each tagged with its input line number.
+    """
+    fetch_queue = queue.Queue(maxsize=queue_size)
+    llm_queue = queue.Queue(maxsize=queue_size)
+    write_queue = queue.Queue(maxsize=queue_size)
+    stats = {"read": 0, "written": 0, "errors": 0}
+    failed = threading.Event()
+    failures = []
+
+    # Opened before any thread starts, so a bad output path fails fast instead of stalling the pipeline
+    with open(output_path, "w", encoding="utf-8") as output:
+        writer = _start(1, _writer, write_queue, output, stats, failed, failures)
+        llm_threads = _start(llm_workers, _llm_worker, llm_queue, write_queue, failed)
+        fetch_threads = _start(fetch_workers, _fetch_worker, fetch_queue, llm_queue, write_queue, failed)
+
+        for item in _read_records(input_path):
+            if failed.is_set():
+                break
+            fetch_queue.put(item)  # Blocks when the pipeline is full
+            stats["read"] += 1
+
+        _drain(fetch_threads, fetch_queue)
+        _drain(llm_threads, llm_queue)
+        _drain(writer, write_queue)
+
+    if failures:
+        raise failures[0]
+
+    logger.info(f"✅ Batch finished: {stats['written']} result(s), {stats['errors']} error(s)")
+    return stats
+
+def main(argv: list[str] = None) -> dict:
+    """Command-line entry point: python -m src.batch requests.jsonl out.jsonl"""
+    parser = argparse.ArgumentParser(description="Run GenFlow workflows for every record in a JSONL file.")
+    parser.add_argument("input", help="JSONL file with one {\"node_id\": ...} request per line")
+    parser.add_argument("output", help="JSONL file to stream results to")
+    parser.add_argument("--fetch-workers", type=int, default=BATCH_FETCH_WORKERS)
+    parser.add_argument("--llm-workers", type=int, default=BATCH_LLM_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=BATCH_QUEUE_SIZE)
+    args = parser.parse_args(argv)
+    return run_batch(args.input, args.output, args.fetch_workers, args.llm_workers, args.queue_size)
+
+if __name__ == "__main__":
+    main()
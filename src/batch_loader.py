@@ -0,0 +1,116 @@
+import threading
+import time
+from concurrent.futures import Future
+from config import AGENT_BATCH_MAX_SIZE, AGENT_BATCH_WINDOW_MS
+from helper.logger import logger  # Import centralized logger
+
+class BatchLoader:
+    """Coalesce concurrent single-key lookups into one batched call (dataloader style).
+
+    The first load() in a window opens it; every key requested before it
+    closes (or until max_batch_size keys are pending) is resolved by one
+    call to batch_fn(keys), which returns {key: value}. Duplicate keys in a
+    window share one lookup; keys missing from the result get a fresh
+    default_factory() (or None). Windows are closed by one long-lived
+    dispatcher thread, started on first use.
+    """
+
+    def __init__(self, batch_fn, window_ms: float = AGENT_BATCH_WINDOW_MS,
+                 max_batch_size: int = AGENT_BATCH_MAX_SIZE, default_factory=None) -> None:
+        self.batch_fn = batch_fn
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.default_factory = default_factory
+        self._pending = {}
+        self._deadline = None
+        self._closed = False
+        self._dispatcher = None
+        self._cond = threading.Condition()
+        self.batches = 0
+        self.keys_loaded = 0
+
+    def load(self, key):
+        """Return the value for key, waiting for the current window's batch."""
+        return self.submit(key).result()
+
+    def submit(self, key) -> Future:
+        """Queue key for the current window and return a future for its value."""
+        batch = None
+        with self._cond:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            future = Future()
+            self._pending[key] = future
+            if len(self._pending) >= self.max_batch_size or self._closed:
+                batch = self._take_pending()
+            elif self._deadline is None:
+                self._deadline = time.monotonic() + self.window
+                self._start_dispatcher()
+                self._cond.notify()
+        if batch:
+            self._dispatch(batch)
+        return future
+
+    def flush(self) -> None:
+        """Resolve everything pending now instead of waiting for the window to close."""
+        with self._cond:
+            batch = self._take_pending()
+        if batch:
+            self._dispatch(batch)
+
+    def close(self) -> None:
+        """Resolve anything pending and stop the dispatcher thread; later loads run immediately."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            dispatcher = self._dispatcher
+        if dispatcher is not None:
+            dispatcher.join()
+        self.flush()
+
+    def _start_dispatcher(self) -> None:
+        """Start the dispatcher thread if it is not running yet (caller holds the condition)."""
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._run, name="batch-loader", daemon=True)
+            self._dispatcher.start()
+
+    def _run(self) -> None:
+        """Dispatcher loop: sleep until the open window closes, then send its batch."""
+        while True:
+            with self._cond:
+                while self._deadline is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                batch = self._take_pending()
+            if batch:
+                self._dispatch(batch)
+
+    def _take_pending(self) -> dict:
+        """Detach the pending keys and close the current window (caller holds the condition)."""
+        batch, self._pending = self._pending, {}
+        self._deadline = None
+        return batch
+
+    def _dispatch(self, batch: dict) -> None:
+        """Run one batched lookup and settle every waiting future."""
+        try:
+            results = self.batch_fn(list(batch))
+        except Exception as e:
+            logger.error(f"❌ Batched lookup of {len(batch)} key(s) failed: {e}")
+            for future in batch.values():
+                future.set_exception(e)
+            return
+        with self._cond:
+            self.batches += 1
+            self.keys_loaded += len(batch)
+        for key, future in batch.items():
+            if key in results:
+                future.set_result(results[key])
+            else:
+                future.set_result(self.default_factory() if self.default_factory else None)
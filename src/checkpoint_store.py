@@ -0,0 +1,115 @@
+import sqlite3
+import threading
+import time
+from config import CHECKPOINT_DB_PATH
+from helper.logger import logger  # Import centralized logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    start_node_id TEXT NOT NULL,
+    prev_response TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'running',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hops (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    hop INTEGER NOT NULL,
+    node_id TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (run_id, hop)
+);
+"""
+
+class SQLiteCheckpointStore:
+    """Durable per-hop checkpoints for workflow runs, stored in a local SQLite file.
+
+    Every completed hop is committed before the next one starts, so a run
+    that fails part-way can be resumed without repeating finished LLM calls.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_DB_PATH) -> None:
+        """Initialize the store; the database is opened on first use."""
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database and create the schema if needed."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            logger.info(f"✅ Opened checkpoint store at {self.path}")
+        return self._conn
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def start_run(self, run_id: str, start_node_id: str, prev_response: str = "") -> None:
+        """Register a run; a run that already exists keeps its original start."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO runs (run_id, start_node_id, prev_response, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (run_id, str(start_node_id), prev_response, now, now),
+                )
+                conn.execute("UPDATE runs SET status = 'running', updated_at = ? WHERE run_id = ?", (now, run_id))
+
+    def save_hop(self, run_id: str, node_id: str, response: str) -> int:
+        """Record a completed hop and return its sequence number within the run."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                hop = conn.execute(
+                    "SELECT COALESCE(MAX(hop) + 1, 0) FROM hops WHERE run_id = ?", (run_id,)
+                ).fetchone()[0]
+                conn.execute(
+                    "INSERT INTO hops (run_id, hop, node_id, response, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (run_id, hop, str(node_id), response, now),
+                )
+                conn.execute("UPDATE runs SET updated_at = ? WHERE run_id = ?", (now, run_id))
+        return hop
+
+    def finish_run(self, run_id: str, status: str) -> None:
+        """Mark a run as 'completed' or 'failed'."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?", (status, time.time(), run_id))
+
+    def get_run(self, run_id: str) -> dict:
+        """Return the run record, or None if the run is unknown."""
+        with self._lock:
+            row = self._connection().execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def last_hop(self, run_id: str) -> dict:
+        """Return the most recent completed hop of a run, or None."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT * FROM hops WHERE run_id = ? ORDER BY hop DESC LIMIT 1", (run_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def hops(self, run_id: str) -> list[dict]:
+        """Return every completed hop of a run in order."""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT * FROM hops WHERE run_id = ? ORDER BY hop", (run_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+# Create a singleton instance
+checkpoint_store = SQLiteCheckpointStore()
@@ -0,0 +1,77 @@
+import math
+import re
+from config import CONTEXT_TOKEN_BUDGET, CONTEXT_TRIM_POLICY
+from helper.logger import logger  # Import centralized logger
+
+TRIM_POLICIES = ("head", "tail", "middle_out")
+
+# Validate the configured default once, so a typo fails at startup rather than on every agent
+if CONTEXT_TRIM_POLICY not in TRIM_POLICIES:
+    raise ValueError(f"❌ Unsupported context trim policy: {CONTEXT_TRIM_POLICY}")
+
+# Marker inserted where middle_out removed text
+TRIM_MARKER = "\n...\n"
+
+# Words, numbers and individual punctuation marks, roughly how BPE tokenizers split text
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Memoized estimates keyed by (hash, length) so cached entries don't keep large strings alive
+_estimate_cache = {}
+_ESTIMATE_CACHE_SIZE = 4096
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in text without calling a tokenizer.
+
+    Each word counts as one token per started 4 characters and each
+    punctuation mark as one token, which tracks BPE tokenizers closely
+    enough for budgeting.
+    """
+    if not text:
+        return 0
+    key = (hash(text), len(text))
+    tokens = _estimate_cache.get(key)
+    if tokens is None:
+        tokens = sum(math.ceil(len(piece) / 4) for piece in _TOKEN_PATTERN.findall(text))
+        if len(_estimate_cache) >= _ESTIMATE_CACHE_SIZE:
+            _estimate_cache.clear()
+        _estimate_cache[key] = tokens
+    return tokens
+
+def _cut(text: str, chars: int, policy: str) -> str:
+    """Keep `chars` characters of text according to policy."""
+    if policy == "head":
+        return text[:chars]
+    if policy == "tail":
+        return text[len(text) - chars:]
+    head = chars // 2
+    return text[:head] + TRIM_MARKER + text[len(text) - (chars - head):]
+
+def trim_to_budget(text: str, max_tokens: int, policy: str = CONTEXT_TRIM_POLICY) -> str:
+    """Trim text so its estimated size fits in max_tokens.
+
+    Policies: "head" keeps the beginning, "tail" keeps the end and
+    "middle_out" keeps both ends and drops the middle. A max_tokens of 0
+    or less means unlimited. An unknown policy raises ValueError, but only
+    once the text actually needs trimming.
+    """
+    if max_tokens <= 0:
+        return text
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    if policy not in TRIM_POLICIES:
+        raise ValueError(f"❌ Unsupported context trim policy: {policy}")
+
+    # Start from the proportional cut and shrink until the estimate fits
+    chars = int(len(text) * max_tokens / tokens)
+    trimmed = _cut(text, chars, policy)
+    while chars > 0 and estimate_tokens(trimmed) > max_tokens:
+        chars = int(chars * 0.9)
+        trimmed = _cut(text, chars, policy)
+    logger.info(f"✅ Trimmed context from ~{tokens} to ~{estimate_tokens(trimmed)} tokens ({policy})")
+    return trimmed
+
+def fit_context(text: str, context_budget: int = None, context_policy: str = None) -> str:
+    """Apply an agent's context budget (falling back to the configured defaults)."""
+    budget = CONTEXT_TOKEN_BUDGET if context_budget is None else int(context_budget)
+    return trim_to_budget(text, budget, context_policy or CONTEXT_TRIM_POLICY)
@@ -0,0 +1,86 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from config import DAG_MAX_WORKERS
+from helper.logger import logger  # Import centralized logger
+from src.context_budget import fit_context
+from src.llm_client import llm_client, parse_llm_response
+from src.summarizer import summarize_for_next_hop
+from src.workflow_loader import AgentSpec, WorkflowGraph, load_workflow_graph
+
+# Separator used when several branch outputs meet at a fan-in agent
+BRANCH_SEPARATOR = "\n\n"
+
+def merge_branch_outputs(outputs: list[str]) -> str:
+    """Combine the outputs of several upstream branches into one context string."""
+    return BRANCH_SEPARATOR.join(output for output in outputs if output)
+
+def _run_agent(agent: AgentSpec, prev_response: str, condense: bool = False) -> tuple[str, str]:
+    """Run a single agent and return (response, error).
+
+    With condense=True (the agent has successors), an oversized response
+    is summarized before it is handed downstream.
+    """
+    full_message = agent.user_message + " " + fit_context(prev_response, agent.context_budget, agent.context_policy)
+    response, error = parse_llm_response(llm_client.call_llm(agent.system_message, full_message, use_cache=agent.cache_llm))
+    if error:
+        return response, error
+    logger.info(f"✅ Agent (ID {agent.node_id}) Response: {response}")
+    return (summarize_for_next_hop(response) if condense else response), error
+
+def run_dag(graph: WorkflowGraph, prev_response: str = "", max_workers: int = DAG_MAX_WORKERS) -> str:
+    """Execute a workflow DAG, running independent agents concurrently.
+
+    An agent is scheduled as soon as all of its predecessors have finished,
+    so wall-clock time follows the critical path rather than the number of
+    agents. Outputs of several predecessors are merged at fan-in agents,
+    and the outputs of all sink agents are merged into the final result.
+    """
+    if not graph.agents:
+        logger.warning(f"❌ No agent found with node_id {graph.start_node_id}")
+        return prev_response
+
+    layers = graph.layers()  # Validates the graph is acyclic
+    logger.info(f"✅ Executing workflow DAG in {len(layers)} layer(s) with up to {max_workers} worker(s)")
+
+    predecessors = graph.predecessors()
+    # Stable merge order for fan-in: the topological position of each agent
+    position = {node_id: index for index, node_id in enumerate(n for layer in layers for n in layer)}
+    remaining = {node_id: len(preds) for node_id, preds in predecessors.items()}
+    outputs = {}
+
+    def agent_input(node_id: str) -> str:
+        preds = sorted(predecessors[node_id], key=position.get)
+        if not preds:
+            return prev_response
+        return merge_branch_outputs([outputs[pred] for pred in preds])
+
+    def submit(executor: ThreadPoolExecutor, node_id: str):
+        return executor.submit(_run_agent, graph.agents[node_id], agent_input(node_id), bool(graph.edges.get(node_id)))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {submit(executor, node_id): node_id for node_id in layers[0]}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                node_id = pending.pop(future)
+                response, error = future.result()
+
+                if error:
+                    for other in pending:
+                        other.cancel()
+                    error_msg = f"LLM API Error: {error}"
+                    logger.error(f"❌ {error_msg}")
+                    return f"Error processing agent: {error_msg}"
+
+                outputs[node_id] = response
+                for next_id in graph.edges.get(node_id, ()):
+                    remaining[next_id] -= 1
+                    if remaining[next_id] == 0:
+                        pending[submit(executor, next_id)] = next_id
+
+    sinks = sorted((node_id for node_id in graph.agents if not graph.edges.get(node_id)), key=position.get)
+    logger.info("✅ Reached the last agent.")
+    return merge_branch_outputs([outputs[node_id] for node_id in sinks])
+
+def process_dag(node_id: str, prev_response: str = "", max_workers: int = DAG_MAX_WORKERS) -> str:
+    """Load the workflow graph reachable from node_id in one query, then execute it as a DAG."""
+    return run_dag(load_workflow_graph(node_id), prev_response, max_workers)
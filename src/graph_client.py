@@ -1,15 +1,97 @@
-from neo4j import GraphDatabase
-from config import GRAPH_DB_TYPE, NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+import contextvars
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from neo4j import READ_ACCESS, GraphDatabase
+from config import (
+    GRAPH_DB_TYPE, GRAPH_STREAM_FETCH_SIZE, NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_MAX_CONNECTION_POOL_SIZE,
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT, NEO4J_MAX_CONNECTION_LIFETIME, NEO4J_CONNECTION_TIMEOUT, NEO4J_KEEP_ALIVE,
+)
 from helper.logger import logger  # Import the logger
+from src.lazy import LazySingleton
+from src.query_metrics import query_metrics
+from src.tracing import tracer
+
+# Session shared by every query of the current workflow run (see GraphClient.session)
+_run_session = contextvars.ContextVar("genflow_run_session", default=None)
+
+def query_name(query: str, name: str = None) -> str:
+    """Metrics name of a query: the given name, or a stable fingerprint of ad-hoc query text."""
+    return name or "adhoc:" + hashlib.sha1(query.encode("utf-8")).hexdigest()[:10]
+
+class PoolMonitor:
+    """Gate queries to the connection pool size and track utilization.
+
+    Each query holds one slot while it runs, so in_use mirrors the
+    connections checked out of the driver pool and the time spent waiting
+    for a slot is the connection acquisition stall.
+    """
+
+    def __init__(self, max_size: int = NEO4J_MAX_CONNECTION_POOL_SIZE,
+                 acquisition_timeout: float = NEO4J_CONNECTION_ACQUISITION_TIMEOUT) -> None:
+        self.max_size = max_size
+        self.acquisition_timeout = acquisition_timeout
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.acquisitions = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    @contextmanager
+    def connection(self):
+        """Hold a pool slot for the duration of one query."""
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.acquisition_timeout):
+            raise TimeoutError(f"No Neo4j connection available within {self.acquisition_timeout}s")
+        waited = time.perf_counter() - started
+        with self._lock:
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.acquisitions += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        try:
+            yield waited
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Snapshot of slot usage and acquisition wait times."""
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "acquisitions": self.acquisitions,
+                "wait_ms_total": self.wait_seconds_total * 1000,
+                "wait_ms_max": self.wait_seconds_max * 1000,
+                "wait_ms_avg": self.wait_seconds_total * 1000 / self.acquisitions if self.acquisitions else 0.0,
+            }
 
 class GraphClient:
     """Unified interface for interacting with Neo4j graph database."""
 
     def __init__(self) -> None:
         """Initialize the database connection based on the configured provider."""
-        if GRAPH_DB_TYPE.lower() == "neo4j":
-            self.driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-            logger.info("✅ Connected to Neo4j")  # Log successful connection
+        if (GRAPH_DB_TYPE or "").lower() == "neo4j":
+            self.driver = GraphDatabase.driver(
+                NEO4J_URI,
+                auth=(NEO4J_USER, NEO4J_PASSWORD),
+                max_connection_pool_size=NEO4J_MAX_CONNECTION_POOL_SIZE,
+                connection_acquisition_timeout=NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+                max_connection_lifetime=NEO4J_MAX_CONNECTION_LIFETIME,
+                connection_timeout=NEO4J_CONNECTION_TIMEOUT,
+                keep_alive=NEO4J_KEEP_ALIVE,
+            )
+            self.pool = PoolMonitor()
+            # Shared by every session, so reads issued after a write see it (read-your-writes)
+            self.bookmark_manager = GraphDatabase.bookmark_manager()
+            logger.info(f"✅ Connected to Neo4j (pool size {NEO4J_MAX_CONNECTION_POOL_SIZE})")  # Log successful connection
         else:
             logger.error(f"❌ Unsupported GRAPH_DB_TYPE: {GRAPH_DB_TYPE}")
             raise ValueError(f"❌ Unsupported GRAPH_DB_TYPE: {GRAPH_DB_TYPE}")
@@ -20,16 +102,199 @@ class GraphClient:
             self.driver.close()
             logger.info("✅ Closed Neo4j connection")
 
-    def execute_query(self, query: str, parameters: dict = None) -> list[dict]:
-        """Execute a Cypher query and return the results."""
-        try:
-            with self.driver.session() as session:
-                result = [record.data() for record in session.run(query, parameters or {})]
-                logger.info(f"✅ Executed Query: {query}")  # Log query execution
-                return result
-        except Exception as e:
-            logger.error(f"❌ Query Execution Failed: {e}")
-            return []
-
-# Create a singleton instance
-graph_client = GraphClient()
+    @contextmanager
+    def session(self):
+        """Reuse one driver session for every query in the block (e.g. a whole workflow run).
+
+        Nested blocks share the outer session. Sessions are not thread-safe,
+        so queries from other threads (such as overlap-mode prefetches) keep
+        opening their own.
+        """
+        current = _run_session.get()
+        if current is not None and current[1] == threading.get_ident():
+            yield current[0]
+            return
+        with self._new_session() as session:
+            token = _run_session.set((session, threading.get_ident()))
+            try:
+                yield session
+            finally:
+                _run_session.reset(token)
+
+    def _session_for_query(self):
+        """The run-scoped session on this thread, or a fresh one for a single query."""
+        current = _run_session.get()
+        if current is not None and current[1] == threading.get_ident():
+            return _reuse(current[0])
+        return self._new_session()
+
+    def _new_session(self):
+        """Open a driver session that exchanges bookmarks through the shared bookmark manager."""
+        return self.driver.session(bookmark_manager=self.bookmark_manager)
+
+    def last_bookmarks(self) -> list[str]:
+        """Bookmarks of the latest writes; pass them to another process for read-your-writes."""
+        return [str(bookmark) for bookmark in self.bookmark_manager.get_bookmarks()]
+
+    def pool_stats(self) -> dict:
+        """Connection pool utilization: in-use and idle connections plus acquisition wait times."""
+        stats = self.pool.stats()
+        stats["idle"] = self._idle_connections()
+        return stats
+
+    def query_stats(self) -> dict:
+        """Per-query latency histograms (client, result_available_after, result_consumed_after)."""
+        return query_metrics.snapshot()
+
+    def _idle_connections(self) -> int:
+        """Idle connections held by the driver pool, or None if the driver does not expose them."""
+        connections = getattr(getattr(self.driver, "_pool", None), "connections", None)
+        if not isinstance(connections, dict):
+            return None
+        return sum(1 for pooled in connections.values() for connection in pooled if not getattr(connection, "in_use", False))
+
+    def execute_query(self, query: str, parameters: dict = None, name: str = None) -> list[dict]:
+        """Execute a Cypher query in an auto-commit transaction and return the results.
+
+        Prefer read()/write() for workflow traffic; auto-commit is still
+        needed for statements that manage their own transactions. name
+        labels the query in query_metrics.
+        """
+        return self._execute(query, parameters, "auto", name)
+
+    def read(self, query: str, parameters: dict = None, name: str = None) -> list[dict]:
+        """Run a read query in a managed transaction, routed to a reader on a cluster and retried on transient errors."""
+        return self._execute(query, parameters, "read", name)
+
+    def write(self, query: str, parameters: dict = None, name: str = None) -> list[dict]:
+        """Run a write query in a managed transaction on the leader, retried on transient errors."""
+        return self._execute(query, parameters, "write", name)
+
+    def execute_batch(self, query: str, ids: list, key: str = "node_id", name: str = None) -> dict:
+        """Resolve many ids with one `UNWIND $ids` read query, grouping the records by their `key` column.
+
+        Every requested id is present in the result; ids with no match map to [].
+        """
+        grouped = {node_id: [] for node_id in dict.fromkeys(ids)}
+        for record in self.read(query, {"ids": list(grouped)}, name=name):
+            grouped.setdefault(record.get(key), []).append(record)
+        return grouped
+
+    def stream_query(self, query: str, parameters: dict = None, fetch_size: int = GRAPH_STREAM_FETCH_SIZE,
+                     values_only: bool = False, name: str = None):
+        """Lazily yield the records of a read query, pulling fetch_size records per round trip.
+
+        Yields one dict per record, like execute_query. With values_only=True
+        the driver's records are yielded as-is: tuples of the returned values
+        (in RETURN order) with no per-record dict. The session and its pool
+        slot stay open until the generator is exhausted or closed.
+
+        Errors are logged and re-raised, so a dropped connection is never
+        mistaken for the end of the results. The stream is recorded in
+        query_metrics and as a graph.query span like other queries.
+        """
+        name = query_name(query, name)
+        summary = None
+        rows = 0
+        started = time.perf_counter()
+        attributes = {"db.system": "neo4j", "db.query_name": name, "db.access_mode": "stream"}
+        with tracer.span("graph.query", activate=False, **attributes) as span:
+            try:
+                with self.pool.connection() as waited, self.driver.session(
+                    fetch_size=fetch_size, default_access_mode=READ_ACCESS, bookmark_manager=self.bookmark_manager
+                ) as session:
+                    span.set("db.pool_wait_ms", waited * 1000)
+                    result = session.run(query, parameters or {})
+                    for record in result:
+                        rows += 1
+                        yield record if values_only else record.data()
+                    consume = getattr(result, "consume", None)
+                    summary = consume() if consume is not None else None
+                    logger.debug("✅ Streamed Query %s: %s", name, query)
+            except GeneratorExit:
+                span.set("db.closed_early", True)  # The caller stopped reading; not an error
+            except Exception as e:
+                logger.error(f"❌ Query {name} Streaming Failed: {e}")
+                span.record_error(str(e))
+                query_metrics.record(name, (time.perf_counter() - started) * 1000, error=True)
+                raise
+            span.set("db.rows", rows)
+
+        query_metrics.record(
+            name,
+            (time.perf_counter() - started) * 1000,
+            getattr(summary, "result_available_after", None),
+            getattr(summary, "result_consumed_after", None),
+        )
+
+    def _execute(self, query: str, parameters: dict, access_mode: str, name: str = None) -> list[dict]:
+        """Run a query with the given access mode (auto, read or write) and return the records as dicts.
+
+        Client-side latency and the server-side timings from the result
+        summary are recorded in query_metrics under the query's name.
+        """
+        name = query_name(query, name)
+        summaries = []
+        started = time.perf_counter()
+        with tracer.span("graph.query", **{"db.system": "neo4j", "db.query_name": name, "db.access_mode": access_mode}) as span:
+            try:
+                with self.pool.connection() as waited, self._session_for_query() as session:
+                    span.set("db.pool_wait_ms", waited * 1000)
+                    if access_mode == "read":
+                        result = session.execute_read(_collect, query, parameters or {}, summaries)
+                    elif access_mode == "write":
+                        result = session.execute_write(_collect, query, parameters or {}, summaries)
+                    else:
+                        result = _collect(session, query, parameters or {}, summaries)
+                    logger.debug("✅ Executed Query %s: %s", name, query)
+                    span.set("db.rows", len(result))
+            except Exception as e:
+                logger.error(f"❌ Query {name} Failed: {e}")
+                span.record_error(str(e))
+                query_metrics.record(name, (time.perf_counter() - started) * 1000, error=True)
+                return []
+
+        summary = summaries[-1] if summaries else None
+        query_metrics.record(
+            name,
+            (time.perf_counter() - started) * 1000,
+            getattr(summary, "result_available_after", None),
+            getattr(summary, "result_consumed_after", None),
+        )
+        return result
+
+def _collect(tx, query: str, parameters: dict, summaries: list = None) -> list[dict]:
+    """Run the query on a transaction or session and materialize its records before it ends.
+
+    The driver's result summary (server-side timings) is appended to summaries.
+    """
+    result = tx.run(query, parameters)
+    records = [record.data() for record in result]
+    consume = getattr(result, "consume", None)
+    if summaries is not None and consume is not None:
+        summaries.append(consume())
+    return records
+
+@contextmanager
+def _reuse(session):
+    """Context manager that leaves an already-open session open."""
+    yield session
+
+def create_graph_client():
+    """Build the graph backend selected by GRAPH_DB_TYPE."""
+    backend = (GRAPH_DB_TYPE or "").lower()
+    # Embedded backends are imported here: they build on this module
+    if backend == "memory":
+        from src.memory_graph import MemoryGraphClient
+        return MemoryGraphClient()
+    if backend == "sqlite":
+        from src.sqlite_graph import SQLiteGraphClient
+        return SQLiteGraphClient()
+    return GraphClient()
+
+# Singleton instance, connected on first use
+graph_client = LazySingleton(create_graph_client)
+
+def get_graph_client() -> GraphClient:
+    """Return the shared GraphClient, connecting on the first call."""
+    return graph_client.get()
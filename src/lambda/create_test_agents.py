@@ -6,6 +6,9 @@ import logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Nodes deleted per transaction when resetting the test namespace
+RESET_BATCH_SIZE = int(os.environ.get('RESET_BATCH_SIZE', '10000'))
+
 def get_neo4j_driver():
     uri = os.environ['NEO4J_URI']
     user = os.environ['NEO4J_USER']
@@ -13,24 +16,37 @@ def get_neo4j_driver():
     return GraphDatabase.driver(uri, auth=(user, password))
 
 def lambda_handler(event, context):
-    """Lambda function to create test agents in Neo4j."""
+    """Lambda function to create test agents in Neo4j.
+
+    Only the event's namespace (default "test") is reset, so other
+    workflows in the same database are left alone.
+    """
     try:
+        namespace = (event or {}).get('namespace') or 'test'
         driver = get_neo4j_driver()
         with driver.session() as session:
-            # Delete existing nodes
-            session.run("MATCH (n) DETACH DELETE n")
+            # Delete this namespace's agents in small batches; CALL ... IN TRANSACTIONS
+            # must run in an auto-commit transaction, which session.run provides
+            session.run("CREATE INDEX agent_namespace IF NOT EXISTS FOR (a:Agent) ON (a.namespace)").consume()
+            session.run(f"""
+            MATCH (a:Agent {{namespace: $namespace}})
+            CALL {{ WITH a DETACH DELETE a }} IN TRANSACTIONS OF {RESET_BATCH_SIZE} ROWS
+            """, namespace=namespace).consume()
             
             # Create agents
             result = session.run("""
             CREATE (a1:Agent {
+                namespace: $namespace,
                 system_message: "You are a psychiatrist.",
                 user_message: "Explain bipolar disorder."
             })
             CREATE (a2:Agent {
+                namespace: $namespace,
                 system_message: "You are an accuracy checker.",
                 user_message: "Verify the correctness of the psychiatrist's explanation."
             })
             CREATE (a3:Agent {
+                namespace: $namespace,
                 system_message: "You are an evaluator.",
                 user_message: "Assess the accuracy checker's feedback and determine its validity and relevance."
             })
@@ -42,19 +58,26 @@ def lambda_handler(event, context):
             // Return the first agent's ID for testing
             WITH a1
             RETURN elementId(a1) as start_agent_id
-            """)
+            """, namespace=namespace)
             
             record = result.single()
             start_agent_id = record['start_agent_id']
+
+            # Bump the graph version so cached workflow plans are invalidated
+            session.run("""
+            MERGE (v:GraphVersion {name: 'workflow'})
+            SET v.version = coalesce(v.version, 0) + 1
+            """).consume()
             
-            driver.close()
-            
-            return {
-                'statusCode': 200,
-                'body': json.dumps({
-                    'start_agent_id': start_agent_id
-                })
-            }
+        driver.close()
+        
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'namespace': namespace,
+                'start_agent_id': start_agent_id
+            })
+        }
             
     except Exception as e:
         logger.error(f"Error: {str(e)}")
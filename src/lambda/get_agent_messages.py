@@ -18,9 +18,11 @@ def lambda_handler(event, context):
             query = """
             MATCH (a:Agent) 
             WHERE elementId(a) = $node_id
-            RETURN a.system_message AS system_message, a.user_message AS user_message
+            RETURN a.system_message AS system_message, a.user_message AS user_message,
+                   a.context_budget AS context_budget, a.context_policy AS context_policy
             """
-            result = session.run(query, {"node_id": node_id}).single()
+            # Managed read transaction: routed to a read replica on a cluster and retried on transient errors
+            result = session.execute_read(lambda tx: tx.run(query, {"node_id": node_id}).single())
             driver.close()
             
             if not result:
@@ -34,7 +36,9 @@ def lambda_handler(event, context):
                 'statusCode': 200,
                 'body': json.dumps({
                     'system_message': result['system_message'],
-                    'user_message': result['user_message']
+                    'user_message': result['user_message'],
+                    'context_budget': result['context_budget'],
+                    'context_policy': result['context_policy']
                 })
             }
             
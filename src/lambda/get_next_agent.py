@@ -25,9 +25,11 @@ def lambda_handler(event, context):
             query = """
             MATCH (current:Agent)-[:NEXT_AGENT]->(next:Agent)
             WHERE elementId(current) = $node_id
-            RETURN elementId(next) as next_agent_id
+            RETURN elementId(next) as next_agent_id, next.system_message AS system_message, next.user_message AS user_message,
+                   next.context_budget AS context_budget, next.context_policy AS context_policy
             """
-            result = session.run(query, {"node_id": node_id}).single()
+            # Managed read transaction: routed to a read replica on a cluster and retried on transient errors
+            result = session.execute_read(lambda tx: tx.run(query, {"node_id": node_id}).single())
             driver.close()
             
             if not result:
@@ -40,10 +42,15 @@ def lambda_handler(event, context):
             next_agent_id = result['next_agent_id']
             logger.info(f"Found next agent with id: {next_agent_id}")
             
+            # Include the next agent's messages so the workflow can skip GetAgentMessages
             return {
                 'statusCode': 200,
                 'body': json.dumps({
-                    'next_agent_id': next_agent_id
+                    'next_agent_id': next_agent_id,
+                    'system_message': result['system_message'],
+                    'user_message': result['user_message'],
+                    'context_budget': result['context_budget'],
+                    'context_policy': result['context_policy']
                 })
             }
             
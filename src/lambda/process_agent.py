@@ -2,6 +2,7 @@ import os
 import json
 import requests
 import logging
+from src.context_budget import fit_context
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -34,6 +35,9 @@ def lambda_handler(event, context):
             {'role': 'system', 'content': system_message}
         ]
 
+        # Keep the previous response within the agent's context budget (shared with the local processor)
+        prev_response = fit_context(prev_response, agent_data.get('context_budget'), agent_data.get('context_policy'))
+
         # If there's a previous response, include it in the user message for context
         if prev_response:
             full_user_message = f"Previous response:\n{prev_response}\n\nYour task: {user_message}"
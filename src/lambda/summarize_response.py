@@ -0,0 +1,77 @@
+import os
+import json
+import re
+import logging
+from collections import Counter
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Sentences end at ., ! or ? (or a line break); words are alphanumeric runs
+SENTENCE_PATTERN = re.compile(r"[^.!?\n]+(?:[.!?]+|\n|$)")
+WORD_PATTERN = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+def content_words(text):
+    return [word for word in WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS]
+
+def extractive_summary(text, max_chars):
+    """Keep the most representative sentences (by average word frequency) that fit in max_chars."""
+    sentences = [sentence.strip() for sentence in SENTENCE_PATTERN.findall(text) if sentence.strip()]
+    frequencies = Counter(content_words(text))
+    if not sentences or not frequencies:
+        return text[:max_chars]
+
+    def score(sentence):
+        words = content_words(sentence)
+        return sum(frequencies[word] for word in words) / len(words) if words else 0.0
+
+    ranked = sorted(range(len(sentences)), key=lambda index: score(sentences[index]), reverse=True)
+    chosen = []
+    length = 0
+    for index in ranked:
+        extra = len(sentences[index]) + (1 if chosen else 0)
+        if length + extra <= max_chars:
+            chosen.append(index)
+            length += extra
+    if not chosen:
+        return sentences[ranked[0]][:max_chars]
+    return " ".join(sentences[index] for index in sorted(chosen))
+
+def lambda_handler(event, context):
+    """Lambda function to summarize an oversized agent response before the next agent."""
+    try:
+        process_result = event.get('process_result', {})
+        status_code = process_result.get('statusCode')
+        body = process_result.get('body', {})
+
+        # Pass failed results through untouched so the workflow can handle them
+        if status_code != 200:
+            return {
+                'statusCode': status_code,
+                'body': json.dumps(body)
+            }
+
+        response = body.get('response', '')
+        threshold = int(os.environ.get('SUMMARIZE_THRESHOLD_CHARS', '0'))
+        max_chars = int(os.environ.get('SUMMARY_MAX_CHARS', '2000'))
+
+        summarized = 0 < threshold < len(response) and len(response) > max_chars
+        summary = extractive_summary(response, max_chars) if summarized else response
+        if summarized:
+            logger.info(f"Summarized response from {len(response)} to {len(summary)} chars")
+
+        # Keep the raw response for the final result; the next agent receives the summary
+        return {
+            'statusCode': 200,
+            'body': json.dumps({**body, 'summary': summary, 'summarized': summarized})
+        }
+
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': str(e)})
+        }
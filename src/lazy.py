@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import weakref
+from helper.logger import logger  # Import centralized logger
+
+class LazySingleton:
+    """Stand-in for a module-level singleton that is built on first use.
+
+    Attribute access is forwarded to the instance, which is created by
+    factory() exactly once even when several threads race for it. Nothing
+    is connected or validated at import time, or when the proxy is patched.
+    """
+
+    def __init__(self, factory) -> None:
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def get(self):
+        """Return the instance, creating it on the first call."""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._factory()
+                    object.__setattr__(self, "_instance", instance)
+        return instance
+
+    @property
+    def initialized(self) -> bool:
+        """Whether the instance has been created yet."""
+        return self._instance is not None
+
+    def __getattr__(self, name: str):
+        # Dunder and private probes (mock.patch, inspect, copy, pickle) must
+        # not build the instance; only public attributes are forwarded.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self.get(), name, value)
+
+    def __repr__(self) -> str:
+        state = repr(self._instance) if self._instance is not None else "not initialized"
+        return f"<LazySingleton {getattr(self._factory, '__name__', self._factory)}: {state}>"
+
+class LoopLocal:
+    """One instance per running event loop, built on first use in that loop.
+
+    Async clients (httpx pools, neo4j AsyncDrivers) are bound to the loop
+    that opened their connections, so each loop gets its own. An instance
+    is closed with close(instance) when its loop shuts down: asyncio.run
+    finalizes async generators before closing the loop, so a warm Lambda
+    calling asyncio.run per invocation does not leak connections.
+    """
+
+    def __init__(self, factory, close) -> None:
+        self._factory = factory
+        self._close = close
+        self._instances = weakref.WeakKeyDictionary()  # loop -> (instance, closer generator)
+
+    async def get(self):
+        """Return the running loop's instance, creating it on the first call."""
+        loop = asyncio.get_running_loop()
+        entry = self._instances.get(loop)
+        if entry is None:
+            instance = self._factory()
+            closer = self._close_on_shutdown(instance)
+            self._instances[loop] = entry = (instance, closer)
+            await closer.__anext__()  # The first iteration registers the generator with the loop
+        return entry[0]
+
+    async def aclose(self) -> None:
+        """Close the running loop's instance now."""
+        entry = self._instances.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[1].aclose()
+
+    async def _close_on_shutdown(self, instance):
+        try:
+            yield
+        finally:
+            self._instances.pop(asyncio.get_running_loop(), None)
+            try:
+                await self._close(instance)
+            except Exception as e:
+                logger.error(f"❌ Failed to close {type(instance).__name__}: {e}")
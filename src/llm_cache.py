@@ -0,0 +1,132 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config import LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_PATH, LLM_CACHE_DISK_MAX_ENTRIES
+from helper.logger import logger  # Import centralized logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_responses_accessed_at ON llm_responses (accessed_at);
+"""
+
+# The disk tier is trimmed back to disk_max_entries once every N writes
+DISK_PRUNE_EVERY = 64
+
+def request_key(provider: str, url: str, payload: dict) -> str:
+    """Content address of an LLM request: a SHA-256 of provider, endpoint and full payload."""
+    canonical = json.dumps([provider, url, payload], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class LLMResponseCache:
+    """Two-tier cache of LLM responses: an in-process LRU backed by a SQLite file.
+
+    Memory hits are served directly; disk hits are promoted to memory.
+    Entries older than ttl seconds are treated as misses on both tiers.
+    """
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl: float = LLM_CACHE_TTL,
+                 disk_path: str = LLM_CACHE_PATH, disk_max_entries: int = LLM_CACHE_DISK_MAX_ENTRIES) -> None:
+        """Initialize an empty cache; the disk tier is opened on first use."""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_path = disk_path
+        self.disk_max_entries = disk_max_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key -> (created_at, response)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._puts = 0
+
+    def _disk(self) -> sqlite3.Connection:
+        """Open the disk tier and create the schema if needed (None when disabled)."""
+        if self._conn is None and self.disk_path:
+            self._conn = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            logger.info(f"✅ Opened LLM response cache at {self.disk_path}")
+        return self._conn
+
+    def close(self) -> None:
+        """Close the disk tier."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get(self, key: str) -> dict:
+        """Return the cached response for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+
+            conn = self._disk()
+            row = None
+            if conn is not None:
+                row = conn.execute(
+                    "SELECT response, created_at FROM llm_responses WHERE key = ? AND created_at > ?",
+                    (key, now - self.ttl),
+                ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            with conn:
+                conn.execute("UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key))
+            response = json.loads(row[0])
+            self._remember(key, row[1], response)
+            self.disk_hits += 1
+            return response
+
+    def put(self, key: str, response: dict) -> None:
+        """Store a response in both tiers, evicting the least recently used entries."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, response)
+            conn = self._disk()
+            if conn is None:
+                return
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(response), now, now),
+                )
+                self._puts += 1
+                if self._puts % DISK_PRUNE_EVERY == 0:
+                    conn.execute(
+                        "DELETE FROM llm_responses WHERE key IN ("
+                        "SELECT key FROM llm_responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                        (self.disk_max_entries,),
+                    )
+
+    def _remember(self, key: str, created_at: float, response: dict) -> None:
+        """Insert into the memory tier (caller holds the lock)."""
+        self._memory[key] = (created_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Return hit and miss counters for both tiers."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
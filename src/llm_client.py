@@ -1,14 +1,22 @@
 import json
 import requests
-from config import LLM_PROVIDER, OPENAI_API_KEY, DEEPSEEK_API_KEY, CLAUDE_API_KEY
+from config import LLM_PROVIDER, OPENAI_API_KEY, DEEPSEEK_API_KEY, CLAUDE_API_KEY, LLM_CACHE_ENABLED
+from src.lazy import LazySingleton
+from src.llm_cache import LLMResponseCache, request_key
+from src.tracing import tracer
 
 class LLMClient:
     """Unified interface for multiple LLM providers (DeepSeek, OpenAI, Claude)."""
 
-    def __init__(self) -> None:
-        """Initialize the LLM client with the configured provider."""
-        self.provider = LLM_PROVIDER.lower()
+    def __init__(self, model: str = None) -> None:
+        """Initialize the LLM client with the configured provider.
+
+        model overrides the provider's default model (e.g. a cheaper one).
+        """
+        self.provider = (LLM_PROVIDER or "").lower()
+        self.model = model
         self.api_key = self._get_api_key()
+        self.cache = LLMResponseCache() if LLM_CACHE_ENABLED else None
 
     def _get_api_key(self) -> str:
         """Retrieve API key based on selected LLM provider."""
@@ -21,8 +29,34 @@ class LLMClient:
         else:
             raise ValueError(f"❌ Unsupported LLM provider: {self.provider}")
 
-    def call_llm(self, system_message: str, user_message: str) -> dict:
-        """Route the request to the configured LLM provider."""
+    def call_llm(self, system_message: str, user_message: str, use_cache: bool = True) -> dict:
+        """Route the request to the configured LLM provider.
+
+        When the response cache is enabled, identical requests are served
+        from it; pass use_cache=False to always go to the network.
+        """
+        with tracer.span("llm.call", **{"llm.provider": self.provider, "llm.model": self.model}) as span:
+            key = self.cache_key(system_message, user_message) if self.cache is not None and use_cache else None
+            if key is not None:
+                cached = self.cache.get(key)
+                span.set("llm.cache_hit", cached is not None)
+                if cached is not None:
+                    return cached
+
+            response = self._dispatch(system_message, user_message)
+            if response.get("statusCode") != 200:
+                span.record_error(f"LLM API returned status {response.get('statusCode')}")
+            if key is not None and response.get("statusCode") == 200:
+                self.cache.put(key, response)
+            return response
+
+    def cache_key(self, system_message: str, user_message: str) -> str:
+        """Content address of the full request that would be sent for these messages."""
+        url, payload, _ = self.build_request(system_message, user_message)
+        return request_key(self.provider, url, payload)
+
+    def _dispatch(self, system_message: str, user_message: str) -> dict:
+        """Call the configured LLM provider."""
         if self.provider == "deepseek":
             return self._call_deepseek(system_message, user_message)
         elif self.provider == "openai":
@@ -32,11 +66,71 @@ class LLMClient:
         else:
             raise ValueError(f"❌ Unsupported LLM provider: {self.provider}")
 
-    def _call_deepseek(self, system_message: str, user_message: str) -> dict:
-        """Call DeepSeek API."""
+    def stream_llm(self, system_message: str, user_message: str):
+        """Stream the response from the configured LLM provider.
+
+        Yields {"delta": text} for each token chunk, then a final
+        {"usage": {...}} with whatever token usage the provider reported.
+        Failures are yielded as {"statusCode": ..., "error": ...}.
+        """
+        url, payload, headers = self.build_request(system_message, user_message)
+        payload = {**payload, "stream": True}
+        if self.provider in ("deepseek", "openai"):
+            payload["stream_options"] = {"include_usage": True}
+
+        try:
+            with requests.post(url, json=payload, headers=headers, stream=True) as response:
+                if response.status_code != 200:
+                    yield {"statusCode": response.status_code, "error": response.text}
+                    return
+                usage = {}
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    event = json.loads(data)
+                    delta = self._stream_delta(event)
+                    if delta:
+                        yield {"delta": delta}
+                    usage.update(self._stream_usage(event))
+            yield {"usage": usage}
+        except Exception as e:
+            yield {
+                "statusCode": 500,
+                "error": f"Network error: {str(e)}"
+            }
+
+    def _stream_delta(self, event: dict) -> str:
+        """Extract the text delta from an OpenAI-style or Anthropic-style stream event."""
+        if event.get("choices"):
+            return (event["choices"][0].get("delta") or {}).get("content") or ""
+        if event.get("type") == "content_block_delta":
+            return (event.get("delta") or {}).get("text") or ""
+        return ""
+
+    def _stream_usage(self, event: dict) -> dict:
+        """Extract token usage from a stream event, if present."""
+        usage = event.get("usage") or (event.get("message") or {}).get("usage")
+        return usage or {}
+
+    def build_request(self, system_message: str, user_message: str) -> tuple[str, dict, dict]:
+        """Build (url, payload, headers) for the configured LLM provider."""
+        if self.provider == "deepseek":
+            return self._deepseek_request(system_message, user_message)
+        elif self.provider == "openai":
+            return self._openai_request(system_message, user_message)
+        elif self.provider == "anthropic":
+            return self._claude_request(system_message, user_message)
+        else:
+            raise ValueError(f"❌ Unsupported LLM provider: {self.provider}")
+
+    def _deepseek_request(self, system_message: str, user_message: str) -> tuple[str, dict, dict]:
+        """Build the DeepSeek API request."""
         url = "https://api.deepseek.com/v1/chat/completions"
         payload = {
-            "model": "deepseek-chat",
+            "model": self.model or "deepseek-chat",
             "messages": [
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": user_message},
@@ -44,62 +138,68 @@ class LLMClient:
             "stream": False
         }
         headers = {"Authorization": f"Bearer {self.api_key}"}
+        return url, payload, headers
 
-        try:
-            response = requests.post(url, json=payload, headers=headers)
-            return self._format_response(response)
-        except Exception as e:
-            return {
-                "statusCode": 500,
-                "error": f"Network error: {str(e)}"
-            }
-
-    def _call_openai(self, system_message: str, user_message: str) -> dict:
-        """Call OpenAI API."""
+    def _openai_request(self, system_message: str, user_message: str) -> tuple[str, dict, dict]:
+        """Build the OpenAI API request."""
         url = "https://api.openai.com/v1/chat/completions"
         payload = {
-            "model": "gpt-4",
+            "model": self.model or "gpt-4",
             "messages": [
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": user_message},
             ],
         }
         headers = {"Authorization": f"Bearer {self.api_key}"}
+        return url, payload, headers
 
-        try:
-            response = requests.post(url, json=payload, headers=headers)
-            return self._format_response(response)
-        except Exception as e:
-            return {
-                "statusCode": 500,
-                "error": f"Network error: {str(e)}"
-            }
-
-    def _call_claude(self, system_message: str, user_message: str) -> dict:
-        """Call Claude API (Anthropic)."""
+    def _claude_request(self, system_message: str, user_message: str) -> tuple[str, dict, dict]:
+        """Build the Claude API (Anthropic) request."""
         url = "https://api.anthropic.com/v1/messages"
         payload = {
-            "model": "claude-2",
+            "model": self.model or "claude-2",
             "messages": [
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": user_message},
             ],
         }
         headers = {"Authorization": f"Bearer {self.api_key}"}
+        return url, payload, headers
 
-        try:
-            response = requests.post(url, json=payload, headers=headers)
-            return self._format_response(response)
-        except Exception as e:
-            return {
-                "statusCode": 500,
-                "error": f"Network error: {str(e)}"
-            }
+    def _call_deepseek(self, system_message: str, user_message: str) -> dict:
+        """Call DeepSeek API."""
+        return self._post(*self._deepseek_request(system_message, user_message))
+
+    def _call_openai(self, system_message: str, user_message: str) -> dict:
+        """Call OpenAI API."""
+        return self._post(*self._openai_request(system_message, user_message))
+
+    def _call_claude(self, system_message: str, user_message: str) -> dict:
+        """Call Claude API (Anthropic)."""
+        return self._post(*self._claude_request(system_message, user_message))
+
+    def _post(self, url: str, payload: dict, headers: dict) -> dict:
+        """Send the request and format the provider response."""
+        with tracer.span("llm.http", **{"http.url": url}) as span:
+            if tracer.enabled:
+                span.set("http.request_bytes", len(json.dumps(payload)))
+            try:
+                response = requests.post(url, json=payload, headers=headers)
+                span.set_attributes({"http.status_code": response.status_code, "http.response_bytes": len(response.content)})
+                return self._format_response(response)
+            except Exception as e:
+                span.record_error(str(e))
+                return {
+                    "statusCode": 500,
+                    "error": f"Network error: {str(e)}"
+                }
 
     def _format_response(self, response: requests.Response) -> dict:
         """Format the API response."""
         if response.status_code == 200:
-            chat_response = response.json()["choices"][0]["message"]["content"]
+            data = response.json()
+            chat_response = data["choices"][0]["message"]["content"]
+            record_usage(data.get("usage"))
             return {"statusCode": 200, "body": json.dumps({"response": chat_response})}
         else:
             return {
@@ -107,5 +207,31 @@ class LLMClient:
                 "body": json.dumps({"error": response.text}),
             }
 
-# Initialize LLM client
-llm_client = LLMClient()
+def record_usage(usage: dict) -> None:
+    """Attach provider token usage to the active span."""
+    span = tracer.current_span()
+    if span is not None and isinstance(usage, dict):
+        span.set_attributes({f"llm.usage.{key}": value for key, value in usage.items() if isinstance(value, (int, float))})
+
+def parse_llm_response(response_dict: dict) -> tuple[str, str]:
+    """Extract (response, error) from an LLM client result.
+
+    Accepts both the flat {"response": ...} shape and the API-style
+    {"statusCode": ..., "body": "<json>"} shape returned by LLMClient.
+    """
+    if "body" in response_dict:
+        try:
+            body = json.loads(response_dict["body"])
+        except (TypeError, ValueError):
+            body = {}
+        response_dict = {**response_dict, **body}
+    if "error" in response_dict:
+        return "", str(response_dict.get("error"))
+    return response_dict.get("response", "No response found"), ""
+
+# Singleton LLM client, created on first use so a missing LLM_PROVIDER only fails when an LLM is called
+llm_client = LazySingleton(LLMClient)
+
+def get_llm_client() -> LLMClient:
+    """Return the shared LLMClient, creating it on the first call."""
+    return llm_client.get()
@@ -0,0 +1,187 @@
+import threading
+from collections import deque
+from config import GRAPH_MEMORY_WORKFLOWS
+from helper.logger import logger  # Import centralized logger
+from src.named_query_client import NamedQueryClient
+from src.workflow_io import AGENT_PROPERTIES, EDGE_PROPERTIES
+
+class MemoryGraphClient(NamedQueryClient):
+    """In-process agent graph for GRAPH_DB_TYPE=memory (local runs and CI).
+
+    Agents live in a dict keyed by node id and NEXT_AGENT edges in
+    adjacency lists indexed both ways, so lookups and traversals cost
+    microseconds. Node ids are "namespace:key". Workflow files listed in
+    GRAPH_MEMORY_WORKFLOWS are loaded at startup.
+    """
+
+    backend = "memory"
+
+    def __init__(self, workflow_paths: str = GRAPH_MEMORY_WORKFLOWS) -> None:
+        self.agents = {}
+        self.out_edges = {}  # node_id -> [(next node_id, edge properties)], in creation order
+        self.in_edges = {}  # node_id -> [previous node_id]
+        self.namespaces = {}  # namespace -> {node_id}
+        self.version = 0
+        self._lock = threading.RLock()
+        for path in (workflow_paths or "").split(","):
+            if path.strip():
+                self.load_file(path.strip())
+        logger.info(f"✅ Using in-memory graph ({len(self.agents)} agent(s))")
+
+    def _handlers(self) -> dict:
+        return {
+            "agent_messages": self._agent_messages,
+            "next_agent": self._next_agent,
+            "agents_batch": self._agents_batch,
+            "next_agents_batch": self._next_agents_batch,
+            "workflow_path": self._workflow_path,
+            "workflow_graph": self._workflow_graph,
+            "graph_version": lambda parameters: [{"version": self.version}],
+            "bump_graph_version": self._bump_graph_version,
+            "namespace_index": lambda parameters: [],
+            "reset_namespace": self._reset_namespace,
+            "import_agents": self._import_agents,
+            "import_edges": self._import_edges,
+            "export_agents": self._export_agents,
+            "export_edges": self._export_edges,
+        }
+
+    def _atomic(self):
+        return self._lock
+
+    def _call(self, handler, parameters: dict) -> list[dict]:
+        """Run handlers one at a time so traversals never see a half-applied write."""
+        with self._lock:
+            return handler(parameters)
+
+    def add_agent(self, namespace: str, key: str, **properties) -> str:
+        """Create an agent and return its node id."""
+        with self._lock:
+            node_id = f"{namespace}:{key}"
+            suffix = 1
+            while node_id in self.agents:
+                suffix += 1
+                node_id = f"{namespace}:{key}#{suffix}"
+            self.agents[node_id] = {**properties, "key": key, "namespace": namespace}
+            self.out_edges[node_id] = []
+            self.in_edges[node_id] = []
+            self.namespaces.setdefault(namespace, set()).add(node_id)
+            return node_id
+
+    def add_edge(self, from_id: str, to_id: str, **properties) -> None:
+        """Create a NEXT_AGENT edge between two existing agents."""
+        with self._lock:
+            if from_id not in self.agents or to_id not in self.agents:
+                raise KeyError(f"❌ Unknown agent in edge {from_id} -> {to_id}")
+            self.out_edges[from_id].append((to_id, properties))
+            self.in_edges[to_id].append(from_id)
+
+    def _fields(self, node_id: str) -> dict:
+        agent = self.agents[node_id]
+        return {field: agent.get(field) for field in AGENT_PROPERTIES}
+
+    def _agent_messages(self, parameters: dict) -> list[dict]:
+        node_id = parameters.get("node_id")
+        return [self._fields(node_id)] if node_id in self.agents else []
+
+    def _next_record(self, next_id: str, edge: dict) -> dict:
+        return {"next_agent_id": next_id, **self._fields(next_id), **{field: edge.get(field) for field in EDGE_PROPERTIES}}
+
+    def _next_agent(self, parameters: dict) -> list[dict]:
+        return [self._next_record(next_id, edge) for next_id, edge in self.out_edges.get(parameters.get("node_id"), ())]
+
+    def _agents_batch(self, parameters: dict) -> list[dict]:
+        return [{"node_id": node_id, **self._fields(node_id)} for node_id in parameters["ids"] if node_id in self.agents]
+
+    def _next_agents_batch(self, parameters: dict) -> list[dict]:
+        return [
+            {"node_id": node_id, **self._next_record(next_id, edge)}
+            for node_id in parameters["ids"]
+            for next_id, edge in self.out_edges.get(node_id, ())
+        ]
+
+    def _workflow_path(self, parameters: dict) -> list[dict]:
+        """The NEXT_AGENT chain from the start node, following each agent's first edge.
+
+        Each agent is visited once; the walk ends at the first agent seen
+        twice, which is returned again so the loader can report the cycle.
+        Every row lists all of the agent's successors so fan-out is visible.
+        """
+        node_id, seen, records = parameters.get("node_id"), set(), []
+        while node_id in self.agents:
+            edges = self.out_edges[node_id]
+            records.append({"node_id": node_id, **self._fields(node_id), "next_agent_ids": [next_id for next_id, _ in edges]})
+            if node_id in seen:
+                break
+            seen.add(node_id)
+            node_id = edges[0][0] if edges else None
+        return records
+
+    def _workflow_graph(self, parameters: dict) -> list[dict]:
+        """Every agent reachable from the start node with its outgoing edges and loop edges."""
+        start = parameters.get("node_id")
+        if start not in self.agents:
+            return []
+        seen, queue, records = {start}, deque([start]), []
+        while queue:
+            node_id = queue.popleft()
+            edges = self.out_edges[node_id]
+            records.append({
+                "node_id": node_id,
+                **self._fields(node_id),
+                "next_agent_ids": [next_id for next_id, _ in edges],
+                "loop_edges": [
+                    {"next_agent_id": next_id, "max_iterations": edge["max_iterations"], "until": edge.get("until")}
+                    for next_id, edge in edges if edge.get("max_iterations") is not None
+                ],
+            })
+            for next_id, _ in edges:
+                if next_id not in seen:
+                    seen.add(next_id)
+                    queue.append(next_id)
+        return records
+
+    def _bump_graph_version(self, parameters: dict) -> list[dict]:
+        with self._lock:
+            self.version += 1
+            return [{"version": self.version}]
+
+    def _reset_namespace(self, parameters: dict) -> list[dict]:
+        """Delete a namespace's agents and every edge touching them."""
+        with self._lock:
+            removed = self.namespaces.pop(parameters["namespace"], set())
+            for node_id in removed:
+                for next_id, _ in self.out_edges.pop(node_id):
+                    if next_id not in removed:
+                        self.in_edges[next_id] = [from_id for from_id in self.in_edges[next_id] if from_id != node_id]
+                for from_id in self.in_edges.pop(node_id):
+                    if from_id not in removed:
+                        self.out_edges[from_id] = [edge for edge in self.out_edges[from_id] if edge[0] != node_id]
+                del self.agents[node_id]
+        return [{"deleted": len(removed)}]
+
+    def _import_agents(self, parameters: dict) -> list[dict]:
+        namespace = parameters["namespace"]
+        return [
+            {"key": row["key"], "node_id": self.add_agent(namespace, row["key"], **row["properties"])}
+            for row in parameters["rows"]
+        ]
+
+    def _import_edges(self, parameters: dict) -> list[dict]:
+        for row in parameters["rows"]:
+            self.add_edge(row["from_id"], row["to_id"], **row["properties"])
+        return [{"created": len(parameters["rows"])}]
+
+    def _export_agents(self, parameters: dict) -> list[dict]:
+        return [
+            {"key": self.agents[node_id]["key"], **self._fields(node_id)}
+            for node_id in sorted(self.namespaces.get(parameters["namespace"], ()))
+        ]
+
+    def _export_edges(self, parameters: dict) -> list[dict]:
+        return [
+            {"from": self.agents[node_id]["key"], "to": self.agents[next_id]["key"],
+             **{field: edge.get(field) for field in EDGE_PROPERTIES}}
+            for node_id in sorted(self.namespaces.get(parameters["namespace"], ()))
+            for next_id, edge in self.out_edges[node_id]
+        ]
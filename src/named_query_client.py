@@ -0,0 +1,110 @@
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+from helper.logger import logger  # Import centralized logger
+from src.graph_client import query_name
+from src.query_metrics import query_metrics
+from src.workflow_io import agent_rows, edge_rows, load_workflow_file, validate_workflow
+
+class NamedQueryClient(ABC):
+    """GraphClient interface for embedded backends that answer queries by name instead of running Cypher.
+
+    Every query GenFlow issues carries a name (agent_messages, next_agent,
+    workflow_graph, ...); subclasses map each name to a method taking the
+    query parameters and returning the same records Neo4j would.
+    Unknown names are logged and answered with [], like a failed query.
+    """
+
+    backend = "embedded"
+
+    @abstractmethod
+    def _handlers(self) -> dict:
+        """{query name: handler(parameters) -> list[dict]}."""
+
+    def close(self) -> None:
+        """Release the backend; nothing to do by default."""
+
+    @contextmanager
+    def session(self):
+        """No-op: embedded backends have no sessions to share across a run."""
+        yield self
+
+    def last_bookmarks(self) -> list[str]:
+        """Embedded backends are read-your-writes already; there are no bookmarks."""
+        return []
+
+    def pool_stats(self) -> dict:
+        """No connection pool; kept for interface parity with GraphClient."""
+        return {}
+
+    def query_stats(self) -> dict:
+        """Per-query latency histograms (client-side only)."""
+        return query_metrics.snapshot()
+
+    def execute_query(self, query: str, parameters: dict = None, name: str = None) -> list[dict]:
+        """Answer the named query; the Cypher text is ignored."""
+        return self._execute(query, parameters, name)
+
+    read = write = execute_query
+
+    def execute_batch(self, query: str, ids: list, key: str = "node_id", name: str = None) -> dict:
+        """Resolve many ids with one named query, grouping the records by their `key` column."""
+        grouped = {node_id: [] for node_id in dict.fromkeys(ids)}
+        for record in self.read(query, {"ids": list(grouped)}, name=name):
+            grouped.setdefault(record.get(key), []).append(record)
+        return grouped
+
+    def stream_query(self, query: str, parameters: dict = None, fetch_size: int = None,
+                     values_only: bool = False, name: str = None):
+        """Yield the records of a named query; values_only yields tuples of the values."""
+        for record in self._execute(query, parameters, name):
+            yield tuple(record.values()) if values_only else record
+
+    def _atomic(self):
+        """Context manager that makes a multi-step write appear all at once to readers."""
+        return nullcontext()
+
+    def load_workflow(self, workflow: dict, namespace: str = None) -> str:
+        """Add a workflow definition (the workflow_io file format) and return its start node id.
+
+        Agents, edges and the version bump are applied atomically. Unlike
+        import_workflow, errors are raised rather than logged.
+        """
+        validate_workflow(workflow)
+        namespace = namespace or workflow.get("namespace") or "default"
+        handlers = self._handlers()
+        with self._atomic():
+            records = self._call(handlers["import_agents"], {"rows": agent_rows(workflow), "namespace": namespace})
+            node_ids = {record["key"]: record["node_id"] for record in records}
+            self._call(handlers["import_edges"], {"rows": edge_rows(workflow, node_ids)})
+            self._call(handlers["bump_graph_version"], {})
+        start = workflow.get("start")
+        return node_ids.get(start) if start is not None else None
+
+    def load_file(self, path: str, namespace: str = None) -> str:
+        """Add the workflow in a JSON/YAML file and return its start node id."""
+        start_node_id = self.load_workflow(load_workflow_file(path), namespace)
+        logger.info(f"✅ Loaded workflow {path} into the {self.backend} graph (start node {start_node_id})")
+        return start_node_id
+
+    def _call(self, handler, parameters: dict) -> list[dict]:
+        """Run one handler; subclasses add locking here if they need it."""
+        return handler(parameters)
+
+    def _execute(self, query: str, parameters: dict, name: str) -> list[dict]:
+        name = query_name(query, name)
+        handler = self._handlers().get(name)
+        started = time.perf_counter()
+        if handler is None:
+            logger.error(f"❌ Query {name} is not supported by the {self.backend} graph backend")
+            query_metrics.record(name, 0.0, error=True)
+            return []
+        try:
+            result = self._call(handler, parameters or {})
+        except Exception as e:
+            logger.error(f"❌ Query {name} Failed: {e}")
+            query_metrics.record(name, (time.perf_counter() - started) * 1000, error=True)
+            return []
+        query_metrics.record(name, (time.perf_counter() - started) * 1000)
+        logger.debug("✅ Executed Query %s on %s backend", name, self.backend)
+        return result
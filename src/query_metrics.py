@@ -0,0 +1,94 @@
+import threading
+from bisect import bisect_left
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+class Histogram:
+    """Fixed-bucket latency histogram in milliseconds."""
+
+    def __init__(self, bounds: tuple = LATENCY_BUCKETS_MS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of observations (max for the open bucket)."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return float(self.bounds[index]) if index < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_ms": self.total,
+            "avg_ms": self.total / self.count if self.count else 0.0,
+            "min_ms": self.min,
+            "max_ms": self.max,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": {**{f"le_{bound}": count for bound, count in zip(self.bounds, self.counts)}, "le_inf": self.counts[-1]},
+        }
+
+class QueryMetrics:
+    """Per-query-name latency histograms.
+
+    For every named query three latencies are tracked: the client-side
+    round trip, and the server-side result_available_after (time to first
+    record) and result_consumed_after (time to stream the rest) reported
+    in the driver's result summary.
+    """
+
+    METRICS = ("client_ms", "result_available_after_ms", "result_consumed_after_ms")
+
+    def __init__(self) -> None:
+        self._queries = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, client_ms: float, available_after_ms: float = None,
+               consumed_after_ms: float = None, error: bool = False) -> None:
+        """Record one execution of the query called name."""
+        with self._lock:
+            entry = self._queries.get(name)
+            if entry is None:
+                entry = self._queries[name] = {"errors": 0, **{metric: Histogram() for metric in self.METRICS}}
+            entry["client_ms"].observe(client_ms)
+            if available_after_ms is not None:
+                entry["result_available_after_ms"].observe(available_after_ms)
+            if consumed_after_ms is not None:
+                entry["result_consumed_after_ms"].observe(consumed_after_ms)
+            if error:
+                entry["errors"] += 1
+
+    def snapshot(self) -> dict:
+        """{query name: {"errors": n, metric: histogram summary}} for every query seen so far."""
+        with self._lock:
+            return {
+                name: {"errors": entry["errors"], **{metric: entry[metric].snapshot() for metric in self.METRICS}}
+                for name, entry in self._queries.items()
+            }
+
+    def reset(self) -> None:
+        """Drop every recorded observation."""
+        with self._lock:
+            self._queries.clear()
+
+# Create a singleton instance
+query_metrics = QueryMetrics()
@@ -0,0 +1,284 @@
+import json
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from config import GRAPH_SQLITE_PATH
+from helper.logger import logger  # Import centralized logger
+from src.named_query_client import NamedQueryClient
+from src.workflow_io import AGENT_PROPERTIES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agents (
+    node_id TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    system_message TEXT,
+    user_message TEXT,
+    cache_llm INTEGER,
+    context_budget INTEGER,
+    context_policy TEXT
+);
+CREATE INDEX IF NOT EXISTS agents_namespace ON agents (namespace);
+CREATE TABLE IF NOT EXISTS next_agent (
+    edge_id INTEGER PRIMARY KEY,
+    from_id TEXT NOT NULL REFERENCES agents (node_id) ON DELETE CASCADE,
+    to_id TEXT NOT NULL REFERENCES agents (node_id) ON DELETE CASCADE,
+    max_iterations INTEGER,
+    until TEXT
+);
+CREATE INDEX IF NOT EXISTS next_agent_from ON next_agent (from_id, edge_id);
+CREATE INDEX IF NOT EXISTS next_agent_to ON next_agent (to_id);
+CREATE TABLE IF NOT EXISTS graph_version (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+AGENT_COLUMNS = ", ".join(f"a.{field}" for field in AGENT_PROPERTIES)
+
+AGENT_MESSAGES_SQL = f"SELECT {AGENT_COLUMNS} FROM agents a WHERE a.node_id = ?"
+
+NEXT_AGENT_SQL = f"""
+SELECT e.to_id AS next_agent_id, {AGENT_COLUMNS}, e.max_iterations, e.until
+FROM next_agent e JOIN agents a ON a.node_id = e.to_id
+WHERE e.from_id = ?
+ORDER BY e.edge_id
+"""
+
+# Batched lookups take the ids as one JSON array, so there is no bound-variable limit
+AGENTS_BATCH_SQL = f"""
+SELECT a.node_id, {AGENT_COLUMNS}
+FROM json_each(?) ids JOIN agents a ON a.node_id = ids.value
+"""
+
+NEXT_AGENTS_BATCH_SQL = f"""
+SELECT e.from_id AS node_id, e.to_id AS next_agent_id, {AGENT_COLUMNS}, e.max_iterations, e.until
+FROM json_each(?) ids
+JOIN next_agent e ON e.from_id = ids.value
+JOIN agents a ON a.node_id = e.to_id
+ORDER BY ids.key, e.edge_id
+"""
+
+# The NEXT_AGENT chain from the start node, one row per depth: each step
+# follows the agent's first edge, and the walk stops after the first agent
+# it has already visited, which is returned so the loader reports the cycle.
+# Every row lists all of the agent's successors so fan-out is visible.
+WORKFLOW_PATH_SQL = f"""
+WITH RECURSIVE walk (node_id, depth, visited, repeated) AS (
+    SELECT node_id, 0, json_array(node_id), 0 FROM agents WHERE node_id = ?
+    UNION
+    SELECT e.to_id, w.depth + 1, json_insert(w.visited, '$[#]', e.to_id),
+           EXISTS (SELECT 1 FROM json_each(w.visited) WHERE value = e.to_id)
+    FROM walk w JOIN next_agent e ON e.edge_id = (SELECT min(edge_id) FROM next_agent WHERE from_id = w.node_id)
+    WHERE NOT w.repeated
+)
+SELECT a.node_id, {AGENT_COLUMNS},
+       (SELECT json_group_array(to_id) FROM (SELECT to_id FROM next_agent WHERE from_id = a.node_id ORDER BY edge_id))
+           AS next_agent_ids
+FROM walk w JOIN agents a ON a.node_id = w.node_id
+ORDER BY w.depth
+"""
+
+# Every agent reachable from the start node (UNION drops revisits, so cycles
+# terminate) with its outgoing edges, one row per edge.
+WORKFLOW_GRAPH_SQL = f"""
+WITH RECURSIVE reachable (node_id) AS (
+    SELECT node_id FROM agents WHERE node_id = ?
+    UNION
+    SELECT e.to_id FROM reachable r JOIN next_agent e ON e.from_id = r.node_id
+)
+SELECT a.node_id, {AGENT_COLUMNS}, e.to_id AS next_agent_id, e.max_iterations, e.until
+FROM reachable r
+JOIN agents a ON a.node_id = r.node_id
+LEFT JOIN next_agent e ON e.from_id = a.node_id
+ORDER BY a.node_id, e.edge_id
+"""
+
+EXPORT_AGENTS_SQL = f"SELECT a.key, {AGENT_COLUMNS} FROM agents a WHERE a.namespace = ? ORDER BY a.node_id"
+
+EXPORT_EDGES_SQL = """
+SELECT a.key AS "from", b.key AS "to", e.max_iterations, e.until
+FROM agents a
+JOIN next_agent e ON e.from_id = a.node_id
+JOIN agents b ON b.node_id = e.to_id
+WHERE a.namespace = ?
+ORDER BY a.node_id, e.edge_id
+"""
+
+class _ThreadConnection:
+    """One thread's connection, closed when the thread ends and its thread-local is dropped."""
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self.close = weakref.finalize(self, conn.close)
+
+class SQLiteGraphClient(NamedQueryClient):
+    """Embedded agent graph in a local SQLite file for GRAPH_DB_TYPE=sqlite.
+
+    Agents and NEXT_AGENT edges are indexed tables and traversals are
+    recursive CTEs. Each thread gets its own connection and the database
+    runs in WAL mode, so any number of readers proceed concurrently with
+    a writer; a thread's connection is closed when the thread exits.
+    Node ids are "namespace:key". path must be a file, since every
+    connection has to see the same database.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str = GRAPH_SQLITE_PATH) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._open = weakref.WeakSet()  # Live _ThreadConnections, for close()
+        self._lock = threading.Lock()
+        with self._lock:
+            conn = self._connect()
+            conn.executescript(SCHEMA)
+        logger.info(f"✅ Opened SQLite graph at {self.path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection for the calling thread (caller holds the lock)."""
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        holder = _ThreadConnection(conn)
+        self._open.add(holder)
+        self._local.holder = holder
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use."""
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            with self._lock:
+                return self._connect()
+        return holder.conn
+
+    def close(self) -> None:
+        """Close every thread's connection."""
+        with self._lock:
+            for holder in list(self._open):
+                holder.close()
+            self._open = weakref.WeakSet()
+            self._local = threading.local()
+        logger.info("✅ Closed SQLite graph")
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction on this thread's connection; nested blocks join the outer one."""
+        conn = self._connection()
+        if conn.in_transaction:
+            yield conn
+            return
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+
+    def _atomic(self):
+        return self._transaction()
+
+    def _handlers(self) -> dict:
+        return {
+            "agent_messages": lambda parameters: self._rows(AGENT_MESSAGES_SQL, (parameters.get("node_id"),)),
+            "next_agent": lambda parameters: self._rows(NEXT_AGENT_SQL, (parameters.get("node_id"),)),
+            "agents_batch": lambda parameters: self._rows(AGENTS_BATCH_SQL, (json.dumps(parameters["ids"]),)),
+            "next_agents_batch": lambda parameters: self._rows(NEXT_AGENTS_BATCH_SQL, (json.dumps(parameters["ids"]),)),
+            "workflow_path": self._workflow_path,
+            "workflow_graph": self._workflow_graph,
+            "graph_version": self._graph_version,
+            "bump_graph_version": self._bump_graph_version,
+            "namespace_index": lambda parameters: [],
+            "reset_namespace": self._reset_namespace,
+            "import_agents": self._import_agents,
+            "import_edges": self._import_edges,
+            "export_agents": lambda parameters: self._rows(EXPORT_AGENTS_SQL, (parameters["namespace"],)),
+            "export_edges": lambda parameters: self._rows(EXPORT_EDGES_SQL, (parameters["namespace"],)),
+        }
+
+    def _rows(self, sql: str, parameters: tuple = ()) -> list[dict]:
+        """Run a read statement and return its rows as dicts."""
+        return [_agent_row(row) for row in self._connection().execute(sql, parameters)]
+
+    def _workflow_path(self, parameters: dict) -> list[dict]:
+        records = self._rows(WORKFLOW_PATH_SQL, (parameters.get("node_id"),))
+        for record in records:
+            record["next_agent_ids"] = json.loads(record["next_agent_ids"])
+        return records
+
+    def _workflow_graph(self, parameters: dict) -> list[dict]:
+        """Fold the one-row-per-edge CTE result into one record per agent."""
+        records = {}
+        for row in self._rows(WORKFLOW_GRAPH_SQL, (parameters.get("node_id"),)):
+            next_id, max_iterations, until = row.pop("next_agent_id"), row.pop("max_iterations"), row.pop("until")
+            record = records.setdefault(row["node_id"], {**row, "next_agent_ids": [], "loop_edges": []})
+            if next_id is None:
+                continue
+            record["next_agent_ids"].append(next_id)
+            if max_iterations is not None:
+                record["loop_edges"].append({"next_agent_id": next_id, "max_iterations": max_iterations, "until": until})
+        return list(records.values())
+
+    def _graph_version(self, parameters: dict) -> list[dict]:
+        row = self._connection().execute("SELECT version FROM graph_version WHERE name = 'workflow'").fetchone()
+        return [{"version": row["version"] if row else 0}]
+
+    def _bump_graph_version(self, parameters: dict) -> list[dict]:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO graph_version (name, version) VALUES ('workflow', 1) "
+                "ON CONFLICT (name) DO UPDATE SET version = version + 1"
+            )
+            return self._graph_version(parameters)
+
+    def _reset_namespace(self, parameters: dict) -> list[dict]:
+        """Delete a namespace's agents; their edges go with them (ON DELETE CASCADE)."""
+        with self._transaction() as conn:
+            deleted = conn.execute("DELETE FROM agents WHERE namespace = ?", (parameters["namespace"],)).rowcount
+        return [{"deleted": deleted}]
+
+    def _import_agents(self, parameters: dict) -> list[dict]:
+        """Insert one batch of agents in a single transaction and return their node ids."""
+        namespace = parameters["namespace"]
+        records = []
+        with self._transaction() as conn:
+            for row in parameters["rows"]:
+                node_id = _free_node_id(conn, f"{namespace}:{row['key']}")
+                properties = row["properties"]
+                conn.execute(
+                    f"INSERT INTO agents (node_id, namespace, key, {', '.join(AGENT_PROPERTIES)}) "
+                    f"VALUES (?, ?, ?, {', '.join('?' for _ in AGENT_PROPERTIES)})",
+                    (node_id, namespace, row["key"], *(_to_sql(properties.get(field)) for field in AGENT_PROPERTIES)),
+                )
+                records.append({"key": row["key"], "node_id": node_id})
+        return records
+
+    def _import_edges(self, parameters: dict) -> list[dict]:
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO next_agent (from_id, to_id, max_iterations, until) VALUES (?, ?, ?, ?)",
+                [
+                    (row["from_id"], row["to_id"], row["properties"].get("max_iterations"), row["properties"].get("until"))
+                    for row in parameters["rows"]
+                ],
+            )
+        return [{"created": len(parameters["rows"])}]
+
+def _free_node_id(conn: sqlite3.Connection, node_id: str) -> str:
+    """node_id, or node_id#2, #3, ... if it is already taken."""
+    candidate, suffix = node_id, 1
+    while conn.execute("SELECT 1 FROM agents WHERE node_id = ?", (candidate,)).fetchone():
+        suffix += 1
+        candidate = f"{node_id}#{suffix}"
+    return candidate
+
+def _to_sql(value):
+    """SQLite has no boolean type; store cache_llm as 0/1."""
+    return int(value) if isinstance(value, bool) else value
+
+def _agent_row(row: sqlite3.Row) -> dict:
+    record = dict(row)
+    if record.get("cache_llm") is not None:
+        record["cache_llm"] = bool(record["cache_llm"])
+    return record
@@ -0,0 +1,93 @@
+import re
+import threading
+from collections import Counter
+from config import SUMMARIZE_THRESHOLD_CHARS, SUMMARY_MAX_CHARS, SUMMARIZER, SUMMARIZER_MODEL
+from helper.logger import logger  # Import centralized logger
+from src.llm_client import LLMClient, parse_llm_response
+
+SUMMARY_SYSTEM_MESSAGE = (
+    "You are a summarizer. Condense the user's text to at most {max_chars} characters. "
+    "Keep every fact, conclusion and open issue; drop repetition and filler."
+)
+
+# Sentences end at ., ! or ? (or a line break); words are alphanumeric runs
+_SENTENCE_PATTERN = re.compile(r"[^.!?\n]+(?:[.!?]+|\n|$)")
+_WORD_PATTERN = re.compile(r"\w+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+_summary_client = None
+_summary_client_lock = threading.Lock()
+
+def _words(text: str) -> list[str]:
+    """Lower-cased content words of text."""
+    return [word for word in _WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS]
+
+def extractive_summary(text: str, max_chars: int = None) -> str:
+    """Summarize text locally by keeping its most representative sentences.
+
+    Sentences are scored by the average document frequency of their
+    content words, picked best-first while they fit in max_chars, and
+    returned in their original order.
+    """
+    max_chars = SUMMARY_MAX_CHARS if max_chars is None else max_chars
+    if len(text) <= max_chars:
+        return text
+    sentences = [sentence.strip() for sentence in _SENTENCE_PATTERN.findall(text) if sentence.strip()]
+    frequencies = Counter(_words(text))
+    if not sentences or not frequencies:
+        return text[:max_chars]
+
+    def score(sentence: str) -> float:
+        words = _words(sentence)
+        return sum(frequencies[word] for word in words) / len(words) if words else 0.0
+
+    ranked = sorted(range(len(sentences)), key=lambda index: score(sentences[index]), reverse=True)
+    chosen = []
+    length = 0
+    for index in ranked:
+        extra = len(sentences[index]) + (1 if chosen else 0)
+        if length + extra <= max_chars:
+            chosen.append(index)
+            length += extra
+    if not chosen:
+        return sentences[ranked[0]][:max_chars]
+    return " ".join(sentences[index] for index in sorted(chosen))
+
+def _client() -> LLMClient:
+    """Return the summarization LLM client, creating it on first use."""
+    global _summary_client
+    with _summary_client_lock:
+        if _summary_client is None:
+            _summary_client = LLMClient(model=SUMMARIZER_MODEL)
+        return _summary_client
+
+def llm_summary(text: str, max_chars: int = None) -> tuple[str, str]:
+    """Summarize text with the (cheap) summarization model; returns (summary, error)."""
+    max_chars = SUMMARY_MAX_CHARS if max_chars is None else max_chars
+    system_message = SUMMARY_SYSTEM_MESSAGE.format(max_chars=max_chars)
+    return parse_llm_response(_client().call_llm(system_message, text))
+
+def needs_summary(text: str) -> bool:
+    """Whether text is over the configured summarization threshold (0 disables it)."""
+    return 0 < SUMMARIZE_THRESHOLD_CHARS < len(text)
+
+def summarize_for_next_hop(text: str) -> str:
+    """Condense an agent's output before it is passed to the next agent.
+
+    Outputs within SUMMARIZE_THRESHOLD_CHARS are passed through unchanged.
+    The llm summarizer falls back to the extractive one if the call fails.
+    """
+    if not needs_summary(text):
+        return text
+    if SUMMARIZER == "llm":
+        summary, error = llm_summary(text)
+        if not error:
+            logger.info(f"✅ Summarized {len(text)} chars to {len(summary)} chars with the LLM summarizer")
+            return summary
+        logger.warning(f"❌ LLM summarization failed, falling back to extractive: {error}")
+    summary = extractive_summary(text)
+    logger.info(f"✅ Summarized {len(text)} chars to {len(summary)} chars")
+    return summary
@@ -0,0 +1,255 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional
+import requests
+from config import TRACE_EXPORTER, TRACE_OTLP_ENDPOINT, TRACE_PATH
+from helper.logger import logger  # Import centralized logger
+
+# Spans flushed per OTLP request when no root span has finished yet
+OTLP_BATCH_SIZE = 64
+
+# Span timestamps come from the monotonic clock shifted to wall-clock time once,
+# so nested spans always order correctly
+_WALL_CLOCK_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+def _now_ns() -> int:
+    return time.perf_counter_ns() + _WALL_CLOCK_OFFSET_NS
+
+@dataclass
+class Span:
+    """A timed unit of work (a run, a hop, a query, an LLM call) within a trace."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_time_ns: int = 0
+    end_time_ns: int = 0
+    attributes: dict = field(default_factory=dict)
+    status: str = "ok"
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_time_ns - self.start_time_ns) / 1e6
+
+    def set(self, key: str, value) -> None:
+        """Set one attribute; None values are dropped."""
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: dict) -> None:
+        """Set several attributes at once."""
+        for key, value in attributes.items():
+            self.set(key, value)
+
+    def record_error(self, message: str) -> None:
+        """Mark the span as failed without raising."""
+        self.status = "error"
+        self.attributes["error"] = message
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time_ns": self.start_time_ns,
+            "end_time_ns": self.end_time_ns,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+class _NoopSpan:
+    """Yielded by Tracer.span while no exporter is configured; every update is dropped."""
+
+    def set(self, key: str, value) -> None:
+        pass
+
+    def set_attributes(self, attributes: dict) -> None:
+        pass
+
+    def record_error(self, message: str) -> None:
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+class SpanExporter(ABC):
+    """Receives every finished span; subclass to send spans elsewhere."""
+
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        """Handle one finished span."""
+
+    def flush(self) -> None:
+        """Write out anything buffered."""
+
+class JSONLSpanExporter(SpanExporter):
+    """Append one JSON object per finished span to a local file."""
+
+    def __init__(self, path: str = TRACE_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as trace_file:
+            trace_file.write(line)
+
+class OTLPSpanExporter(SpanExporter):
+    """Export spans as OTLP/JSON trace requests.
+
+    With an endpoint (an OTLP/HTTP collector, e.g. http://localhost:4318/v1/traces)
+    each batch is POSTed; otherwise batches are appended as lines to a file
+    the collector's otlpjsonfile receiver can read. A batch is flushed when
+    a root span finishes or OTLP_BATCH_SIZE spans are buffered.
+    """
+
+    def __init__(self, path: str = TRACE_PATH, endpoint: str = TRACE_OTLP_ENDPOINT,
+                 service_name: str = "genflow") -> None:
+        self.path = path
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._buffer = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._buffer.append(span)
+            if span.parent_id is not None and len(self._buffer) < OTLP_BATCH_SIZE:
+                return
+            batch, self._buffer = self._buffer, []
+        self._send(batch)
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            self._send(batch)
+
+    def _send(self, batch: list[Span]) -> None:
+        """Write or POST one OTLP/JSON ExportTraceServiceRequest."""
+        request = self.to_otlp(batch)
+        if self.endpoint:
+            try:
+                requests.post(self.endpoint, json=request, timeout=5)
+            except Exception as e:
+                logger.error(f"❌ OTLP export failed: {e}")
+            return
+        with open(self.path, "a", encoding="utf-8") as trace_file:
+            trace_file.write(json.dumps(request, default=str) + "\n")
+
+    def to_otlp(self, batch: list[Span]) -> dict:
+        """Build the OTLP/JSON request body for a batch of spans."""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "genflow"},
+                    "spans": [{
+                        "traceId": span.trace_id,
+                        "spanId": span.span_id,
+                        "parentSpanId": span.parent_id or "",
+                        "name": span.name,
+                        "kind": 1,
+                        "startTimeUnixNano": str(span.start_time_ns),
+                        "endTimeUnixNano": str(span.end_time_ns),
+                        "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+                        "status": {"code": 2 if span.status == "error" else 1},
+                    } for span in batch],
+                }],
+            }]
+        }
+
+def _otlp_attribute(key: str, value) -> dict:
+    """Encode one attribute as an OTLP KeyValue."""
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+def exporter_from_config(kind: str = TRACE_EXPORTER) -> Optional[SpanExporter]:
+    """Build the exporter named by TRACE_EXPORTER (none, jsonl or otlp)."""
+    kind = (kind or "none").lower()
+    if kind == "none":
+        return None
+    if kind == "jsonl":
+        return JSONLSpanExporter()
+    if kind == "otlp":
+        return OTLPSpanExporter()
+    raise ValueError(f"❌ Unsupported TRACE_EXPORTER: {kind}")
+
+class Tracer:
+    """Create nested spans and hand finished ones to the configured exporter.
+
+    The active span is tracked in a context variable, so spans nest across
+    function calls; copy the context (contextvars.copy_context) when handing
+    work to another thread to keep its spans in the same trace.
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter] = None) -> None:
+        self.exporter = exporter
+        self._current = contextvars.ContextVar("genflow_current_span", default=None)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether finished spans go anywhere; skip costly attributes when not."""
+        return self.exporter is not None
+
+    def set_exporter(self, exporter: Optional[SpanExporter]) -> None:
+        """Replace the exporter, flushing the old one."""
+        if self.exporter is not None:
+            self.exporter.flush()
+        self.exporter = exporter
+
+    def current_span(self) -> Optional[Span]:
+        """The innermost active span, if any."""
+        return self._current.get()
+
+    @contextmanager
+    def span(self, name: str, activate: bool = True, **attributes):
+        """Time the enclosed block as a child of the current span.
+
+        With activate=False the span does not become the current span, so a
+        generator can hold it open across yields without adopting the
+        caller's spans as its children. Without an exporter nothing is
+        created or timed and a shared no-op span is yielded.
+        """
+        if self.exporter is None:
+            yield _NOOP_SPAN
+            return
+        parent = self._current.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent is not None else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent is not None else None,
+            start_time_ns=_now_ns(),
+        )
+        span.set_attributes(attributes)
+        token = self._current.set(span) if activate else None
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(str(e) or type(e).__name__)
+            raise
+        finally:
+            span.end_time_ns = _now_ns()
+            if token is not None:
+                self._current.reset(token)
+            if self.exporter is not None:
+                try:
+                    self.exporter.export(span)
+                except Exception as e:
+                    logger.error(f"❌ Span export failed: {e}")
+
+# Create a singleton instance
+tracer = Tracer(exporter_from_config())
@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+from config import WORKFLOW_CACHE_MAX_ENTRIES, WORKFLOW_CACHE_TTL, WORKFLOW_VERSION_CHECK_INTERVAL
+from helper.logger import logger  # Import centralized logger
+from src.workflow_loader import WorkflowPlan, get_graph_version, load_workflow
+
+class WorkflowCache:
+    """LRU + TTL cache of compiled workflow plans keyed by (start node, graph version).
+
+    Before serving a plan, the cache reads the graph version stamp (at most
+    once per version_check_interval seconds). When the version changes, every
+    cached plan is dropped, so graph edits take effect on the next run.
+    """
+
+    def __init__(self, max_entries: int = WORKFLOW_CACHE_MAX_ENTRIES, ttl: float = WORKFLOW_CACHE_TTL,
+                 version_check_interval: float = WORKFLOW_VERSION_CHECK_INTERVAL) -> None:
+        """Initialize an empty cache."""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # (node_id, version) -> (loaded_at, plan)
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked_at = float("-inf")
+
+    def current_version(self) -> int:
+        """Return the graph version, re-reading it when the check interval has elapsed."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._version_checked_at < self.version_check_interval:
+                return self._version
+        version = get_graph_version()
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    logger.info(f"✅ Workflow graph version changed to {version}, invalidating cached plans")
+                self._entries.clear()
+                self._version = version
+            self._version_checked_at = now
+        return version
+
+    def get(self, node_id: str) -> WorkflowPlan:
+        """Return the compiled plan for node_id, loading it from the graph on a miss."""
+        version = self.current_version()
+        if version is None:
+            # The version stamp could not be read; don't trust or populate the cache
+            return load_workflow(node_id)
+
+        key = (node_id, version)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        plan = load_workflow(node_id)
+        if plan.agents:  # Unknown start nodes may be created later
+            with self._lock:
+                self._entries[key] = (now, plan)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return plan
+
+    def invalidate(self, node_id: str = None) -> None:
+        """Drop the cached plan for node_id, or every plan when node_id is None."""
+        with self._lock:
+            if node_id is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == node_id]:
+                    del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# Create a singleton instance
+workflow_cache = WorkflowCache()
@@ -0,0 +1,242 @@
+import argparse
+import json
+from config import WORKFLOW_IMPORT_BATCH_SIZE, WORKFLOW_RESET_BATCH_SIZE
+from helper.logger import logger  # Import centralized logger
+from src.context_budget import TRIM_POLICIES
+from src.graph_client import graph_client
+from src.workflow_loader import bump_graph_version
+
+# Agent properties carried by the file format; anything else on an agent is ignored
+AGENT_PROPERTIES = ("system_message", "user_message", "cache_llm", "context_budget", "context_policy")
+# NEXT_AGENT properties carried by the file format (bounded loops)
+EDGE_PROPERTIES = ("max_iterations", "until")
+
+# Keeps namespace-scoped matches (import, export, reset) index lookups
+NAMESPACE_INDEX_QUERY = "CREATE INDEX agent_namespace IF NOT EXISTS FOR (a:Agent) ON (a.namespace)"
+
+# Delete one namespace in many small transactions; the batch size is formatted in
+# because it must be a literal. Needs an auto-commit (implicit) transaction.
+# The count always returns one row, so an empty result means the query failed.
+RESET_NAMESPACE_QUERY = """
+MATCH (a:Agent {{namespace: $namespace}})
+CALL {{ WITH a DETACH DELETE a }} IN TRANSACTIONS OF {batch_size} ROWS
+RETURN count(*) AS deleted
+"""
+
+# Create one batch of agents; elementIds are returned so edges can be attached without a lookup index
+IMPORT_AGENTS_QUERY = """
+UNWIND $rows AS row
+CREATE (a:Agent)
+SET a = row.properties, a.key = row.key, a.namespace = $namespace
+RETURN row.key AS key, elementId(a) AS node_id
+"""
+
+IMPORT_EDGES_QUERY = """
+UNWIND $rows AS row
+MATCH (a:Agent) WHERE elementId(a) = row.from_id
+MATCH (b:Agent) WHERE elementId(b) = row.to_id
+CREATE (a)-[r:NEXT_AGENT]->(b)
+SET r = row.properties
+RETURN count(*) AS created
+"""
+
+EXPORT_AGENTS_QUERY = """
+MATCH (a:Agent {namespace: $namespace})
+RETURN coalesce(a.key, elementId(a)) AS key, a.system_message AS system_message, a.user_message AS user_message,
+       a.cache_llm AS cache_llm, a.context_budget AS context_budget, a.context_policy AS context_policy
+"""
+
+EXPORT_EDGES_QUERY = """
+MATCH (a:Agent {namespace: $namespace})-[r:NEXT_AGENT]->(b:Agent)
+RETURN coalesce(a.key, elementId(a)) AS from, coalesce(b.key, elementId(b)) AS to,
+       r.max_iterations AS max_iterations, r.until AS until
+"""
+
+def _yaml():
+    """Import PyYAML on demand; YAML support is optional."""
+    try:
+        import yaml
+    except ImportError:
+        raise ValueError("❌ YAML workflow files need PyYAML (pip install pyyaml)") from None
+    return yaml
+
+def _is_yaml(path: str) -> bool:
+    return path.endswith((".yaml", ".yml"))
+
+def load_workflow_file(path: str) -> dict:
+    """Read a workflow definition from a JSON or YAML file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return _yaml().safe_load(f) if _is_yaml(path) else json.load(f)
+
+def _compact(record: dict, keys: tuple) -> dict:
+    """Keep the known properties that are set."""
+    return {key: record[key] for key in keys if record.get(key) is not None}
+
+def agent_rows(workflow: dict) -> list[dict]:
+    """The import_agents rows of a workflow definition: {"key", "properties"}."""
+    return [{"key": agent["key"], "properties": _compact(agent, AGENT_PROPERTIES)} for agent in workflow.get("agents") or ()]
+
+def edge_rows(workflow: dict, node_ids: dict) -> list[dict]:
+    """The import_edges rows of a workflow definition, given the node id of every agent key."""
+    return [
+        {"from_id": node_ids[edge["from"]], "to_id": node_ids[edge["to"]], "properties": _compact(edge, EDGE_PROPERTIES)}
+        for edge in workflow.get("edges") or ()
+    ]
+
+def validate_workflow(workflow: dict) -> None:
+    """Raise ValueError if agent keys are missing or duplicated, a context policy is unknown, or an edge points at an unknown agent."""
+    keys = set()
+    for agent in workflow.get("agents") or ():
+        key = agent.get("key")
+        if key is None:
+            raise ValueError("❌ Every agent needs a key")
+        if key in keys:
+            raise ValueError(f"❌ Duplicate agent key: {key}")
+        keys.add(key)
+        policy = agent.get("context_policy")
+        if policy is not None and policy not in TRIM_POLICIES:
+            raise ValueError(f"❌ Agent {key} has an unsupported context trim policy: {policy}")
+    for edge in workflow.get("edges") or ():
+        for end in ("from", "to"):
+            if edge.get(end) not in keys:
+                raise ValueError(f"❌ Edge {edge.get('from')} -> {edge.get('to')} references unknown agent {edge.get(end)}")
+    start = workflow.get("start")
+    if start is not None and start not in keys:
+        raise ValueError(f"❌ Start agent {start} is not defined")
+
+def _batches(items: list, batch_size: int):
+    for index in range(0, len(items), batch_size):
+        yield items[index:index + batch_size]
+
+def ensure_namespace_index() -> None:
+    """Create the Agent namespace index if it does not exist yet."""
+    graph_client.execute_query(NAMESPACE_INDEX_QUERY, name="namespace_index")
+
+def reset_namespace(namespace: str, batch_size: int = WORKFLOW_RESET_BATCH_SIZE) -> None:
+    """Delete every agent (and its edges) in one namespace, batch_size nodes per transaction.
+
+    Other namespaces are untouched, and no single transaction grows with
+    the size of the namespace.
+    """
+    if not namespace:
+        raise ValueError("❌ reset_namespace needs a namespace")
+    ensure_namespace_index()
+    records = graph_client.execute_query(RESET_NAMESPACE_QUERY.format(batch_size=int(batch_size)), {"namespace": namespace},
+                                         name="reset_namespace")
+    if not records:
+        raise RuntimeError(f"❌ Resetting workflow namespace {namespace} failed")
+    bump_graph_version()
+    logger.info(f"✅ Reset workflow namespace {namespace}: {records[0].get('deleted')} agent(s) deleted")
+
+def import_workflow(workflow, namespace: str = None, batch_size: int = WORKFLOW_IMPORT_BATCH_SIZE,
+                    replace: bool = False) -> dict:
+    """Create a workflow's agents and NEXT_AGENT edges with batched UNWIND writes.
+
+    workflow is a definition dict or a path to a JSON/YAML file:
+    {"namespace": ..., "start": key, "agents": [{"key": ..., "system_message": ..., ...}],
+     "edges": [{"from": key, "to": key, "max_iterations": n, "until": ...}]}
+    Each batch of batch_size rows is one write transaction. Returns the
+    namespace, counts, the node id of every agent key and the start node id.
+    With replace=True the namespace is reset first.
+    """
+    if isinstance(workflow, str):
+        workflow = load_workflow_file(workflow)
+    validate_workflow(workflow)
+    namespace = namespace or workflow.get("namespace") or "default"
+    if replace:
+        reset_namespace(namespace)
+    else:
+        ensure_namespace_index()
+
+    agents = agent_rows(workflow)
+    node_ids = {}
+    for batch in _batches(agents, batch_size):
+        records = graph_client.write(IMPORT_AGENTS_QUERY, {"rows": batch, "namespace": namespace}, name="import_agents")
+        if len(records) != len(batch):
+            raise RuntimeError(f"❌ Importing workflow {namespace} failed after {len(node_ids)} agent(s)")
+        node_ids.update((record["key"], record["node_id"]) for record in records)
+
+    edges = edge_rows(workflow, node_ids)
+    created = 0
+    for batch in _batches(edges, batch_size):
+        records = graph_client.write(IMPORT_EDGES_QUERY, {"rows": batch}, name="import_edges")
+        if not records or records[0].get("created") != len(batch):
+            raise RuntimeError(f"❌ Importing workflow {namespace} failed after {created} edge(s)")
+        created += len(batch)
+
+    bump_graph_version()
+    start = workflow.get("start")
+    logger.info(f"✅ Imported workflow {namespace}: {len(agents)} agent(s), {len(edges)} edge(s)")
+    return {
+        "namespace": namespace,
+        "agents": len(agents),
+        "edges": len(edges),
+        "node_ids": node_ids,
+        "start_node_id": node_ids.get(start) if start is not None else None,
+    }
+
+def export_workflow(namespace: str, path: str, start: str = None) -> dict:
+    """Stream a namespace's agents and edges to a JSON or YAML workflow file.
+
+    Records are written as they arrive from the graph, so memory use does
+    not grow with the size of the workflow.
+    """
+    counts = {"agents": 0, "edges": 0}
+    yaml = _yaml() if _is_yaml(path) else None
+
+    def write_section(f, section: str, query: str, name: str, keys: tuple, first: bool) -> None:
+        if yaml is not None:
+            f.write(f"{section}:\n")
+        else:
+            f.write(("" if first else ",\n") + f'  "{section}": [')
+        for index, record in enumerate(graph_client.stream_query(query, {"namespace": namespace}, name=name)):
+            item = {key: record[key] for key in keys if record.get(key) is not None}
+            if yaml is not None:
+                f.write(yaml.safe_dump([item], sort_keys=False))
+            else:
+                f.write(("\n    " if index == 0 else ",\n    ") + json.dumps(item))
+            counts[section] += 1
+        if yaml is None:
+            f.write("\n  ]" if counts[section] else "]")
+
+    with open(path, "w", encoding="utf-8") as f:
+        header = {"namespace": namespace, **({"start": start} if start is not None else {})}
+        if yaml is not None:
+            f.write(yaml.safe_dump(header, sort_keys=False))
+        else:
+            f.write("{\n" + ",\n".join(f"  {json.dumps(key)}: {json.dumps(value)}" for key, value in header.items()) + ",\n")
+        write_section(f, "agents", EXPORT_AGENTS_QUERY, "export_agents", ("key",) + AGENT_PROPERTIES, first=True)
+        write_section(f, "edges", EXPORT_EDGES_QUERY, "export_edges", ("from", "to") + EDGE_PROPERTIES, first=False)
+        if yaml is None:
+            f.write("\n}\n")
+
+    logger.info(f"✅ Exported workflow {namespace} to {path}: {counts['agents']} agent(s), {counts['edges']} edge(s)")
+    return {"namespace": namespace, "path": path, **counts}
+
+def main(argv: list[str] = None) -> dict:
+    """Command-line entry point: python -m src.workflow_io import|export|reset ..."""
+    parser = argparse.ArgumentParser(description="Import or export GenFlow workflow files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="Create a workflow from a JSON/YAML file")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--namespace")
+    import_parser.add_argument("--batch-size", type=int, default=WORKFLOW_IMPORT_BATCH_SIZE)
+    import_parser.add_argument("--replace", action="store_true", help="Reset the namespace before importing")
+    export_parser = commands.add_parser("export", help="Write a namespace's workflow to a JSON/YAML file")
+    export_parser.add_argument("namespace")
+    export_parser.add_argument("path")
+    reset_parser = commands.add_parser("reset", help="Delete every agent in a namespace")
+    reset_parser.add_argument("namespace")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        result = import_workflow(args.path, args.namespace, args.batch_size, args.replace)
+        result.pop("node_ids")
+        return result
+    if args.command == "reset":
+        reset_namespace(args.namespace)
+        return {"namespace": args.namespace, "reset": True}
+    return export_workflow(args.namespace, args.path)
+
+if __name__ == "__main__":
+    print(json.dumps(main()))
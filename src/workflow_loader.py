@@ -0,0 +1,260 @@
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+from helper.logger import logger  # Import centralized logger
+from src.graph_client import graph_client
+
+# Fetch the whole NEXT_AGENT chain from a start node in a single round trip:
+# every reachable agent with its successors, which load_workflow walks one
+# edge per hop. Only distinct end nodes are kept, so the planner prunes the
+# expansion and each agent is visited once instead of once per path.
+WORKFLOW_PATH_QUERY = """
+MATCH (start:Agent)-[:NEXT_AGENT*0..]->(a:Agent)
+WHERE elementId(start) = $node_id
+WITH DISTINCT a
+OPTIONAL MATCH (a)-[:NEXT_AGENT]->(next:Agent)
+RETURN elementId(a) AS node_id, a.system_message AS system_message, a.user_message AS user_message,
+       a.cache_llm AS cache_llm, a.context_budget AS context_budget, a.context_policy AS context_policy,
+       collect(elementId(next)) AS next_agent_ids
+"""
+
+# Fetch every agent reachable from a start node together with its outgoing
+# NEXT_AGENT targets, so fan-out and fan-in are preserved. Edges carrying a
+# max_iterations property are returned separately as bounded loop edges.
+WORKFLOW_GRAPH_QUERY = """
+MATCH (start:Agent)-[:NEXT_AGENT*0..]->(a:Agent)
+WHERE elementId(start) = $node_id
+WITH DISTINCT a
+OPTIONAL MATCH (a)-[r:NEXT_AGENT]->(next:Agent)
+RETURN elementId(a) AS node_id, a.system_message AS system_message, a.user_message AS user_message,
+       a.cache_llm AS cache_llm, a.context_budget AS context_budget, a.context_policy AS context_policy,
+       collect(elementId(next)) AS next_agent_ids,
+       collect(CASE WHEN r.max_iterations IS NULL THEN NULL
+               ELSE {next_agent_id: elementId(next), max_iterations: r.max_iterations, until: r.until} END) AS loop_edges
+"""
+
+# Version stamp bumped on every workflow graph edit; reading it is a single
+# index lookup, so it is cheap enough to run before serving a cached plan.
+GRAPH_VERSION_QUERY = """
+OPTIONAL MATCH (v:GraphVersion {name: 'workflow'})
+RETURN coalesce(v.version, 0) AS version
+"""
+
+BUMP_GRAPH_VERSION_QUERY = """
+MERGE (v:GraphVersion {name: 'workflow'})
+SET v.version = coalesce(v.version, 0) + 1
+RETURN v.version AS version
+"""
+
+class WorkflowCycleError(ValueError):
+    """Raised when a workflow contains a NEXT_AGENT cycle that is not bounded by max_iterations."""
+
+class WorkflowFanOutError(ValueError):
+    """Raised when a workflow compiled as a linear chain has an agent with several NEXT_AGENT edges."""
+
+@dataclass(frozen=True)
+class LoopSpec:
+    """Bounds of a NEXT_AGENT edge that closes a loop (e.g. writer <-> critic).
+
+    The edge is followed at most max_iterations times per run, and never
+    once the convergence predicate `until` matches the latest response.
+    `until` is "contains:TEXT", "regex:PATTERN" or plain TEXT (contains).
+    """
+    max_iterations: int
+    until: Optional[str] = None
+
+    def converged(self, response: str) -> bool:
+        """Whether the response satisfies the convergence predicate."""
+        if not self.until:
+            return False
+        kind, _, argument = self.until.partition(":")
+        if kind == "regex" and argument:
+            return re.search(argument, response) is not None
+        if kind == "contains" and argument:
+            return argument in response
+        return self.until in response
+
+@dataclass(frozen=True)
+class AgentSpec:
+    """Everything the executor needs to run a single agent."""
+    node_id: str
+    system_message: str
+    user_message: str
+    cache_llm: bool = True  # Set cache_llm: false on the Agent node to bypass the LLM response cache
+    context_budget: Optional[int] = None  # Max tokens of upstream context; None uses CONTEXT_TOKEN_BUDGET
+    context_policy: Optional[str] = None  # head, tail or middle_out; None uses CONTEXT_TRIM_POLICY
+
+    @classmethod
+    def from_record(cls, record: dict) -> "AgentSpec":
+        """Build an agent spec from a graph query record."""
+        return cls(
+            node_id=record.get("node_id"),
+            system_message=record.get("system_message") or "No system message found",
+            user_message=record.get("user_message") or "No user message found",
+            cache_llm=record.get("cache_llm") is not False,
+            context_budget=record.get("context_budget"),
+            context_policy=record.get("context_policy"),
+        )
+
+@dataclass(frozen=True)
+class WorkflowPlan:
+    """Compiled, in-memory workflow: the ordered agents of a NEXT_AGENT chain."""
+    start_node_id: str
+    agents: tuple
+
+    def __len__(self) -> int:
+        return len(self.agents)
+
+    def __iter__(self):
+        return iter(self.agents)
+
+@dataclass(frozen=True)
+class WorkflowGraph:
+    """Compiled, in-memory workflow graph: agents keyed by node id plus NEXT_AGENT edges.
+
+    loops maps (from_id, to_id) of bounded loop edges to their LoopSpec.
+    """
+    start_node_id: str
+    agents: dict
+    edges: dict
+    loops: dict = field(default_factory=dict)
+
+    def predecessors(self) -> dict:
+        """Map each node id to the ids of the agents that feed into it."""
+        incoming = {node_id: [] for node_id in self.agents}
+        for node_id, next_ids in self.edges.items():
+            for next_id in next_ids:
+                incoming[next_id].append(node_id)
+        return incoming
+
+    def layers(self) -> list[list[str]]:
+        """Group node ids into topological layers (Kahn's algorithm).
+
+        Agents in the same layer do not depend on each other. Raises
+        ValueError if the graph contains a cycle.
+        """
+        in_degree = {node_id: len(preds) for node_id, preds in self.predecessors().items()}
+        layer = sorted(node_id for node_id, degree in in_degree.items() if degree == 0)
+        layers = []
+        visited = 0
+        while layer:
+            layers.append(layer)
+            visited += len(layer)
+            next_layer = []
+            for node_id in layer:
+                for next_id in self.edges.get(node_id, ()):
+                    in_degree[next_id] -= 1
+                    if in_degree[next_id] == 0:
+                        next_layer.append(next_id)
+            layer = sorted(next_layer)
+        if visited != len(self.agents):
+            raise WorkflowCycleError(f"❌ Workflow starting at {self.start_node_id} contains a NEXT_AGENT cycle")
+        return layers
+
+    def check_cycles(self) -> None:
+        """Raise WorkflowCycleError unless every cycle contains a bounded loop edge.
+
+        Removing the loop edges must leave an acyclic graph; otherwise some
+        cycle could be followed forever.
+        """
+        forward = WorkflowGraph(
+            start_node_id=self.start_node_id,
+            agents=self.agents,
+            edges={node_id: tuple(next_id for next_id in next_ids if (node_id, next_id) not in self.loops)
+                   for node_id, next_ids in self.edges.items()},
+        )
+        try:
+            forward.layers()
+        except WorkflowCycleError:
+            raise WorkflowCycleError(
+                f"❌ Workflow starting at {self.start_node_id} contains a NEXT_AGENT cycle without max_iterations"
+            ) from None
+
+    def next_agent(self, node_id: str, response: str, iterations: dict) -> Optional[str]:
+        """Choose the agent to run after node_id, or None at the end of the workflow.
+
+        A loop edge is taken while its iteration count (tracked in
+        `iterations`) is below max_iterations and its predicate has not
+        converged; otherwise the first forward edge is followed.
+        """
+        return choose_next_agent(node_id, self.edges.get(node_id, ()), self.loops, response, iterations)
+
+def choose_next_agent(node_id: str, next_ids, loops: dict, response: str, iterations: dict) -> Optional[str]:
+    """Pick the successor of node_id among next_ids, honouring bounded loop edges.
+
+    loops maps (from_id, to_id) to a LoopSpec. A loop edge is taken while
+    its count in `iterations` is below max_iterations and its predicate has
+    not converged on response; otherwise the first forward edge is followed.
+    """
+    for next_id in next_ids:
+        loop = loops.get((node_id, next_id))
+        if loop is None:
+            continue
+        taken = iterations.get((node_id, next_id), 0)
+        if taken < loop.max_iterations and not loop.converged(response):
+            iterations[(node_id, next_id)] = taken + 1
+            return next_id
+    for next_id in next_ids:
+        if (node_id, next_id) not in loops:
+            return next_id
+    return None
+
+def load_workflow(node_id: str) -> WorkflowPlan:
+    """Load the full agent chain starting at node_id with one Cypher query.
+
+    The chain is walked one NEXT_AGENT edge per agent. An agent with
+    several successors raises WorkflowFanOutError rather than silently
+    dropping branches, and a repeated agent raises WorkflowCycleError.
+    """
+    records = graph_client.read(WORKFLOW_PATH_QUERY, {"node_id": node_id}, name="workflow_path")
+    by_id = {}
+    for record in records:
+        by_id.setdefault(record.get("node_id"), record)
+    agents, seen, current = [], set(), node_id
+    while current in by_id:
+        if current in seen:
+            raise WorkflowCycleError(
+                f"❌ Workflow starting at {node_id} contains a NEXT_AGENT cycle; run it with process_workflow_graph"
+            )
+        seen.add(current)
+        record = by_id[current]
+        next_ids = [next_id for next_id in record.get("next_agent_ids") or () if next_id is not None]
+        if len(next_ids) > 1:
+            raise WorkflowFanOutError(
+                f"❌ Agent {current} of the workflow starting at {node_id} fans out to {len(next_ids)} agents; "
+                "run it with process_dag"
+            )
+        agents.append(AgentSpec.from_record(record))
+        current = next_ids[0] if next_ids else None
+    agents = tuple(agents)
+    logger.info(f"✅ Compiled workflow from node_id {node_id} with {len(agents)} agent(s)")
+    return WorkflowPlan(start_node_id=node_id, agents=agents)
+
+def load_workflow_graph(node_id: str) -> WorkflowGraph:
+    """Load every agent and NEXT_AGENT edge reachable from node_id with one Cypher query."""
+    records = graph_client.read(WORKFLOW_GRAPH_QUERY, {"node_id": node_id}, name="workflow_graph")
+    agents = {}
+    edges = {}
+    loops = {}
+    for record in records:
+        spec = AgentSpec.from_record(record)
+        agents[spec.node_id] = spec
+        edges[spec.node_id] = tuple(next_id for next_id in record.get("next_agent_ids") or () if next_id is not None)
+        for loop in record.get("loop_edges") or ():
+            loops[(spec.node_id, loop["next_agent_id"])] = LoopSpec(int(loop["max_iterations"]), loop.get("until"))
+    graph = WorkflowGraph(start_node_id=node_id, agents=agents, edges=edges, loops=loops)
+    graph.check_cycles()
+    logger.info(f"✅ Compiled workflow graph from node_id {node_id} with {len(agents)} agent(s) and {len(loops)} loop(s)")
+    return graph
+
+def get_graph_version() -> int:
+    """Return the current workflow graph version stamp, or None if it cannot be read."""
+    records = graph_client.read(GRAPH_VERSION_QUERY, name="graph_version")
+    return records[0].get("version", 0) if records else None
+
+def bump_graph_version() -> int:
+    """Mark the workflow graph as edited so cached plans are invalidated."""
+    records = graph_client.write(BUMP_GRAPH_VERSION_QUERY, name="bump_graph_version")
+    version = records[0].get("version") if records else None
+    logger.info(f"✅ Workflow graph version bumped to {version}")
+    return version
@@ -1,12 +1,25 @@
+import json
+import time
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, MagicMock
-from src.agent_processor import process_agent, get_agent_messages, get_next_agent
+from src.agent_processor import process_agent, process_agent_stream, get_agent_messages, get_agents, get_next_agent, process_workflow, resume, run_workflow, run_workflow_graph
+from src.batch_loader import BatchLoader
+from src.checkpoint_store import SQLiteCheckpointStore
+from src.context_budget import estimate_tokens
+from src.workflow_loader import AgentSpec, LoopSpec, WorkflowGraph, WorkflowPlan
+
+@pytest.fixture(autouse=True)
+def graph_session():
+    """process_agent opens a graph session; tests stub the lookups, so no database is configured."""
+    with patch("src.agent_processor.graph_client") as mock_graph:
+        yield mock_graph
 
 @pytest.fixture
 def mock_graph_client():
     """Mock graph_client responses for testing."""
     with patch("src.agent_processor.graph_client") as mock_graph:
-        mock_graph.execute_query.side_effect = [
+        mock_graph.read.side_effect = [
             # First call: Return initial agent's messages
             [{"system_message": "You are a pharmacist", "user_message": "Explain amoxicillin"}],
             # Second call: Return the next agent details
@@ -38,13 +51,13 @@ def test_process_agent(mock_graph_client, mock_llm_client):
     assert response == expected_final_response, f"Expected '{expected_final_response}', got '{response}'"
     
     # Verify the correct number of calls
-    assert mock_graph_client.execute_query.call_count == 4
+    assert mock_graph_client.read.call_count == 4
     assert mock_llm_client.call_llm.call_count == 2
 
 def test_process_agent_with_no_agent_found(mock_graph_client, mock_llm_client):
     """Test process_agent when no agent is found with the given ID."""
     # Override the mock to return empty list for the first call
-    mock_graph_client.execute_query.side_effect = [[], None, None, None]
+    mock_graph_client.read.side_effect = [[], None, None, None]
     
     node_id = 999  # Non-existent node ID
     prev_response = "Previous response"
@@ -53,13 +66,13 @@ def test_process_agent_with_no_agent_found(mock_graph_client, mock_llm_client):
     
     # Should return the previous response unchanged
     assert response == prev_response
-    assert mock_graph_client.execute_query.call_count == 1
+    assert mock_graph_client.read.call_count == 1
     assert mock_llm_client.call_llm.call_count == 0
 
 def test_process_agent_with_llm_error():
     """Test process_agent when LLM client raises an error."""
     with patch("src.agent_processor.graph_client") as mock_graph:
-        mock_graph.execute_query.return_value = [
+        mock_graph.read.return_value = [
             {"system_message": "Test system", "user_message": "Test user"}
         ]
         
@@ -76,15 +89,15 @@ def test_process_agent_with_llm_error():
 def test_get_agent_messages():
     """Test get_agent_messages function."""
     with patch("src.agent_processor.graph_client") as mock_graph:
-        mock_graph.execute_query.return_value = [
+        mock_graph.read.return_value = [
             {"system_message": "Test system", "user_message": "Test user"}
         ]
         
         result = get_agent_messages("test_id")
         
         # Verify the query parameters
-        mock_graph.execute_query.assert_called_once()
-        call_args = mock_graph.execute_query.call_args[0][1]
+        mock_graph.read.assert_called_once()
+        call_args = mock_graph.read.call_args[0][1]
         assert call_args["node_id"] == "test_id"
         
         # Verify the result
@@ -95,17 +108,379 @@ def test_get_agent_messages():
 def test_get_next_agent():
     """Test get_next_agent function."""
     with patch("src.agent_processor.graph_client") as mock_graph:
-        mock_graph.execute_query.return_value = [
+        mock_graph.read.return_value = [
             {"next_agent_id": "next_id", "system_message": "Next system", "user_message": "Next user"}
         ]
         
         result = get_next_agent("current_id")
         
         # Verify the query parameters
-        mock_graph.execute_query.assert_called_once()
-        call_args = mock_graph.execute_query.call_args[0][1]
+        mock_graph.read.assert_called_once()
+        call_args = mock_graph.read.call_args[0][1]
         assert call_args["node_id"] == "current_id"
         
         # Verify the result
         assert len(result) == 1
         assert result[0]["next_agent_id"] == "next_id"
+
+def test_process_workflow_uses_prefetched_plan():
+    """process_workflow runs the cached plan and makes no per-hop graph calls."""
+    plan = WorkflowPlan(start_node_id="a1", agents=(
+        AgentSpec("a1", "You are a pharmacist", "Explain amoxicillin"),
+        AgentSpec("a2", "You are a critic", "Evaluate the explanation"),
+    ))
+    with patch("src.agent_processor.workflow_cache") as mock_cache, \
+         patch("src.agent_processor.graph_client") as mock_graph, \
+         patch("src.agent_processor.llm_client") as mock_llm:
+        mock_cache.get.return_value = plan
+        mock_llm.call_llm.side_effect = [
+            {"response": "Amoxicillin is an antibiotic."},
+            {"statusCode": 200, "body": json.dumps({"response": "The explanation is clear."})},
+        ]
+
+        response = process_workflow("a1")
+
+        assert response == "The explanation is clear."
+        mock_cache.get.assert_called_once_with("a1")
+        assert mock_graph.read.call_count == 0
+        assert mock_llm.call_llm.call_args_list[1][0][1] == "Evaluate the explanation Amoxicillin is an antibiotic."
+
+def test_run_workflow_with_llm_error():
+    """run_workflow stops at the first failing agent."""
+    plan = WorkflowPlan(start_node_id="a1", agents=(
+        AgentSpec("a1", "Test system", "Test user"),
+        AgentSpec("a2", "Test system", "Test user"),
+    ))
+    with patch("src.agent_processor.llm_client") as mock_llm:
+        mock_llm.call_llm.return_value = {"statusCode": 500, "body": json.dumps({"error": "API Error"})}
+
+        response = run_workflow(plan)
+
+        assert "Error processing agent" in response
+        assert "API Error" in response
+        assert mock_llm.call_llm.call_count == 1
+
+def test_process_agent_long_chain_is_iterative():
+    """Chains far longer than the recursion limit complete without RecursionError."""
+    chain_length = 3000
+    with patch("src.agent_processor.get_agent_messages") as mock_messages, \
+         patch("src.agent_processor.get_next_agent") as mock_next, \
+         patch("src.agent_processor.llm_client") as mock_llm:
+        mock_messages.return_value = [{"system_message": "System", "user_message": "Continue"}]
+        mock_next.side_effect = lambda node_id: [{"next_agent_id": node_id + 1}] if node_id < chain_length else []
+        mock_llm.call_llm.side_effect = lambda system, user, **kwargs: {"response": "hop"}
+
+        response = process_agent(1)
+
+        assert response == "hop"
+        assert mock_llm.call_llm.call_count == chain_length
+
+def test_process_agent_overlap_prefetches_next_agent():
+    """In overlap mode the next-agent lookup runs during the LLM call and its messages are reused."""
+    chain = {
+        1: {"next_agent_id": 2, "system_message": "You are a critic", "user_message": "Evaluate the explanation"},
+        2: {"next_agent_id": 3, "system_message": "You are an editor", "user_message": "Summarize the review"},
+    }
+
+    def slow_next_agent(node_id):
+        time.sleep(0.2)
+        return [chain[node_id]] if node_id in chain else []
+
+    def slow_llm(system_message, user_message, **kwargs):
+        time.sleep(0.2)
+        return {"response": f"{system_message} done"}
+
+    with patch("src.agent_processor.get_agent_messages") as mock_messages, \
+         patch("src.agent_processor.get_next_agent", side_effect=slow_next_agent) as mock_next, \
+         patch("src.agent_processor.llm_client") as mock_llm:
+        mock_messages.return_value = [{"system_message": "You are a pharmacist", "user_message": "Explain amoxicillin"}]
+        mock_llm.call_llm.side_effect = slow_llm
+
+        started = time.perf_counter()
+        response = process_agent(1, overlap=True)
+        elapsed = time.perf_counter() - started
+
+    assert response == "You are an editor done"
+    mock_messages.assert_called_once_with(1)
+    assert mock_next.call_count == 3
+    assert elapsed < 1.0  # Sequential lookups would take ~1.2s
+
+def test_process_agent_stream_events(mock_graph_client):
+    """process_agent_stream yields start, token and finish events for every agent."""
+    with patch("src.agent_processor.llm_client") as mock_llm:
+        mock_llm.stream_llm.side_effect = [
+            iter([{"delta": "Amoxicillin "}, {"delta": "is an antibiotic."}, {"usage": {"total_tokens": 12}}]),
+            iter([{"delta": "Clear."}, {"usage": {}}]),
+        ]
+
+        events = list(process_agent_stream(1))
+
+    types = [event["type"] for event in events]
+    assert types == [
+        "agent_started", "token", "token", "agent_finished",
+        "agent_started", "token", "agent_finished",
+        "run_finished",
+    ]
+    assert events[3]["response"] == "Amoxicillin is an antibiotic."
+    assert events[3]["usage"] == {"total_tokens": 12}
+    assert events[3]["latency_ms"] >= 0
+    assert events[-1]["response"] == "Clear."
+    assert events[-1]["hops"] == 2
+    assert mock_llm.stream_llm.call_args_list[1][0][1] == "Evaluate the explanation Amoxicillin is an antibiotic."
+
+def test_process_agent_stream_with_llm_error(mock_graph_client):
+    """A provider error ends the stream with a run_failed event."""
+    with patch("src.agent_processor.llm_client") as mock_llm:
+        mock_llm.stream_llm.return_value = iter([{"statusCode": 500, "error": "API Error"}])
+
+        events = list(process_agent_stream(1))
+
+    assert [event["type"] for event in events] == ["agent_started", "run_failed"]
+    assert "API Error" in events[-1]["error"]
+
+def test_resume_skips_completed_hops(tmp_path):
+    """A run that fails part-way resumes after its last checkpointed agent."""
+    chain = {1: 2, 2: 3, 3: None}
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+
+    with patch("src.agent_processor.checkpoint_store", store), \
+         patch("src.agent_processor.get_agent_messages") as mock_messages, \
+         patch("src.agent_processor.get_next_agent") as mock_next, \
+         patch("src.agent_processor.get_next_agents") as mock_next_batch, \
+         patch("src.agent_processor.llm_client") as mock_llm:
+        mock_messages.side_effect = lambda node_id: [{"system_message": f"Agent {node_id}", "user_message": "Task"}]
+        mock_next.side_effect = lambda node_id: [{"next_agent_id": chain[int(node_id)]}] if chain[int(node_id)] else []
+        mock_next_batch.side_effect = lambda node_ids: {node_id: mock_next(node_id) for node_id in node_ids}
+        mock_llm.call_llm.side_effect = [
+            {"response": "one"},
+            {"response": "two"},
+            {"error": "API Error", "statusCode": 500},
+        ]
+
+        failed = process_agent(1, run_id="run-1")
+        assert "Error processing agent" in failed
+        assert store.get_run("run-1")["status"] == "failed"
+
+        mock_llm.call_llm.side_effect = [{"response": "three"}]
+        response = resume("run-1")
+
+    assert response == "three"
+    assert mock_llm.call_llm.call_count == 4
+    assert mock_llm.call_llm.call_args[0] == ("Agent 3", "Task two")
+    assert [hop["response"] for hop in store.hops("run-1")] == ["one", "two", "three"]
+    assert store.get_run("run-1")["status"] == "completed"
+    store.close()
+
+def test_resume_summarizes_the_last_response(tmp_path):
+    """A resumed run passes on the same summarized context as an uninterrupted one."""
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    store.start_run("run-1", 1)
+    store.save_hop("run-1", 1, "a very long response")
+
+    with patch("src.agent_processor.checkpoint_store", store), \
+         patch("src.agent_processor.get_agent_messages", return_value=[{"system_message": "Agent 2", "user_message": "Task"}]), \
+         patch("src.agent_processor.get_next_agent", side_effect=lambda node_id: [{"next_agent_id": 2}] if str(node_id) == "1" else []), \
+         patch("src.agent_processor.summarize_for_next_hop", return_value="short summary") as mock_summarize, \
+         patch("src.agent_processor.llm_client") as mock_llm:
+        mock_llm.call_llm.return_value = {"response": "done"}
+        resume("run-1", overlap=False)
+
+    mock_summarize.assert_called_once_with("a very long response")
+    assert mock_llm.call_llm.call_args[0] == ("Agent 2", "Task short summary")
+    store.close()
+
+def test_resume_unknown_run():
+    """Resuming an unknown run does nothing."""
+    with patch("src.agent_processor.checkpoint_store") as mock_store, \
+         patch("src.agent_processor.llm_client") as mock_llm:
+        mock_store.get_run.return_value = None
+
+        assert resume("missing") == ""
+        assert mock_llm.call_llm.call_count == 0
+
+def test_process_agent_cache_opt_out():
+    """Agents with cache_llm set to false bypass the LLM response cache."""
+    with patch("src.agent_processor.get_agent_messages") as mock_messages, \
+         patch("src.agent_processor.get_next_agent", return_value=[]), \
+         patch("src.agent_processor.llm_client") as mock_llm:
+        mock_messages.return_value = [{"system_message": "System", "user_message": "Task", "cache_llm": False}]
+        mock_llm.call_llm.return_value = {"response": "fresh"}
+
+        process_agent(1)
+
+    assert mock_llm.call_llm.call_args[1] == {"use_cache": False}
+
+def test_process_agent_applies_context_budget():
+    """The previous response is trimmed to the agent's context budget before the call."""
+    long_response = " ".join(f"finding{i}." for i in range(1000))
+    with patch("src.agent_processor.get_agent_messages") as mock_messages, \
+         patch("src.agent_processor.get_next_agent", return_value=[]), \
+         patch("src.agent_processor.llm_client") as mock_llm:
+        mock_messages.return_value = [{
+            "system_message": "System", "user_message": "Review",
+            "context_budget": 100, "context_policy": "tail",
+        }]
+        mock_llm.call_llm.return_value = {"response": "ok"}
+
+        process_agent(1, long_response)
+
+    prompt = mock_llm.call_llm.call_args[0][1]
+    assert prompt.startswith("Review ")
+    assert long_response.endswith(prompt[len("Review "):])
+    assert estimate_tokens(prompt) <= 102
+
+def test_process_agent_summarizes_between_hops(mock_graph_client):
+    """Oversized outputs are summarized for the next agent while the final output stays raw."""
+    with patch("src.agent_processor.llm_client") as mock_llm, \
+         patch("src.agent_processor.summarize_for_next_hop", return_value="short summary") as mock_summarize:
+        mock_llm.call_llm.side_effect = [
+            {"response": "A very long explanation."},
+            {"response": "A very long evaluation."},
+        ]
+
+        response = process_agent(1)
+
+    assert response == "A very long evaluation."
+    mock_summarize.assert_called_once_with("A very long explanation.")
+    assert mock_llm.call_llm.call_args_list[1][0][1] == "Evaluate the explanation short summary"
+
+def test_process_agent_stops_at_hop_limit():
+    """A positive max_hops cuts a run off after that many agents."""
+    with patch("src.agent_processor.get_agent_messages") as mock_messages, \
+         patch("src.agent_processor.get_next_agent") as mock_next, \
+         patch("src.agent_processor.llm_client") as mock_llm:
+        mock_messages.return_value = [{"system_message": "System", "user_message": "Continue"}]
+        mock_next.side_effect = lambda node_id: [{"next_agent_id": node_id + 1}]
+        mock_llm.call_llm.side_effect = lambda system, user, **kwargs: {"response": "hop"}
+
+        response = process_agent(1, max_hops=5)
+
+        assert "Error processing agent" in response
+        assert "exceeded 5 hops" in response
+        assert mock_llm.call_llm.call_count == 5
+
+def test_process_agent_rejects_unbounded_cycle():
+    """A cycle without max_iterations fails before its first agent runs a second time."""
+    with patch("src.agent_processor.get_agent_messages") as mock_messages, \
+         patch("src.agent_processor.get_next_agent") as mock_next, \
+         patch("src.agent_processor.checkpoint_store") as mock_store, \
+         patch("src.agent_processor.llm_client") as mock_llm:
+        mock_messages.return_value = [{"system_message": "System", "user_message": "Continue"}]
+        mock_next.side_effect = lambda node_id: [{"next_agent_id": 2 if node_id == 1 else 1}]
+        mock_llm.call_llm.side_effect = lambda system, user, **kwargs: {"response": "hop"}
+
+        response = process_agent(1, run_id="run-1")
+
+        assert "Error processing agent" in response
+        assert "cycle without max_iterations" in response
+        assert mock_llm.call_llm.call_count == 2
+        mock_store.finish_run.assert_called_once_with("run-1", "failed")
+
+def writer_critic_graph(until=None):
+    """Writer -> critic with a bounded critic -> writer loop, then a publisher."""
+    agents = {node_id: AgentSpec(node_id, f"You are the {node_id}", node_id.capitalize()) for node_id in ("writer", "critic", "publisher")}
+    return WorkflowGraph(
+        start_node_id="writer",
+        agents=agents,
+        edges={"writer": ("critic",), "critic": ("writer", "publisher"), "publisher": ()},
+        loops={("critic", "writer"): LoopSpec(max_iterations=3, until=until)},
+    )
+
+def test_run_workflow_graph_loop_stops_on_convergence():
+    """The critic loop ends as soon as the critic approves the draft."""
+    with patch("src.agent_processor.llm_client") as mock_llm:
+        mock_llm.call_llm.side_effect = [
+            {"response": "draft 1"},
+            {"response": "needs work"},
+            {"response": "draft 2"},
+            {"response": "APPROVED"},
+            {"response": "published"},
+        ]
+
+        response = run_workflow_graph(writer_critic_graph(until="contains:APPROVED"))
+
+    assert response == "published"
+    assert [call[0][0] for call in mock_llm.call_llm.call_args_list] == [
+        "You are the writer", "You are the critic", "You are the writer", "You are the critic", "You are the publisher",
+    ]
+
+def test_run_workflow_graph_loop_stops_at_max_iterations():
+    """Without convergence the loop edge is followed max_iterations times, then the forward edge."""
+    with patch("src.agent_processor.llm_client") as mock_llm:
+        mock_llm.call_llm.side_effect = lambda system, user, **kwargs: {"response": system}
+
+        response = run_workflow_graph(writer_critic_graph())
+
+    assert response == "You are the publisher"
+    # 4 writer/critic rounds (the first pass plus 3 loop iterations) and the publisher
+    assert mock_llm.call_llm.call_count == 9
+
+def test_process_agent_follows_bounded_loop_edges():
+    """process_agent honours max_iterations/until on NEXT_AGENT edges instead of the first record."""
+    messages = {node_id: [{"system_message": f"You are the {node_id}", "user_message": node_id}] for node_id in ("writer", "critic", "publisher")}
+    edges = {
+        "writer": [{"next_agent_id": "critic"}],
+        # The loop edge comes back first, as Neo4j may return it
+        "critic": [{"next_agent_id": "writer", "max_iterations": 3, "until": "contains:APPROVED"}, {"next_agent_id": "publisher"}],
+        "publisher": [],
+    }
+    with patch("src.agent_processor.get_agent_messages", side_effect=messages.get), \
+         patch("src.agent_processor.get_next_agent", side_effect=edges.get), \
+         patch("src.agent_processor.llm_client") as mock_llm:
+        mock_llm.call_llm.side_effect = lambda system, user, **kwargs: {"response": "APPROVED" if system == "You are the critic" else system}
+
+        response = process_agent("writer", overlap=False)
+
+    assert response == "You are the publisher"
+    assert mock_llm.call_llm.call_count == 3
+
+def test_resume_continues_a_bounded_loop(tmp_path):
+    """A run interrupted inside a loop resumes with the loop iterations it already used."""
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    messages = {node_id: [{"system_message": f"You are the {node_id}", "user_message": node_id}] for node_id in ("writer", "critic", "publisher")}
+    edges = {
+        "writer": [{"next_agent_id": "critic"}],
+        "critic": [{"next_agent_id": "writer", "max_iterations": 2}, {"next_agent_id": "publisher"}],
+        "publisher": [],
+    }
+    with patch("src.agent_processor.checkpoint_store", store), \
+         patch("src.agent_processor.get_agent_messages", side_effect=messages.get), \
+         patch("src.agent_processor.get_next_agent", side_effect=edges.get), \
+         patch("src.agent_processor.get_next_agents", side_effect=lambda ids: {node_id: edges[node_id] for node_id in ids}), \
+         patch("src.agent_processor.llm_client") as mock_llm:
+        # writer, critic, writer (first loop pass), then the second critic fails
+        mock_llm.call_llm.side_effect = [{"response": "draft"}, {"response": "review"}, {"response": "draft"}, {"error": "API Error"}]
+        assert "Error processing agent" in process_agent("writer", overlap=False, run_id="run-1")
+
+        mock_llm.call_llm.side_effect = lambda system, user, **kwargs: {"response": system}
+        response = resume("run-1", overlap=False)
+
+    assert response == "You are the publisher"
+    assert [hop["node_id"] for hop in store.hops("run-1")] == [
+        "writer", "critic", "writer", "critic", "writer", "critic", "publisher",
+    ]
+    store.close()
+
+def test_get_agents_uses_one_batched_query():
+    """get_agents resolves many node ids in a single UNWIND round trip."""
+    with patch("src.agent_processor.graph_client") as mock_graph:
+        mock_graph.execute_batch.return_value = {"1": [{"system_message": "S1"}], "2": []}
+
+        agents = get_agents(["1", "2"])
+
+        mock_graph.execute_batch.assert_called_once()
+        assert "UNWIND $ids" in mock_graph.execute_batch.call_args[0][0]
+        assert agents["1"][0]["system_message"] == "S1"
+
+def test_get_agent_messages_batches_concurrent_lookups():
+    """With batching on, lookups from concurrent runs are coalesced into one query."""
+    with patch("src.agent_processor.AGENT_BATCH_ENABLED", True), \
+         patch("src.agent_processor._agent_loader", BatchLoader(get_agents, window_ms=50, default_factory=list)), \
+         patch("src.agent_processor.graph_client") as mock_graph:
+        mock_graph.execute_batch.side_effect = lambda query, ids, **kwargs: {node_id: [{"system_message": node_id}] for node_id in ids}
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(get_agent_messages, ["a", "b", "c", "d"]))
+
+    assert [records[0]["system_message"] for records in results] == ["a", "b", "c", "d"]
+    assert mock_graph.execute_batch.call_count == 1
@@ -0,0 +1,207 @@
+import asyncio
+import json
+import threading
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.async_agent_processor import process_agent, process_agents
+from src.async_graph_client import AsyncGraphClient
+from src.async_llm_client import AsyncLLMClient
+
+@pytest.fixture
+def mock_async_graph_client():
+    """Mock async_graph_client with a two-agent chain keyed by node id."""
+    agents = {
+        1: {"system_message": "You are a pharmacist", "user_message": "Explain amoxicillin", "next": 2},
+        2: {"system_message": "You are a critic", "user_message": "Evaluate the explanation", "next": None},
+    }
+
+    async def read(query, parameters):
+        agent = agents.get(parameters["node_id"])
+        if agent is None:
+            return []
+        if "NEXT_AGENT" in query:
+            return [{"next_agent_id": agent["next"]}] if agent["next"] else []
+        return [{"system_message": agent["system_message"], "user_message": agent["user_message"]}]
+
+    with patch("src.async_agent_processor.async_graph_client") as mock_graph:
+        mock_graph.read = AsyncMock(side_effect=read)
+        yield mock_graph
+
+@pytest.fixture
+def mock_async_llm_client():
+    """Mock async_llm_client that sleeps to simulate network latency."""
+    async def call_llm(system_message, user_message, **kwargs):
+        await asyncio.sleep(0.1)
+        return {"response": f"{system_message} answered"}
+
+    with patch("src.async_agent_processor.async_llm_client") as mock_llm:
+        mock_llm.call_llm = AsyncMock(side_effect=call_llm)
+        yield mock_llm
+
+def test_async_process_agent(mock_async_graph_client, mock_async_llm_client):
+    """The async engine walks the chain like the sync one."""
+    response = asyncio.run(process_agent(1))
+
+    assert response == "You are a critic answered"
+    assert mock_async_graph_client.read.call_count == 4
+    assert mock_async_llm_client.call_llm.call_count == 2
+
+def test_async_process_agent_with_no_agent_found(mock_async_graph_client, mock_async_llm_client):
+    """A missing agent returns the previous response unchanged."""
+    response = asyncio.run(process_agent(999, "Previous response"))
+
+    assert response == "Previous response"
+    assert mock_async_llm_client.call_llm.call_count == 0
+
+def test_async_process_agents_runs_concurrently(mock_async_graph_client, mock_async_llm_client):
+    """Many runs share one event loop and overlap their LLM latency."""
+    started = time.perf_counter()
+    responses = asyncio.run(process_agents([1] * 50, concurrency=50))
+    elapsed = time.perf_counter() - started
+
+    assert responses == ["You are a critic answered"] * 50
+    assert elapsed < 1.0
+
+def test_async_process_agent_rejects_unbounded_cycle(mock_async_llm_client):
+    """A NEXT_AGENT cycle without max_iterations stops the run, like the sync engine."""
+    async def read(query, parameters):
+        if "NEXT_AGENT" in query:
+            return [{"next_agent_id": 2 if parameters["node_id"] == 1 else 1}]
+        return [{"system_message": "System", "user_message": "Continue"}]
+
+    with patch("src.async_agent_processor.async_graph_client") as mock_graph:
+        mock_graph.read = AsyncMock(side_effect=read)
+        response = asyncio.run(process_agent(1))
+
+    assert "cycle without max_iterations" in response
+    assert mock_async_llm_client.call_llm.call_count == 2
+
+def test_async_llm_client_call_llm():
+    """AsyncLLMClient posts the same request as LLMClient and formats the response."""
+    with patch("src.llm_client.LLM_PROVIDER", "openai"):
+        client = AsyncLLMClient()
+
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"choices": [{"message": {"content": "Async Test Response"}}]}
+    mock_http = MagicMock()
+    mock_http.post = AsyncMock(return_value=mock_response)
+    mock_http.aclose = AsyncMock()
+
+    with patch("src.async_llm_client.httpx.AsyncClient", return_value=mock_http):
+        response = asyncio.run(client.call_llm("System Message", "User Message"))
+
+    url, payload, headers = client.build_request("System Message", "User Message")
+    mock_http.post.assert_awaited_once_with(url, json=payload, headers=headers)
+    assert json.loads(response["body"])["response"] == "Async Test Response"
+
+def test_async_llm_client_network_error():
+    """Network failures are reported in the same shape as the sync client."""
+    with patch("src.llm_client.LLM_PROVIDER", "openai"):
+        client = AsyncLLMClient()
+
+    mock_http = MagicMock()
+    mock_http.post = AsyncMock(side_effect=Exception("Connection reset"))
+    mock_http.aclose = AsyncMock()
+
+    with patch("src.async_llm_client.httpx.AsyncClient", return_value=mock_http):
+        response = asyncio.run(client.call_llm("System Message", "User Message"))
+
+    assert response["statusCode"] == 500
+    assert "Connection reset" in response["error"]
+
+def test_async_llm_client_rebuilds_http_client_per_event_loop():
+    """A second asyncio.run gets a fresh HTTP client instead of one bound to a closed loop."""
+    with patch("src.llm_client.LLM_PROVIDER", "openai"):
+        client = AsyncLLMClient()
+
+    clients = []
+
+    def new_http(**kwargs):
+        mock_http = MagicMock()
+        mock_http.post = AsyncMock(side_effect=Exception("unused"))
+        mock_http.aclose = AsyncMock()
+        clients.append(mock_http)
+        return mock_http
+
+    with patch("src.async_llm_client.httpx.AsyncClient", side_effect=new_http):
+        asyncio.run(client.call_llm("System Message", "User Message"))
+        asyncio.run(client.call_llm("System Message", "User Message"))
+
+    assert len(clients) == 2
+    # Each pool is closed when its loop shuts down instead of leaking its sockets
+    assert all(http.aclose.await_count == 1 for http in clients)
+
+def test_async_graph_client_rebuilds_driver_per_event_loop():
+    """Each event loop gets its own AsyncDriver, closed when the loop shuts down; the bookmark manager is shared."""
+    drivers = []
+
+    def new_driver(*args, **kwargs):
+        driver = MagicMock()
+        driver.close = AsyncMock()
+        drivers.append(driver)
+        return driver
+
+    with patch("src.async_graph_client.GRAPH_DB_TYPE", "neo4j"), \
+         patch("src.async_graph_client.AsyncGraphDatabase") as mock_database:
+        mock_database.driver.side_effect = new_driver
+        client = AsyncGraphClient()
+
+        async def two_lookups():
+            first = await client.driver()
+            assert await client.driver() is first
+            return first.close.await_count
+
+        assert asyncio.run(two_lookups()) == 0
+        asyncio.run(two_lookups())
+
+    assert len(drivers) == 2
+    assert all(driver.close.await_count == 1 for driver in drivers)
+    mock_database.bookmark_manager.assert_called_once()
+
+def test_async_graph_client_close_closes_the_running_loops_driver():
+    """close() closes the driver now, and the next query on the loop opens a new one."""
+    with patch("src.async_graph_client.GRAPH_DB_TYPE", "neo4j"), \
+         patch("src.async_graph_client.AsyncGraphDatabase") as mock_database:
+        mock_database.driver.return_value.close = AsyncMock()
+        client = AsyncGraphClient()
+
+        async def use_and_close():
+            await client.driver()
+            await client.close()
+            return mock_database.driver.return_value.close.await_count
+
+        assert asyncio.run(use_and_close()) == 1
+
+    mock_database.driver.return_value.close.assert_awaited_once()
+
+def test_async_graph_client_rejects_unset_db_type():
+    """An unset GRAPH_DB_TYPE is a configuration error, not an AttributeError."""
+    with patch("src.async_graph_client.GRAPH_DB_TYPE", None), pytest.raises(ValueError):
+        AsyncGraphClient()
+
+def test_async_llm_client_cache_runs_off_the_event_loop():
+    """Cache lookups and stores (blocking SQLite I/O) run in worker threads, not on the loop."""
+    with patch("src.llm_client.LLM_PROVIDER", "openai"):
+        client = AsyncLLMClient()
+    threads = []
+    client.cache = MagicMock()
+    client.cache.get.side_effect = lambda key: threads.append(threading.get_ident())
+    client.cache.put.side_effect = lambda key, response: threads.append(threading.get_ident())
+
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"choices": [{"message": {"content": "Cached later"}}]}
+    mock_http = MagicMock()
+    mock_http.post = AsyncMock(return_value=mock_response)
+    mock_http.aclose = AsyncMock()
+
+    async def call():
+        return threading.get_ident(), await client.call_llm("System Message", "User Message")
+
+    with patch("src.async_llm_client.httpx.AsyncClient", return_value=mock_http):
+        loop_thread, response = asyncio.run(call())
+
+    assert response["statusCode"] == 200
+    assert len(threads) == 2 and loop_thread not in threads
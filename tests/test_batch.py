@@ -0,0 +1,77 @@
+import json
+import pytest
+from unittest.mock import patch
+from src.batch import main, run_batch
+from src.workflow_loader import AgentSpec, WorkflowPlan
+
+@pytest.fixture
+def input_file(tmp_path):
+    """Write a small JSONL request file, including one malformed line."""
+    path = tmp_path / "requests.jsonl"
+    lines = [
+        json.dumps({"id": "r1", "node_id": "a1"}),
+        json.dumps({"id": "r2", "node_id": "a2", "prev_response": "context"}),
+        "",
+        "not json",
+        json.dumps({"id": "r3", "node_id": "missing"}),
+    ]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+def fake_load_workflow(node_id):
+    """Return a one-agent plan, or an empty plan for unknown nodes."""
+    if node_id == "missing":
+        return WorkflowPlan(start_node_id=node_id, agents=())
+    return WorkflowPlan(start_node_id=node_id, agents=(AgentSpec(node_id, "System", f"Task {node_id}"),))
+
+def test_run_batch(input_file, tmp_path):
+    """Every input line produces exactly one output line."""
+    output = tmp_path / "out.jsonl"
+    with patch("src.batch.workflow_cache") as mock_cache, \
+         patch("src.agent_processor.llm_client") as mock_llm:
+        mock_cache.get.side_effect = fake_load_workflow
+        mock_llm.call_llm.side_effect = lambda system, user, **kwargs: {"response": user.strip()}
+
+        stats = run_batch(str(input_file), str(output), fetch_workers=2, llm_workers=2, queue_size=1)
+
+    results = {result["line"]: result for result in map(json.loads, output.read_text().splitlines())}
+    assert stats == {"read": 4, "written": 4, "errors": 1}
+    assert results[1] == {"line": 1, "id": "r1", "node_id": "a1", "response": "Task a1"}
+    assert results[2]["response"] == "Task a2 context"
+    assert "Invalid input record" in results[4]["error"]
+    assert results[5]["response"] == ""
+
+def test_run_batch_fetch_error(input_file, tmp_path):
+    """A failing graph fetch is reported without stopping the batch."""
+    output = tmp_path / "out.jsonl"
+    with patch("src.batch.workflow_cache") as mock_cache:
+        mock_cache.get.side_effect = RuntimeError("Neo4j unavailable")
+        stats = run_batch(str(input_file), str(output), fetch_workers=1, llm_workers=1)
+
+    assert stats["errors"] == 4
+    assert all("error" in json.loads(line) for line in output.read_text().splitlines())
+
+def test_run_batch_missing_output_directory_fails_fast(input_file, tmp_path):
+    """A bad output path raises before any worker starts instead of hanging the pipeline."""
+    with patch("src.batch._start") as mock_start, pytest.raises(FileNotFoundError):
+        run_batch(str(input_file), str(tmp_path / "missing" / "out.jsonl"))
+
+    mock_start.assert_not_called()
+
+def test_run_batch_write_failure_is_raised(tmp_path):
+    """A writer failure stops the pipeline and is re-raised rather than hanging or dropping results."""
+    path = tmp_path / "requests.jsonl"
+    path.write_text("".join(json.dumps({"node_id": f"a{index}"}) + "\n" for index in range(500)))
+    with patch("src.batch.workflow_cache") as mock_cache, \
+         patch("src.batch.run_workflow", return_value=object()):  # Not JSON serializable
+        mock_cache.get.side_effect = fake_load_workflow
+        with pytest.raises(TypeError):
+            run_batch(str(path), str(tmp_path / "out.jsonl"), fetch_workers=2, llm_workers=2, queue_size=8)
+
+def test_main_parses_arguments(input_file, tmp_path):
+    """The CLI forwards stage concurrency settings to run_batch."""
+    output = tmp_path / "out.jsonl"
+    with patch("src.batch.run_batch", return_value={}) as mock_run:
+        main([str(input_file), str(output), "--fetch-workers", "3", "--llm-workers", "7", "--queue-size", "5"])
+
+    mock_run.assert_called_once_with(str(input_file), str(output), 3, 7, 5)
@@ -0,0 +1,57 @@
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from src.batch_loader import BatchLoader
+
+def test_concurrent_loads_share_one_batch():
+    """Lookups issued within one window are resolved by a single batch call."""
+    calls = []
+
+    def batch_fn(keys):
+        calls.append(sorted(keys))
+        return {key: key * 10 for key in keys}
+
+    loader = BatchLoader(batch_fn, window_ms=50, max_batch_size=100)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(loader.load, [1, 2, 3, 2, 4]))
+
+    assert results == [10, 20, 30, 20, 40]
+    assert calls == [[1, 2, 3, 4]]
+    assert loader.batches == 1
+
+def test_full_batch_is_sent_without_waiting():
+    """Reaching max_batch_size dispatches immediately, before the window closes."""
+    loader = BatchLoader(lambda keys: {key: key for key in keys}, window_ms=60_000, max_batch_size=2)
+
+    first = loader.submit("a")
+    second = loader.submit("b")
+
+    assert first.result(timeout=1) == "a"
+    assert second.result(timeout=1) == "b"
+
+def test_missing_keys_get_default_and_errors_propagate():
+    """Keys absent from the batch result get a fresh default; a failing batch fails every waiter."""
+    loader = BatchLoader(lambda keys: {}, window_ms=50, default_factory=list)
+    first, second = loader.submit("a"), loader.submit("b")
+    first.result(timeout=1).append("mutated")
+
+    assert second.result(timeout=1) == []
+    assert BatchLoader(lambda keys: {}, window_ms=1).load("missing") is None
+
+    failing = BatchLoader(lambda keys: (_ for _ in ()).throw(RuntimeError("down")), window_ms=1)
+    with pytest.raises(RuntimeError):
+        failing.load("x")
+
+def test_windows_share_one_dispatcher_thread():
+    """Successive windows are closed by one long-lived thread, which close() stops."""
+    loader = BatchLoader(lambda keys: {key: key for key in keys}, window_ms=1)
+    before = threading.active_count()
+
+    assert [loader.load(key) for key in range(20)] == list(range(20))
+    assert loader.batches == 20
+    assert threading.active_count() == before + 1
+
+    loader.close()
+
+    assert threading.active_count() == before
+    assert loader.load("after") == "after"
@@ -0,0 +1,34 @@
+import pytest
+from benchmarks.fakes import FakeGraphClient, FakeLLMClient, fake_backends, latency_sampler
+from benchmarks.run import compare_reports, run_benchmarks
+from src.agent_processor import process_agent, process_workflow
+from src.dag_executor import process_dag
+from src.workflow_cache import workflow_cache
+
+def test_fake_graph_drives_every_engine():
+    """The fake graph answers the real executors' queries, so all engines agree."""
+    graph, llm = FakeGraphClient(), FakeLLMClient(response_chars=5)
+    start = graph.add_chain("chain", 4)
+
+    with fake_backends(graph, llm):
+        workflow_cache.invalidate()
+        results = [process_agent(start), process_agent(start, overlap=True), process_workflow(start), process_dag(start)]
+
+    assert results == ["xxxxx"] * 4
+    assert llm.calls == 16
+
+def test_latency_sampler_specs():
+    """Latency specs are parsed into samplers returning seconds."""
+    assert latency_sampler("none")() == 0.0
+    assert latency_sampler("fixed:20")() == pytest.approx(0.02)
+    assert 0.01 <= latency_sampler("uniform:10:20")() <= 0.02
+    with pytest.raises(ValueError):
+        latency_sampler("gaussian:10")
+
+def test_quick_report_is_comparable():
+    """A quick run produces every section, and comparing a report with itself gives 1.0 ratios."""
+    report = run_benchmarks(quick=True, llm_latency="none", graph_latency="none")
+
+    assert set(report["per_hop_overhead"]["engines"]) == {"process_agent", "process_agent_overlap", "process_workflow", "process_dag"}
+    assert set(report["fan_out"]["width"]) == {"1", "4"}
+    assert all(ratio == 1.0 for ratio in compare_reports(report, report).values())
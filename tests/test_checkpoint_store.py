@@ -0,0 +1,46 @@
+import pytest
+from src.checkpoint_store import SQLiteCheckpointStore
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a checkpoint store backed by a temporary SQLite file."""
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    yield store
+    store.close()
+
+def test_save_and_read_hops(store):
+    """Hops are numbered in order and the last one is returned."""
+    store.start_run("run-1", "a1", "initial")
+    assert store.save_hop("run-1", "a1", "first") == 0
+    assert store.save_hop("run-1", "a2", "second") == 1
+
+    assert store.get_run("run-1")["status"] == "running"
+    assert store.last_hop("run-1")["response"] == "second"
+    assert [hop["node_id"] for hop in store.hops("run-1")] == ["a1", "a2"]
+
+def test_start_run_keeps_original_start(store):
+    """Restarting a run keeps its start node and completed hops."""
+    store.start_run("run-1", "a1", "initial")
+    store.save_hop("run-1", "a1", "first")
+    store.finish_run("run-1", "failed")
+
+    store.start_run("run-1", "a2", "first")
+
+    run = store.get_run("run-1")
+    assert run["start_node_id"] == "a1"
+    assert run["prev_response"] == "initial"
+    assert run["status"] == "running"
+    assert len(store.hops("run-1")) == 1
+
+def test_checkpoints_survive_reopen(tmp_path):
+    """Checkpoints are durable across store instances."""
+    path = str(tmp_path / "checkpoints.sqlite3")
+    first = SQLiteCheckpointStore(path)
+    first.start_run("run-1", "a1")
+    first.save_hop("run-1", "a1", "first")
+    first.close()
+
+    second = SQLiteCheckpointStore(path)
+    assert second.last_hop("run-1")["response"] == "first"
+    assert second.get_run("missing") is None
+    second.close()
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import pytest
+from unittest.mock import patch
+from src.context_budget import TRIM_MARKER, estimate_tokens, fit_context, trim_to_budget
+
+LONG_TEXT = " ".join(f"sentence{i}." for i in range(500))
+
+def test_estimate_tokens():
+    """Words count per started 4 characters and punctuation counts once."""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Hi all!") == 3
+    assert estimate_tokens("internationalization") == 5
+
+def test_trim_policies():
+    """Each policy keeps the expected part of the text within budget."""
+    head = trim_to_budget(LONG_TEXT, 100, "head")
+    tail = trim_to_budget(LONG_TEXT, 100, "tail")
+    middle = trim_to_budget(LONG_TEXT, 100, "middle_out")
+
+    for trimmed in (head, tail, middle):
+        assert estimate_tokens(trimmed) <= 100
+    assert LONG_TEXT.startswith(head)
+    assert LONG_TEXT.endswith(tail)
+    assert TRIM_MARKER in middle
+    assert LONG_TEXT.startswith(middle.split(TRIM_MARKER)[0])
+    assert LONG_TEXT.endswith(middle.split(TRIM_MARKER)[1])
+
+def test_trim_within_budget_is_noop():
+    """Text that already fits, or an unlimited budget, is returned unchanged."""
+    assert trim_to_budget("short text", 100) == "short text"
+    assert trim_to_budget(LONG_TEXT, 0) == LONG_TEXT
+
+def test_trim_invalid_policy():
+    """Unknown policies are rejected once trimming is needed, never for text that fits."""
+    with pytest.raises(ValueError, match="Unsupported context trim policy"):
+        trim_to_budget(LONG_TEXT, 10, "random")
+    assert trim_to_budget(LONG_TEXT, 0, "random") == LONG_TEXT
+    assert trim_to_budget("short text", 100, "random") == "short text"
+
+def test_invalid_configured_policy_fails_at_import():
+    """A misconfigured CONTEXT_TRIM_POLICY is reported once, when the module loads."""
+    env = {**os.environ, "CONTEXT_TRIM_POLICY": "random"}
+    result = subprocess.run([sys.executable, "-c", "import src.context_budget"], env=env, capture_output=True, text=True)
+
+    assert result.returncode != 0
+    assert "Unsupported context trim policy: random" in result.stderr
+
+def test_fit_context_defaults():
+    """Agents without a budget fall back to the configured default."""
+    with patch("src.context_budget.CONTEXT_TOKEN_BUDGET", 50), \
+         patch("src.context_budget.CONTEXT_TRIM_POLICY", "tail"):
+        assert estimate_tokens(fit_context(LONG_TEXT)) <= 50
+        assert LONG_TEXT.endswith(fit_context(LONG_TEXT))
+        assert estimate_tokens(fit_context(LONG_TEXT, 200, "head")) <= 200
@@ -0,0 +1,76 @@
+import time
+import pytest
+from unittest.mock import patch
+from src.dag_executor import process_dag, run_dag
+from src.workflow_loader import AgentSpec, WorkflowGraph
+
+def diamond_graph() -> WorkflowGraph:
+    """a fans out to b and c, which fan back in to d."""
+    agents = {node_id: AgentSpec(node_id, f"System {node_id}", f"Task {node_id}") for node_id in "abcd"}
+    edges = {"a": ("b", "c"), "b": ("d",), "c": ("d",), "d": ()}
+    return WorkflowGraph(start_node_id="a", agents=agents, edges=edges)
+
+def fake_call_llm(system_message, user_message, **kwargs):
+    """Echo the agent name so the data flow can be asserted."""
+    node_id = system_message.split()[-1]
+    if node_id in "bc":
+        time.sleep(0.2)
+    return {"response": f"<{node_id}>"}
+
+def test_run_dag_merges_fan_in():
+    """Both branches run and their outputs are merged before the fan-in agent."""
+    with patch("src.dag_executor.llm_client") as mock_llm:
+        mock_llm.call_llm.side_effect = fake_call_llm
+
+        response = run_dag(diamond_graph(), "start")
+
+        assert response == "<d>"
+        assert mock_llm.call_llm.call_count == 4
+        prompts = {call[0][0]: call[0][1] for call in mock_llm.call_llm.call_args_list}
+        assert prompts["System a"] == "Task a start"
+        assert prompts["System b"] == "Task b <a>"
+        assert prompts["System d"] == "Task d <b>\n\n<c>"
+
+def test_run_dag_runs_branches_concurrently():
+    """Wall-clock time follows the critical path, not the number of agents."""
+    with patch("src.dag_executor.llm_client") as mock_llm:
+        mock_llm.call_llm.side_effect = fake_call_llm
+
+        started = time.perf_counter()
+        run_dag(diamond_graph(), max_workers=2)
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.35
+
+def test_run_dag_with_llm_error():
+    """An error in any branch stops the run."""
+    with patch("src.dag_executor.llm_client") as mock_llm:
+        mock_llm.call_llm.return_value = {"error": "API Error", "statusCode": 500}
+
+        response = run_dag(diamond_graph())
+
+        assert "Error processing agent" in response
+        assert mock_llm.call_llm.call_count == 1
+
+def test_run_dag_rejects_cycles():
+    """A cyclic graph cannot be executed as a DAG."""
+    agents = {node_id: AgentSpec(node_id, "System", "Task") for node_id in "ab"}
+    graph = WorkflowGraph(start_node_id="a", agents=agents, edges={"a": ("b",), "b": ("a",)})
+
+    with pytest.raises(ValueError, match="cycle"):
+        run_dag(graph)
+
+def test_process_dag_loads_graph_once():
+    """process_dag fetches the whole graph in one query."""
+    with patch("src.workflow_loader.graph_client") as mock_graph, \
+         patch("src.dag_executor.llm_client") as mock_llm:
+        mock_graph.read.return_value = [
+            {"node_id": "a", "system_message": "System a", "user_message": "Task a", "next_agent_ids": ["b"]},
+            {"node_id": "b", "system_message": "System b", "user_message": "Task b", "next_agent_ids": []},
+        ]
+        mock_llm.call_llm.side_effect = lambda system, user, **kwargs: {"response": user}
+
+        response = process_dag("a")
+
+        assert mock_graph.read.call_count == 1
+        assert response == "Task b Task a "
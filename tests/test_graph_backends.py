@@ -0,0 +1,125 @@
+import pytest
+from unittest.mock import patch
+from src import graph_client as graph_client_module
+from src.agent_processor import get_agents, get_next_agent, get_next_agents, process_agent, process_workflow_graph
+from src.memory_graph import MemoryGraphClient
+from src.sqlite_graph import SQLiteGraphClient
+from src.workflow_io import export_workflow, import_workflow, load_workflow_file, reset_namespace
+from src.workflow_loader import WorkflowCycleError, get_graph_version, load_workflow, load_workflow_graph
+
+# Contract tests shared by the embedded backends: every named query must
+# answer with the same records the Cypher queries return on Neo4j.
+
+WORKFLOW = {
+    "namespace": "medical",
+    "start": "a1",
+    "agents": [
+        {"key": "a1", "system_message": "You are a psychiatrist.", "user_message": "Explain bipolar disorder."},
+        {"key": "a2", "system_message": "You are an accuracy checker.", "user_message": "Verify the explanation."},
+        {"key": "a3", "system_message": "You are an evaluator.", "user_message": "Assess the feedback.", "cache_llm": False},
+    ],
+    "edges": [
+        {"from": "a1", "to": "a2"},
+        {"from": "a2", "to": "a3"},
+        {"from": "a3", "to": "a2", "max_iterations": 2, "until": "APPROVED"},
+    ],
+}
+
+BACKENDS = {
+    "memory": lambda tmp_path: MemoryGraphClient(),
+    "sqlite": lambda tmp_path: SQLiteGraphClient(str(tmp_path / "graph.sqlite3")),
+}
+
+@pytest.fixture(params=sorted(BACKENDS))
+def backend(request, tmp_path):
+    """Each embedded backend holding WORKFLOW, patched in as every module's graph_client."""
+    graph = BACKENDS[request.param](tmp_path)
+    graph.load_workflow(WORKFLOW)
+    with patch("src.agent_processor.graph_client", graph), \
+         patch("src.workflow_loader.graph_client", graph), \
+         patch("src.workflow_io.graph_client", graph):
+        yield graph
+    graph.close()
+
+def test_lookups_match_cypher_records(backend):
+    """Agent and next-agent lookups return the same columns as the Cypher queries."""
+    assert get_next_agent("medical:a2") == [{
+        "next_agent_id": "medical:a3", "system_message": "You are an evaluator.",
+        "user_message": "Assess the feedback.", "cache_llm": False, "context_budget": None, "context_policy": None,
+        "max_iterations": None, "until": None,
+    }]
+    assert get_agents(["medical:a1", "missing"])["missing"] == []
+    assert [record["next_agent_id"] for record in get_next_agents(["medical:a1", "medical:a3"])["medical:a3"]] == ["medical:a2"]
+
+def test_load_workflow_follows_the_chain(backend):
+    """A linear chain compiles in order; a chain that closes a loop is reported as a cycle."""
+    start = backend.load_workflow({**WORKFLOW, "namespace": "linear", "edges": WORKFLOW["edges"][:2]})
+
+    assert [agent.node_id for agent in load_workflow(start).agents] == ["linear:a1", "linear:a2", "linear:a3"]
+    with pytest.raises(WorkflowCycleError):
+        load_workflow("medical:a1")
+
+def test_workflow_graph_returns_loop_edges(backend):
+    """Bounded loop edges come back as loop_edges and the loop runs until it converges."""
+    graph = load_workflow_graph("medical:a1")
+
+    assert graph.edges == {"medical:a1": ("medical:a2",), "medical:a2": ("medical:a3",), "medical:a3": ("medical:a2",)}
+    assert graph.loops[("medical:a3", "medical:a2")].max_iterations == 2
+    with patch("src.agent_processor.llm_client") as mock_llm:
+        mock_llm.call_llm.side_effect = [{"response": "draft"}, {"response": "checked"}, {"response": "APPROVED"}]
+        assert process_workflow_graph("medical:a1") == "APPROVED"
+
+def test_process_agent_runs_against_backend(backend):
+    """A whole workflow runs end to end with no graph mocks."""
+    with patch("src.agent_processor.llm_client") as mock_llm:
+        mock_llm.call_llm.side_effect = [{"response": "one"}, {"response": "two"}, {"response": "APPROVED"}]
+        response = process_agent("medical:a1", overlap=False)
+
+    assert response == "APPROVED"
+    assert mock_llm.call_llm.call_count == 3
+
+def test_workflow_path_walks_one_successor_per_agent(backend):
+    """Diamonds do not multiply the work: the chain follows each agent's first edge once."""
+    agents = [{"key": "join-0"}]
+    edges = []
+    for index in range(64):
+        agents += [{"key": f"left-{index}"}, {"key": f"right-{index}"}, {"key": f"join-{index + 1}"}]
+        for branch in (f"left-{index}", f"right-{index}"):
+            edges += [{"from": f"join-{index}", "to": branch}, {"from": branch, "to": f"join-{index + 1}"}]
+    start = backend.load_workflow({"namespace": "diamonds", "start": "join-0", "agents": agents, "edges": edges})
+
+    records = backend.read(None, {"node_id": start}, name="workflow_path")
+
+    expected = ["join-0"] + [key for index in range(64) for key in (f"left-{index}", f"join-{index + 1}")]
+    assert [record["node_id"] for record in records] == [f"diamonds:{key}" for key in expected]
+    assert records[0]["next_agent_ids"] == ["diamonds:left-0", "diamonds:right-0"]
+
+def test_import_export_and_reset_round_trip(backend, tmp_path):
+    """workflow_io imports, exports and resets namespaces on the embedded backends."""
+    version = get_graph_version()
+    result = import_workflow({**WORKFLOW, "namespace": "copy"})
+    path = str(tmp_path / "export.json")
+    export_workflow("copy", path, start="a1")
+
+    assert result["start_node_id"] == "copy:a1"
+    assert load_workflow_file(path) == {**WORKFLOW, "namespace": "copy"}
+    assert get_graph_version() > version
+
+    reset_namespace("copy")
+
+    assert get_next_agent("copy:a1") == []
+    assert get_next_agent("medical:a1")[0]["next_agent_id"] == "medical:a2"
+
+def test_unknown_query_name_returns_empty(backend):
+    """Ad-hoc Cypher cannot be answered and fails like a query error."""
+    assert backend.execute_query("MATCH (n) RETURN n") == []
+
+@pytest.mark.parametrize("graph_db_type, backend_class", [("memory", MemoryGraphClient), ("sqlite", SQLiteGraphClient)])
+def test_factory_selects_backend(graph_db_type, backend_class, tmp_path, monkeypatch):
+    """GRAPH_DB_TYPE=memory/sqlite builds the embedded backend instead of connecting to Neo4j."""
+    monkeypatch.chdir(tmp_path)
+    with patch.object(graph_client_module, "GRAPH_DB_TYPE", graph_db_type):
+        client = graph_client_module.create_graph_client()
+
+    assert isinstance(client, backend_class)
+    client.close()
@@ -1,6 +1,8 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from src.graph_client import GraphClient
+from src.graph_client import GraphClient, PoolMonitor
+from src.query_metrics import QueryMetrics
+from src.tracing import tracer
 from helper.logger import logger  # Import the logger
 
 @pytest.fixture(scope="module")
@@ -27,6 +29,8 @@ def mock_graph_client():
         with patch.object(GraphClient, '__init__', return_value=None):
             client = GraphClient()
             client.driver = mock_driver
+            client.pool = PoolMonitor(max_size=2, acquisition_timeout=0.1)
+            client.bookmark_manager = MagicMock()
             
             yield client, mock_session
             
@@ -133,3 +137,163 @@ def test_execute_query_with_empty_result(mock_graph_client):
     # Assertions
     assert result == []
     mock_session.run.assert_called_once_with("MATCH (n) RETURN n", {})
+
+def test_session_is_reused_within_a_run(mock_graph_client):
+    """Queries inside graph_client.session() share one driver session."""
+    client, mock_session = mock_graph_client
+    mock_session.run.return_value = []
+
+    with patch('src.graph_client.logger'):
+        with client.session():
+            client.execute_query("MATCH (a) RETURN a")
+            client.execute_query("MATCH (b) RETURN b")
+
+    assert client.driver.session.call_count == 1
+    assert mock_session.run.call_count == 2
+
+def test_pool_stats_track_acquisitions(mock_graph_client):
+    """Every query checks out one pool slot and releases it afterwards."""
+    client, mock_session = mock_graph_client
+    mock_session.run.return_value = []
+
+    with patch('src.graph_client.logger'):
+        client.execute_query("MATCH (n) RETURN n")
+        client.execute_query("MATCH (n) RETURN n")
+
+    stats = client.pool_stats()
+    assert stats["max_size"] == 2
+    assert stats["in_use"] == 0
+    assert stats["peak_in_use"] == 1
+    assert stats["acquisitions"] == 2
+    assert stats["idle"] is None  # Mock driver exposes no pool internals
+
+def test_pool_monitor_times_out_when_exhausted():
+    """Waiting longer than the acquisition timeout for a slot raises TimeoutError."""
+    pool = PoolMonitor(max_size=1, acquisition_timeout=0.01)
+
+    with pool.connection():
+        assert pool.stats()["in_use"] == 1
+        with pytest.raises(TimeoutError):
+            with pool.connection():
+                pass
+
+def test_read_uses_managed_read_transaction(mock_graph_client):
+    """read() goes through execute_read so the driver can route it to a replica and retry it."""
+    client, mock_session = mock_graph_client
+    mock_session.execute_read.return_value = [{"n": 1}]
+
+    with patch('src.graph_client.logger'):
+        result = client.read("MATCH (n) RETURN n", {"param": "value"})
+
+    assert result == [{"n": 1}]
+    mock_session.execute_read.assert_called_once()
+    assert mock_session.execute_read.call_args[0][1:3] == ("MATCH (n) RETURN n", {"param": "value"})
+    mock_session.run.assert_not_called()
+    assert client.driver.session.call_args.kwargs["bookmark_manager"] is client.bookmark_manager
+
+def test_write_uses_managed_write_transaction(mock_graph_client):
+    """write() goes through execute_write on the leader."""
+    client, mock_session = mock_graph_client
+    mock_session.execute_write.return_value = []
+
+    with patch('src.graph_client.logger'):
+        client.write("CREATE (n:Agent)")
+
+    mock_session.execute_write.assert_called_once()
+    mock_session.execute_read.assert_not_called()
+
+def test_execute_batch_groups_records_by_id(mock_graph_client):
+    """One UNWIND query resolves every id; ids without matches map to []."""
+    client, mock_session = mock_graph_client
+    mock_session.execute_read.return_value = [
+        {"node_id": "a", "system_message": "A"},
+        {"node_id": "b", "system_message": "B"},
+    ]
+
+    with patch('src.graph_client.logger'):
+        result = client.execute_batch("UNWIND $ids AS node_id RETURN node_id", ["a", "b", "c", "a"])
+
+    assert mock_session.execute_read.call_count == 1
+    assert mock_session.execute_read.call_args[0][2] == {"ids": ["a", "b", "c"]}
+    assert result == {"a": [{"node_id": "a", "system_message": "A"}], "b": [{"node_id": "b", "system_message": "B"}], "c": []}
+
+def test_stream_query_is_lazy_and_uses_fetch_size(mock_graph_client):
+    """Records are pulled from the result one at a time with the requested fetch size."""
+    client, mock_session = mock_graph_client
+    pulled = []
+
+    def records():
+        for index in range(3):
+            pulled.append(index)
+            record = MagicMock()
+            record.data.return_value = {"index": index}
+            yield record
+
+    mock_session.run.return_value = records()
+
+    with patch('src.graph_client.logger'):
+        stream = client.stream_query("MATCH (n) RETURN n", fetch_size=2)
+        assert next(stream) == {"index": 0}
+        assert pulled == [0]
+        assert list(stream) == [{"index": 1}, {"index": 2}]
+
+    assert client.driver.session.call_args.kwargs["fetch_size"] == 2
+    assert client.pool_stats()["in_use"] == 0
+
+def test_stream_query_values_only_skips_dicts(mock_graph_client):
+    """The values-only path yields the driver's tuple-like records without calling data()."""
+    client, mock_session = mock_graph_client
+    mock_session.run.return_value = [("a1", "System"), ("a2", "Other")]
+
+    with patch('src.graph_client.logger'):
+        rows = list(client.stream_query("MATCH (a) RETURN elementId(a), a.system_message", values_only=True))
+
+    assert rows == [("a1", "System"), ("a2", "Other")]
+
+def test_stream_query_raises_on_mid_stream_failure(mock_graph_client):
+    """A dropped connection is raised, recorded and traced rather than ending the stream quietly."""
+    client, mock_session = mock_graph_client
+
+    def records():
+        record = MagicMock()
+        record.data.return_value = {"index": 0}
+        yield record
+        raise ConnectionError("connection reset")
+
+    mock_session.run.return_value = records()
+    spans = []
+    exporter = MagicMock()
+    exporter.export.side_effect = spans.append
+
+    with patch('src.graph_client.query_metrics', QueryMetrics()) as metrics, patch('src.graph_client.logger'), \
+         patch.object(tracer, "exporter", exporter):
+        stream = client.stream_query("MATCH (n) RETURN n", name="export_agents")
+        assert next(stream) == {"index": 0}
+        assert tracer.current_span() is None  # The open stream does not adopt the caller's spans
+        with pytest.raises(ConnectionError):
+            next(stream)
+
+    assert metrics.snapshot()["export_agents"]["errors"] == 1
+    assert spans[0].name == "graph.query" and spans[0].status == "error"
+    assert client.pool_stats()["in_use"] == 0
+
+def test_named_query_records_latency_histograms(mock_graph_client):
+    """Named queries get client-side and server-side latency histograms from the result summary."""
+    client, mock_session = mock_graph_client
+    result = MagicMock()
+    result.__iter__.return_value = iter([])
+    result.consume.return_value = MagicMock(result_available_after=3, result_consumed_after=7)
+    mock_session.run.return_value = result
+
+    with patch('src.graph_client.query_metrics', QueryMetrics()) as metrics, patch('src.graph_client.logger') as mock_logger:
+        client.execute_query("MATCH (n) RETURN n", name="all_nodes")
+        client.execute_query("MATCH (m) RETURN m")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["all_nodes"]["client_ms"]["count"] == 1
+    assert snapshot["all_nodes"]["result_available_after_ms"]["max_ms"] == 3
+    assert snapshot["all_nodes"]["result_consumed_after_ms"]["buckets"]["le_10"] == 1
+    assert any(name.startswith("adhoc:") for name in snapshot)
+    # Query text is only logged at DEBUG
+    mock_logger.info.assert_not_called()
+    assert "MATCH (n) RETURN n" in mock_logger.debug.call_args_list[0][0]
@@ -0,0 +1,48 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from benchmarks.import_time import IMPORT_TIME_BUDGET_S, measure_import_time
+from src.lazy import LazySingleton
+
+def test_cold_import_within_budget_without_side_effects():
+    """Importing the executor needs no config, opens no connections and writes no files."""
+    result = measure_import_time("src.agent_processor", runs=1)
+
+    assert result["seconds"] <= IMPORT_TIME_BUDGET_S
+    assert result["created_files"] == []
+
+def test_lazy_singleton_builds_once_across_threads():
+    """Racing first accesses construct the instance exactly once."""
+    built = []
+
+    class Client:
+        def __init__(self):
+            built.append(self)
+            self.name = "client"
+
+    proxy = LazySingleton(Client)
+    assert not proxy.initialized
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        names = list(executor.map(lambda _: proxy.name, range(32)))
+
+    assert names == ["client"] * 32
+    assert len(built) == 1
+    assert proxy.get() is built[0]
+
+def test_patching_a_lazy_singleton_does_not_build_it():
+    """mock.patch probes dunder attributes of the original; they must not reach the factory."""
+    import src.graph_client
+
+    with patch("src.graph_client.GRAPH_DB_TYPE", None):
+        proxy = LazySingleton(src.graph_client.create_graph_client)
+        with patch.object(src.graph_client, "graph_client", proxy):
+            with patch("src.graph_client.graph_client") as mock_graph:
+                mock_graph.read.return_value = []
+                assert src.graph_client.graph_client.read("RETURN 1") == []
+
+        assert not proxy.initialized
+        with pytest.raises(AttributeError):
+            proxy.__code__
+        with pytest.raises(ValueError, match="Unsupported GRAPH_DB_TYPE"):
+            proxy.read
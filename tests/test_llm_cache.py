@@ -0,0 +1,52 @@
+import pytest
+from src.llm_cache import LLMResponseCache, request_key
+
+RESPONSE = {"statusCode": 200, "body": '{"response": "cached"}'}
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create a two-tier cache backed by a temporary SQLite file."""
+    cache = LLMResponseCache(max_entries=2, ttl=60, disk_path=str(tmp_path / "llm_cache.sqlite3"))
+    yield cache
+    cache.close()
+
+def test_request_key_covers_full_request():
+    """Any change to the provider, endpoint or payload changes the key."""
+    payload = {"model": "gpt-4", "messages": [{"role": "user", "content": "Hi"}]}
+    key = request_key("openai", "https://api.openai.com/v1/chat/completions", payload)
+
+    assert key == request_key("openai", "https://api.openai.com/v1/chat/completions", dict(reversed(payload.items())))
+    assert key != request_key("deepseek", "https://api.openai.com/v1/chat/completions", payload)
+    assert key != request_key("openai", "https://api.openai.com/v1/chat/completions", {**payload, "model": "gpt-3.5"})
+
+def test_memory_and_disk_tiers(cache):
+    """Entries evicted from memory are still served from disk."""
+    cache.put("k1", RESPONSE)
+    cache.put("k2", RESPONSE)
+    cache.put("k3", RESPONSE)  # Evicts k1 from memory
+
+    assert cache.get("k3") == RESPONSE
+    assert cache.get("k1") == RESPONSE
+    assert cache.get("missing") is None
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_disk_tier_survives_restart(tmp_path):
+    """A new process sees responses cached by an earlier one."""
+    path = str(tmp_path / "llm_cache.sqlite3")
+    first = LLMResponseCache(disk_path=path)
+    first.put("k1", RESPONSE)
+    first.close()
+
+    second = LLMResponseCache(disk_path=path)
+    assert second.get("k1") == RESPONSE
+    second.close()
+
+def test_ttl_expiry(cache):
+    """Expired entries are misses on both tiers."""
+    cache.put("k1", RESPONSE)
+    cache.ttl = 0
+
+    assert cache.get("k1") is None
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,44 @@
+import json
+import pytest
+import threading
+from unittest.mock import patch
+from src.agent_processor import get_next_agent
+from src.memory_graph import MemoryGraphClient
+from src.workflow_loader import get_graph_version
+from tests.test_graph_backends import WORKFLOW
+
+@pytest.fixture
+def memory_graph(tmp_path):
+    """In-memory graph loaded from a workflow file and patched in as the lookups' graph_client."""
+    path = tmp_path / "workflow.json"
+    path.write_text(json.dumps(WORKFLOW))
+    graph = MemoryGraphClient(workflow_paths=str(path))
+    with patch("src.agent_processor.graph_client", graph), patch("src.workflow_loader.graph_client", graph):
+        yield graph
+
+def test_loads_workflow_files_at_startup(memory_graph):
+    """Workflow files listed in GRAPH_MEMORY_WORKFLOWS are loaded when the backend is built."""
+    assert memory_graph.namespaces == {"medical": {"medical:a1", "medical:a2", "medical:a3"}}
+    assert get_next_agent("medical:a1")[0]["next_agent_id"] == "medical:a2"
+    assert get_graph_version() == 1
+
+def test_load_workflow_is_atomic_for_readers():
+    """Readers wait for the whole load, so they never see agents without their edges."""
+    graph = MemoryGraphClient()
+    import_edges = graph._import_edges
+    readers, seen = [], []
+
+    def import_edges_with_reader(parameters):
+        reader = threading.Thread(target=lambda: seen.append(graph.read(None, {"node_id": "medical:a1"}, name="next_agent")))
+        reader.start()
+        reader.join(timeout=0.1)
+        readers.append((reader, reader.is_alive()))
+        return import_edges(parameters)
+
+    with patch.object(graph, "_import_edges", side_effect=import_edges_with_reader):
+        graph.load_workflow(WORKFLOW)
+    reader, blocked = readers[0]
+    reader.join()
+
+    assert blocked  # The reader waited on the backend lock until the load finished
+    assert seen[0][0]["next_agent_id"] == "medical:a2"
@@ -0,0 +1,29 @@
+from src.query_metrics import Histogram, QueryMetrics
+
+def test_histogram_buckets_and_percentiles():
+    """Observations land in the first bucket whose bound covers them."""
+    histogram = Histogram(bounds=(1, 10, 100))
+    for value in (0.5, 4, 8, 50, 500):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"le_1": 1, "le_10": 2, "le_100": 1, "le_inf": 1}
+    assert snapshot["p50_ms"] == 10
+    assert snapshot["p99_ms"] == 500  # Open bucket reports the observed max
+    assert snapshot["min_ms"] == 0.5
+
+def test_query_metrics_tracks_errors_per_name():
+    """Each query name has its own histograms and error count."""
+    metrics = QueryMetrics()
+    metrics.record("agent_messages", 4.0, available_after_ms=1, consumed_after_ms=2)
+    metrics.record("agent_messages", 6.0, error=True)
+    metrics.record("next_agent", 2.0)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["agent_messages"]["client_ms"]["count"] == 2
+    assert snapshot["agent_messages"]["result_available_after_ms"]["count"] == 1
+    assert snapshot["agent_messages"]["errors"] == 1
+    assert snapshot["next_agent"]["client_ms"]["avg_ms"] == 2.0
+
+    metrics.reset()
+    assert metrics.snapshot() == {}
@@ -0,0 +1,48 @@
+import gc
+import pytest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from src.agent_processor import get_next_agent
+from src.sqlite_graph import SQLiteGraphClient
+from tests.test_graph_backends import WORKFLOW
+
+@pytest.fixture
+def sqlite_graph(tmp_path):
+    """SQLite graph holding WORKFLOW, patched in as the lookups' graph_client."""
+    graph = SQLiteGraphClient(str(tmp_path / "graph.sqlite3"))
+    graph.load_workflow(WORKFLOW)
+    with patch("src.agent_processor.graph_client", graph):
+        yield graph
+    graph.close()
+
+def test_concurrent_readers_use_their_own_connections(sqlite_graph):
+    """Readers on many threads each get a connection and see the same data."""
+    def read(_):
+        return get_next_agent("medical:a1")[0]["next_agent_id"], id(sqlite_graph._connection())
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(read, range(32)))
+
+    assert {next_id for next_id, _ in results} == {"medical:a2"}
+    assert len({connection for _, connection in results}) > 1
+
+def test_connections_close_when_their_thread_exits(sqlite_graph):
+    """Short-lived threads (such as BatchLoader timers) do not leak connections."""
+    for _ in range(50):
+        thread = threading.Thread(target=get_next_agent, args=("medical:a1",))
+        thread.start()
+        thread.join()
+    gc.collect()
+
+    assert len(sqlite_graph._open) <= 2
+
+def test_load_workflow_rolls_back_on_failure(tmp_path):
+    """Agents, edges and the version bump commit together or not at all."""
+    graph = SQLiteGraphClient(str(tmp_path / "graph.sqlite3"))
+
+    with patch.object(graph, "_import_edges", side_effect=RuntimeError("disk I/O error")), pytest.raises(RuntimeError):
+        graph.load_workflow(WORKFLOW)
+
+    assert graph.read(None, {"node_id": "medical:a1"}, name="agent_messages") == []
+    graph.close()
@@ -0,0 +1,48 @@
+import json
+from unittest.mock import patch
+from src.summarizer import extractive_summary, summarize_for_next_hop
+
+REVIEW = (
+    "Amoxicillin is a penicillin antibiotic. "
+    "The weather was pleasant during the review. "
+    "Amoxicillin treats bacterial infections such as otitis and pneumonia. "
+    "Penicillin allergy is a contraindication for amoxicillin. "
+    "Lunch was served at noon."
+)
+
+def test_extractive_summary_keeps_representative_sentences():
+    """The summary fits the budget and keeps on-topic sentences in order."""
+    summary = extractive_summary(REVIEW, 100)
+
+    assert len(summary) <= 100
+    assert summary == (
+        "Amoxicillin is a penicillin antibiotic. "
+        "Penicillin allergy is a contraindication for amoxicillin."
+    )
+
+def test_extractive_summary_short_text_unchanged():
+    """Text within the budget is returned as is."""
+    assert extractive_summary("Short answer.", 100) == "Short answer."
+
+def test_summarize_for_next_hop_threshold():
+    """Only outputs above the threshold are summarized; 0 disables summarization."""
+    with patch("src.summarizer.SUMMARIZE_THRESHOLD_CHARS", 0):
+        assert summarize_for_next_hop(REVIEW) == REVIEW
+    with patch("src.summarizer.SUMMARIZE_THRESHOLD_CHARS", 50), \
+         patch("src.summarizer.SUMMARY_MAX_CHARS", 130):
+        assert len(summarize_for_next_hop(REVIEW)) <= 130
+        assert summarize_for_next_hop("Short answer.") == "Short answer."
+
+def test_llm_summarizer_with_fallback():
+    """The LLM summarizer is used when configured and falls back to extractive on errors."""
+    with patch("src.summarizer.SUMMARIZE_THRESHOLD_CHARS", 50), \
+         patch("src.summarizer.SUMMARY_MAX_CHARS", 130), \
+         patch("src.summarizer.SUMMARIZER", "llm"), \
+         patch("src.summarizer._client") as mock_client:
+        mock_client.return_value.call_llm.return_value = {"statusCode": 200, "body": json.dumps({"response": "LLM summary"})}
+        assert summarize_for_next_hop(REVIEW) == "LLM summary"
+
+        mock_client.return_value.call_llm.return_value = {"statusCode": 500, "error": "API Error"}
+        fallback = summarize_for_next_hop(REVIEW)
+        assert fallback != REVIEW
+        assert len(fallback) <= 130
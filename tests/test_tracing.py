@@ -0,0 +1,149 @@
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+from src.agent_processor import process_agent
+from src.llm_client import LLMClient
+from src.tracing import JSONLSpanExporter, OTLPSpanExporter, SpanExporter, Tracer, exporter_from_config, tracer
+
+class ListExporter(SpanExporter):
+    """Collect finished spans in memory."""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+@pytest.fixture
+def exported_spans():
+    """Route the global tracer to an in-memory exporter for one test."""
+    exporter = ListExporter()
+    previous = tracer.exporter
+    tracer.set_exporter(exporter)
+    yield exporter.spans
+    tracer.exporter = previous
+
+def test_spans_nest_within_a_trace():
+    """Child spans share the trace id and point at their parent."""
+    exporter = ListExporter()
+    local_tracer = Tracer(exporter)
+
+    with local_tracer.span("outer", run="r1") as outer:
+        with local_tracer.span("inner") as inner:
+            inner.set("rows", 3)
+
+    assert [span.name for span in exporter.spans] == ["inner", "outer"]
+    assert inner.trace_id == outer.trace_id
+    assert inner.parent_id == outer.span_id
+    assert outer.parent_id is None
+    assert inner.attributes == {"rows": 3}
+    assert outer.end_time_ns >= inner.end_time_ns
+
+def test_span_records_exceptions():
+    """An exception marks the span as failed and still propagates."""
+    exporter = ListExporter()
+    local_tracer = Tracer(exporter)
+
+    with pytest.raises(RuntimeError):
+        with local_tracer.span("boom"):
+            raise RuntimeError("bad")
+
+    assert exporter.spans[0].status == "error"
+    assert exporter.spans[0].attributes["error"] == "bad"
+
+def test_disabled_tracer_builds_no_spans():
+    """Without an exporter, span() yields a shared no-op span and tracks nothing."""
+    local_tracer = Tracer(None)
+
+    with local_tracer.span("outer", run="r1") as outer:
+        with local_tracer.span("inner") as inner:
+            inner.set("rows", 3)
+            inner.record_error("ignored")
+            assert local_tracer.current_span() is None
+
+    assert inner is outer
+    assert not hasattr(outer, "attributes")
+
+def test_span_exporter_requires_export():
+    """SpanExporter is abstract: a subclass must implement export."""
+    class Incomplete(SpanExporter):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_jsonl_exporter_writes_one_line_per_span(tmp_path):
+    """Each finished span is appended as a JSON object."""
+    path = tmp_path / "traces.jsonl"
+    local_tracer = Tracer(JSONLSpanExporter(str(path)))
+
+    with local_tracer.span("outer"):
+        with local_tracer.span("inner"):
+            pass
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["name"] for record in records] == ["inner", "outer"]
+    assert records[0]["parent_id"] == records[1]["span_id"]
+
+def test_otlp_exporter_flushes_on_root_span(tmp_path):
+    """Spans are batched into one OTLP/JSON request per finished trace."""
+    path = tmp_path / "traces.otlp.jsonl"
+    local_tracer = Tracer(OTLPSpanExporter(path=str(path), endpoint=None))
+
+    with local_tracer.span("outer"):
+        with local_tracer.span("inner", **{"http.status_code": 200}):
+            pass
+
+    requests = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(requests) == 1
+    spans = requests[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [span["name"] for span in spans] == ["inner", "outer"]
+    assert spans[0]["attributes"] == [{"key": "http.status_code", "value": {"intValue": "200"}}]
+
+def test_exporter_from_config_rejects_unknown_kind():
+    """Only none, jsonl and otlp are supported."""
+    assert exporter_from_config("none") is None
+    with pytest.raises(ValueError):
+        exporter_from_config("zipkin")
+
+@patch("requests.post")
+def test_call_llm_records_http_and_usage(mock_post, exported_spans):
+    """call_llm produces an llm.call span wrapping an llm.http span with status, bytes and usage."""
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.content = b'{"choices": []}'
+    mock_response.json.return_value = {
+        "choices": [{"message": {"content": "Hello"}}],
+        "usage": {"prompt_tokens": 12, "completion_tokens": 3},
+    }
+    mock_post.return_value = mock_response
+
+    with patch("src.llm_client.LLM_PROVIDER", "openai"):
+        LLMClient().call_llm("System", "User")
+
+    http_span, call_span = exported_spans
+    assert (http_span.name, call_span.name) == ("llm.http", "llm.call")
+    assert http_span.parent_id == call_span.span_id
+    assert http_span.attributes["http.status_code"] == 200
+    assert http_span.attributes["http.response_bytes"] == len(mock_response.content)
+    assert http_span.attributes["http.request_bytes"] > 0
+    assert http_span.attributes["llm.usage.prompt_tokens"] == 12
+
+def test_process_agent_emits_run_and_hop_spans(exported_spans):
+    """A run span contains one hop span per agent, with graph queries nested inside."""
+    with patch("src.agent_processor.graph_client"), \
+         patch("src.agent_processor.get_agent_messages") as mock_messages, \
+         patch("src.agent_processor.get_next_agent") as mock_next, \
+         patch("src.agent_processor.llm_client") as mock_llm:
+        mock_messages.return_value = [{"system_message": "System", "user_message": "Continue"}]
+        mock_next.side_effect = lambda node_id: [{"next_agent_id": 2}] if node_id == 1 else []
+        mock_llm.call_llm.side_effect = lambda system, user, **kwargs: {"response": "hop"}
+
+        process_agent(1)
+
+    run_span = exported_spans[-1]
+    hop_spans = [span for span in exported_spans if span.name == "agent.hop"]
+    assert run_span.name == "workflow.run"
+    assert run_span.attributes["hops"] == 2
+    assert [span.attributes["node_id"] for span in hop_spans] == [1, 2]
+    assert all(span.parent_id == run_span.span_id for span in hop_spans)
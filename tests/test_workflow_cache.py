@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import patch
+from src.workflow_cache import WorkflowCache
+from src.workflow_loader import AgentSpec, WorkflowPlan
+
+def make_plan(node_id: str) -> WorkflowPlan:
+    """Build a one-agent plan for node_id."""
+    return WorkflowPlan(start_node_id=node_id, agents=(AgentSpec(node_id, "System", "Task"),))
+
+@pytest.fixture
+def mock_loader():
+    """Patch the graph-facing functions the cache depends on."""
+    with patch("src.workflow_cache.load_workflow", side_effect=make_plan) as mock_load, \
+         patch("src.workflow_cache.get_graph_version", return_value=1) as mock_version:
+        yield mock_load, mock_version
+
+def test_cache_hit_skips_graph(mock_loader):
+    """A warm lookup does not load the workflow again."""
+    mock_load, _ = mock_loader
+    cache = WorkflowCache(version_check_interval=0)
+
+    first = cache.get("a1")
+    second = cache.get("a1")
+
+    assert first is second
+    assert mock_load.call_count == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_version_change_invalidates(mock_loader):
+    """Bumping the graph version forces a reload."""
+    mock_load, mock_version = mock_loader
+    cache = WorkflowCache(version_check_interval=0)
+
+    cache.get("a1")
+    mock_version.return_value = 2
+    cache.get("a1")
+
+    assert mock_load.call_count == 2
+    assert len(cache) == 1
+
+def test_version_check_is_throttled(mock_loader):
+    """The version stamp is read at most once per check interval."""
+    _, mock_version = mock_loader
+    cache = WorkflowCache(version_check_interval=60)
+
+    for _ in range(5):
+        cache.get("a1")
+
+    assert mock_version.call_count == 1
+
+def test_lru_eviction_and_ttl(mock_loader):
+    """Least recently used plans are evicted and expired plans are reloaded."""
+    mock_load, _ = mock_loader
+    cache = WorkflowCache(max_entries=2, version_check_interval=0)
+
+    cache.get("a1")
+    cache.get("a2")
+    cache.get("a1")
+    cache.get("a3")  # Evicts a2
+    assert len(cache) == 2
+    cache.get("a2")
+    assert mock_load.call_count == 4
+
+    cache.ttl = 0
+    cache.get("a2")
+    assert mock_load.call_count == 5
+
+def test_unreadable_version_bypasses_cache(mock_loader):
+    """When the version stamp can't be read, plans are loaded and not cached."""
+    mock_load, mock_version = mock_loader
+    mock_version.return_value = None
+    cache = WorkflowCache(version_check_interval=0)
+
+    cache.get("a1")
+    cache.get("a1")
+
+    assert mock_load.call_count == 2
+    assert len(cache) == 0
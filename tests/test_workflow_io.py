@@ -0,0 +1,133 @@
+import pytest
+from unittest.mock import patch
+from src.workflow_io import export_workflow, import_workflow, load_workflow_file, reset_namespace
+
+WORKFLOW = {
+    "namespace": "medical",
+    "start": "a1",
+    "agents": [
+        {"key": "a1", "system_message": "You are a psychiatrist.", "user_message": "Explain bipolar disorder."},
+        {"key": "a2", "system_message": "You are an accuracy checker.", "user_message": "Verify the explanation."},
+        {"key": "a3", "system_message": "You are an evaluator.", "user_message": "Assess the feedback.", "cache_llm": False},
+    ],
+    "edges": [
+        {"from": "a1", "to": "a2"},
+        {"from": "a2", "to": "a3"},
+        {"from": "a3", "to": "a2", "max_iterations": 2, "until": "APPROVED"},
+    ],
+}
+
+@pytest.fixture
+def mock_graph_client():
+    """Mock graph_client whose agent writes echo back a node id per key."""
+    def write(query, parameters, **kwargs):
+        if "CREATE (a:Agent)" in query:
+            return [{"key": row["key"], "node_id": f"id-{row['key']}"} for row in parameters["rows"]]
+        if "CREATE (a)-[r:NEXT_AGENT]->(b)" in query:
+            return [{"created": len(parameters["rows"])}]
+        return []
+
+    with patch("src.workflow_io.graph_client") as mock_graph, patch("src.workflow_io.bump_graph_version") as mock_bump:
+        mock_graph.write.side_effect = write
+        mock_graph.execute_query.side_effect = lambda query, parameters=None, **kwargs: (
+            [{"deleted": 0}] if "DETACH DELETE" in query else []
+        )
+        mock_graph.mock_bump = mock_bump
+        yield mock_graph
+
+def test_import_writes_in_batches(mock_graph_client):
+    """Agents and edges are written with one UNWIND transaction per batch."""
+    result = import_workflow(WORKFLOW, batch_size=2)
+
+    writes = mock_graph_client.write.call_args_list
+    assert [len(call[0][1]["rows"]) for call in writes] == [2, 1, 2, 1]
+    assert writes[0][0][1]["namespace"] == "medical"
+    assert writes[2][0][1]["rows"][0] == {"from_id": "id-a1", "to_id": "id-a2", "properties": {}}
+    assert writes[3][0][1]["rows"][0]["properties"] == {"max_iterations": 2, "until": "APPROVED"}
+    assert result["start_node_id"] == "id-a1"
+    assert (result["agents"], result["edges"]) == (3, 3)
+    mock_graph_client.mock_bump.assert_called_once()
+
+def test_import_rejects_unknown_edge_endpoint(mock_graph_client):
+    """Edges must reference agents defined in the same file."""
+    broken = {**WORKFLOW, "edges": [{"from": "a1", "to": "missing"}]}
+
+    with pytest.raises(ValueError):
+        import_workflow(broken)
+
+    mock_graph_client.write.assert_not_called()
+
+def test_import_rejects_unknown_context_policy(mock_graph_client):
+    """Per-agent trim policies are validated when the workflow is loaded, not when it runs."""
+    broken = {**WORKFLOW, "agents": [{**WORKFLOW["agents"][0], "context_policy": "random"}], "edges": []}
+
+    with pytest.raises(ValueError, match="unsupported context trim policy"):
+        import_workflow(broken)
+
+    mock_graph_client.write.assert_not_called()
+
+def test_reset_namespace_deletes_in_auto_commit_batches(mock_graph_client):
+    """Reset deletes only the namespace, in CALL ... IN TRANSACTIONS batches run auto-commit."""
+    reset_namespace("medical", batch_size=500)
+
+    query, parameters = mock_graph_client.execute_query.call_args_list[-1][0]
+    assert "IN TRANSACTIONS OF 500 ROWS" in query
+    assert "{namespace: $namespace}" in query
+    assert parameters == {"namespace": "medical"}
+    mock_graph_client.write.assert_not_called()
+    mock_graph_client.mock_bump.assert_called_once()
+
+def test_reset_namespace_failure_is_raised(mock_graph_client):
+    """A failed reset raises instead of reporting success, so replace=True never imports on top of old agents."""
+    mock_graph_client.execute_query.side_effect = None
+    mock_graph_client.execute_query.return_value = []
+
+    with pytest.raises(RuntimeError):
+        import_workflow(WORKFLOW, replace=True)
+
+    mock_graph_client.write.assert_not_called()
+    mock_graph_client.mock_bump.assert_not_called()
+
+def test_reset_namespace_requires_a_namespace(mock_graph_client):
+    """An empty namespace never turns into a global delete."""
+    with pytest.raises(ValueError):
+        reset_namespace("")
+
+    mock_graph_client.execute_query.assert_not_called()
+
+def test_import_with_replace_resets_first(mock_graph_client):
+    """replace=True clears the namespace before the agents are written."""
+    import_workflow(WORKFLOW, replace=True)
+
+    names = [call.kwargs.get("name") for call in mock_graph_client.method_calls if call[0] in ("execute_query", "write")]
+    assert names[:3] == ["namespace_index", "reset_namespace", "import_agents"]
+
+def test_import_detects_failed_edge_batch(mock_graph_client):
+    """An edge batch that creates nothing (or fails) aborts the import instead of reporting success."""
+    write = mock_graph_client.write.side_effect
+    mock_graph_client.write.side_effect = lambda query, parameters, **kwargs: (
+        [] if "NEXT_AGENT" in query else write(query, parameters, **kwargs)
+    )
+
+    with pytest.raises(RuntimeError):
+        import_workflow(WORKFLOW)
+
+    mock_graph_client.mock_bump.assert_not_called()
+
+@pytest.mark.parametrize("filename", ["workflow.json", "workflow.yaml"])
+def test_export_streams_a_loadable_file(tmp_path, filename):
+    """Exported files load back into the same definition."""
+    if filename.endswith(".yaml"):
+        pytest.importorskip("yaml")  # YAML support is optional
+    def stream_query(query, parameters, **kwargs):
+        if "-[r:NEXT_AGENT]->" in query:
+            return iter([{**edge, "max_iterations": edge.get("max_iterations"), "until": edge.get("until")} for edge in WORKFLOW["edges"]])
+        return iter(WORKFLOW["agents"])
+
+    path = str(tmp_path / filename)
+    with patch("src.workflow_io.graph_client") as mock_graph:
+        mock_graph.stream_query.side_effect = stream_query
+        counts = export_workflow("medical", path, start="a1")
+
+    assert (counts["agents"], counts["edges"]) == (3, 3)
+    assert load_workflow_file(path) == WORKFLOW
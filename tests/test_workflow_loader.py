@@ -0,0 +1,103 @@
+import pytest
+from unittest.mock import patch
+from src.workflow_loader import (
+    AgentSpec, LoopSpec, WorkflowCycleError, WorkflowFanOutError, WorkflowPlan, load_workflow, load_workflow_graph,
+)
+
+@pytest.fixture
+def mock_graph_client():
+    """Mock graph_client returning a three-agent chain, in no particular order like Neo4j."""
+    with patch("src.workflow_loader.graph_client") as mock_graph:
+        mock_graph.read.return_value = [
+            {"node_id": "a3", "system_message": "You are an evaluator.", "user_message": "Assess the feedback.", "next_agent_ids": []},
+            {"node_id": "a1", "system_message": "You are a psychiatrist.", "user_message": "Explain bipolar disorder.",
+             "next_agent_ids": ["a2"]},
+            {"node_id": "a2", "system_message": "You are an accuracy checker.", "user_message": "Verify the explanation.",
+             "next_agent_ids": ["a3"]},
+        ]
+        yield mock_graph
+
+def test_load_workflow_single_round_trip(mock_graph_client):
+    """The whole chain is fetched with exactly one query."""
+    plan = load_workflow("a1")
+
+    mock_graph_client.read.assert_called_once()
+    call_args = mock_graph_client.read.call_args[0][1]
+    assert call_args["node_id"] == "a1"
+
+    assert isinstance(plan, WorkflowPlan)
+    assert plan.start_node_id == "a1"
+    assert [agent.node_id for agent in plan] == ["a1", "a2", "a3"]
+    assert plan.agents[1].system_message == "You are an accuracy checker."
+
+def test_load_workflow_no_agent(mock_graph_client):
+    """An unknown start node compiles to an empty plan."""
+    mock_graph_client.read.return_value = []
+
+    plan = load_workflow("missing")
+
+    assert len(plan) == 0
+
+def test_agent_spec_defaults():
+    """Missing messages fall back to the same defaults as process_agent."""
+    spec = AgentSpec.from_record({"node_id": "a1"})
+
+    assert spec.system_message == "No system message found"
+    assert spec.user_message == "No user message found"
+
+def test_load_workflow_graph_layers():
+    """Fan-out branches land in the same topological layer."""
+    with patch("src.workflow_loader.graph_client") as mock_graph:
+        mock_graph.read.return_value = [
+            {"node_id": "a", "system_message": "S", "user_message": "U", "next_agent_ids": ["b", "c"]},
+            {"node_id": "b", "system_message": "S", "user_message": "U", "next_agent_ids": ["d"]},
+            {"node_id": "c", "system_message": "S", "user_message": "U", "next_agent_ids": ["d"]},
+            {"node_id": "d", "system_message": "S", "user_message": "U", "next_agent_ids": []},
+        ]
+
+        graph = load_workflow_graph("a")
+
+        mock_graph.read.assert_called_once()
+        assert graph.edges["a"] == ("b", "c")
+        assert graph.layers() == [["a"], ["b", "c"], ["d"]]
+        assert sorted(graph.predecessors()["d"]) == ["b", "c"]
+
+def test_load_workflow_graph_rejects_unbounded_cycle():
+    """A cycle without a max_iterations edge is rejected at load time."""
+    with patch("src.workflow_loader.graph_client") as mock_graph:
+        mock_graph.read.return_value = [
+            {"node_id": "a", "system_message": "S", "user_message": "U", "next_agent_ids": ["b"]},
+            {"node_id": "b", "system_message": "S", "user_message": "U", "next_agent_ids": ["a"]},
+        ]
+
+        with pytest.raises(WorkflowCycleError):
+            load_workflow_graph("a")
+
+def test_load_workflow_graph_accepts_bounded_loop():
+    """A cycle closed by a max_iterations edge loads with its LoopSpec."""
+    with patch("src.workflow_loader.graph_client") as mock_graph:
+        mock_graph.read.return_value = [
+            {"node_id": "a", "system_message": "S", "user_message": "U", "next_agent_ids": ["b"]},
+            {"node_id": "b", "system_message": "S", "user_message": "U", "next_agent_ids": ["a"],
+             "loop_edges": [{"next_agent_id": "a", "max_iterations": 2, "until": "regex:^OK"}]},
+        ]
+
+        graph = load_workflow_graph("a")
+
+    assert graph.loops[("b", "a")] == LoopSpec(max_iterations=2, until="regex:^OK")
+    assert graph.loops[("b", "a")].converged("OK, ship it")
+    assert not graph.loops[("b", "a")].converged("Not OK")
+
+def test_load_workflow_rejects_cyclic_chain(mock_graph_client):
+    """A linear plan never repeats an agent."""
+    mock_graph_client.read.return_value[0]["next_agent_ids"] = ["a1"]
+
+    with pytest.raises(WorkflowCycleError):
+        load_workflow("a1")
+
+def test_load_workflow_rejects_fan_out(mock_graph_client):
+    """A chain never keeps one branch of a fan-out and silently drops the others."""
+    mock_graph_client.read.return_value[1]["next_agent_ids"] = ["a2", "a3"]
+
+    with pytest.raises(WorkflowFanOutError, match="process_dag"):
+        load_workflow("a1")